@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Measure cold start of the apps: process spawn to listening socket, to /live
+answering, and to /ready reporting the list loaded.
+
+Each app is started fresh --runs times (dev server for the Flask apps,
+uvicorn for asgi) and the median of each milestone is reported. The LLM
+clients are created against a dummy key; no LLM calls are made.
+
+    python benchmarks/cold_start.py data/sdn.csv --apps merged,api,asgi --runs 5
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from load_test import APPS, start_server, _free_port
+
+
+def _status(port: int, path: str) -> int:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+    try:
+        conn.request("GET", path)
+        return conn.getresponse().status
+    finally:
+        conn.close()
+
+
+def cold_start(app: str, sdn_file: str, use_snapshot: bool, timeout: float):
+    """Seconds from spawn to (listening, live, ready)."""
+    port = _free_port()
+    env = {
+        'SDN_FILE_PATH': str(Path(sdn_file).resolve()),
+        'USE_SNAPSHOT': 'true' if use_snapshot else 'false',
+        'OPENAI_API_KEY': os.getenv('OPENAI_API_KEY') or 'cold-start',
+        'LOG_LEVEL': 'WARNING',
+    }
+    log_path = str(Path(tempfile.gettempdir()) / "sdn_cold_start_server.log")
+    started = time.perf_counter()
+    process = start_server(app, 'uvicorn' if app == 'asgi' else 'dev', 1, port, env, log_path)
+    listening = live = ready = None
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline and ready is None:
+            if process.poll() is not None:
+                raise RuntimeError(f"{app} exited with code {process.returncode}; see {log_path}")
+            now = time.perf_counter()
+            try:
+                if listening is None:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                    listening = now - started
+                if live is None and _status(port, "/live") == 200:
+                    live = time.perf_counter() - started
+                if live is not None and _status(port, "/ready") == 200:
+                    ready = time.perf_counter() - started
+            except (OSError, http.client.HTTPException):
+                pass
+            time.sleep(0.005)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    if ready is None:
+        raise RuntimeError(f"{app} not ready after {timeout:.0f}s")
+    return listening, live, ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("sdn_file", help="Path to the SDN CSV")
+    parser.add_argument("--apps", default="merged,api,asgi", help=f"Comma-separated, from: {', '.join(sorted(APPS))}")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--snapshot", action="store_true", help="Start from the mmap snapshot (built on the first run)")
+    parser.add_argument("--timeout", type=float, default=180.0)
+    args = parser.parse_args()
+
+    print(f"{'app':>8} {'listening':>10} {'/live':>10} {'/ready':>10}   (median of {args.runs} runs, seconds)")
+    for app in args.apps.split(","):
+        runs = [cold_start(app, args.sdn_file, args.snapshot, args.timeout) for _ in range(args.runs)]
+        listening, live, ready = (statistics.median(values) for values in zip(*runs))
+        print(f"{app:>8} {listening:>10.3f} {live:>10.3f} {ready:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
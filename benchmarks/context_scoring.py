@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Measure rule-based context scoring per query as the candidate count grows.
+
+Compares the previous per-candidate loop (interval overlap, ISO code and
+program lookups and a substring scan of the remarks per candidate) with
+the column-based ContextScorer, on the same random candidate sets and
+queries with a DOB and nationality. Reports median milliseconds per query
+and how many candidates' scores differ between the two: the scorer counts
+whole remark terms, where the loop counted substrings ("ali" in "khalil").
+
+    python benchmarks/context_scoring.py data/sdn.csv --candidates 10,100,1000,5000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sdn_api.core.search_service import SDNSearchService
+from sdn_api.core.dob_index import parse_date_ranges, ranges_overlap
+from sdn_api.core.gazetteer import gazetteer
+from sdn_api.core.partitions import detect_entity_type, entry_type
+
+QUERIES = [
+    "{name}, {dob}, {nationality}",
+    "{name}, {nationality}",
+    "{name}, {dob}",
+    "{name}",
+]
+
+
+def per_candidate_scores(query_info, matches):
+    """The previous scoring loop: every feature checked per candidate."""
+    query_dob_ranges = query_info.get('dob_ranges') or parse_date_ranges(query_info.get('dob'))
+    query_country = query_info.get('nationality_code') or gazetteer.lookup(query_info.get('nationality'))
+    query_name = query_info.get('name', '').lower()
+    query_type = query_info.get('entity_type') or detect_entity_type(query_name)
+    scores = []
+    for match in matches:
+        entry = match['entry']
+        score = match['score']
+        if query_dob_ranges and entry.dob_ranges and ranges_overlap(query_dob_ranges, entry.dob_ranges):
+            score += 0.3
+        if query_country and query_country in entry.nationality_codes:
+            score += 0.2
+        if query_country and query_country in entry.program_codes:
+            score += 0.15
+        candidate_type = entry_type(entry)
+        if (candidate_type == 'individual' and query_type in (None, 'individual')) or query_type == candidate_type:
+            score += 0.05
+        if entry.remarks:
+            remarks_lower = entry.remarks.lower()
+            score += 0.02 * sum(1 for word in query_name.split() if word in remarks_lower)
+        scores.append(min(score, 1.0))
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("sdn_file", help="Path to the SDN CSV")
+    parser.add_argument("--candidates", default="10,100,1000,5000", help="Comma-separated candidate counts")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    service = SDNSearchService(args.sdn_file, use_llm=False, variation_mode='local')
+    scorer = service.ranker.context
+    rng = random.Random(args.seed)
+    people = [e for e in service.entries if e.dob and e.nationality]
+
+    print(f"{'candidates':>10} {'per-candidate ms':>17} {'columns ms':>11} {'speedup':>8} {'differing':>10}")
+    for count in (int(c) for c in args.candidates.split(",")):
+        count = min(count, len(service.entries))
+        loop_times, column_times, differing = [], [], 0
+        for _ in range(args.queries):
+            target = rng.choice(people)
+            query = rng.choice(QUERIES).format(name=target.name.split(",")[0], dob=target.dob.split(";")[0],
+                                               nationality=target.nationality)
+            query_info = service._parse_query(query)
+            matches = [{'entry': e, 'score': rng.uniform(0.4, 1.0), 'match_reasons': []}
+                       for e in rng.sample(service.entries, count)]
+
+            started = time.perf_counter()
+            expected = per_candidate_scores(query_info, matches)
+            loop_times.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            actual = scorer.score(query_info, matches)
+            column_times.append(time.perf_counter() - started)
+
+            differing += sum(abs(a - e) > 1e-9 for (a, _), e in zip(actual, expected))
+
+        loop_ms = statistics.median(loop_times) * 1000
+        column_ms = statistics.median(column_times) * 1000
+        print(f"{count:>10} {loop_ms:>17.3f} {column_ms:>11.3f} {loop_ms / column_ms:>7.1f}x {differing:>10}")
+
+
+if __name__ == "__main__":
+    main()
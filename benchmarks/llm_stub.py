@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Stand-in OpenAI chat completions server for load tests.
+
+Answers POST /v1/chat/completions with a canned response for each prompt
+kind (name variations, match assessment, explanation) after a configurable
+latency, so a local instance exercises its full LLM path without calling
+the provider. Point the apps at it with OPENAI_BASE_URL:
+
+    python benchmarks/llm_stub.py --port 8999 --latency-ms 800
+    OPENAI_BASE_URL=http://127.0.0.1:8999/v1 OPENAI_API_KEY=stub python run_merged_app.py
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sdn_api.core.prompts import VARIATIONS_SYSTEM, ASSESSMENT_SYSTEM
+
+PERSON_PATTERN = re.compile(r'Person: "(.*)"\s*$')
+
+ASSESSMENT = {
+    "is_match": True,
+    "confidence": "MEDIUM",
+    "score": 0.6,
+    "reasoning": "Stubbed assessment for load testing."
+}
+
+EXPLANATION = (
+    "Stubbed explanation for load testing. The name is similar to the listed entry; "
+    "date of birth and nationality should be verified before escalation."
+)
+
+
+def completion_content(messages) -> str:
+    system = messages[0].get("content", "") if messages else ""
+    user = messages[-1].get("content", "") if messages else ""
+    if system == VARIATIONS_SYSTEM:
+        match = PERSON_PATTERN.search(user)
+        name = match.group(1) if match else ""
+        parts = name.split()
+        variations = [name, " ".join(reversed(parts))] if len(parts) > 1 else [name]
+        return json.dumps(variations)
+    if system == ASSESSMENT_SYSTEM:
+        return json.dumps(ASSESSMENT)
+    return EXPLANATION
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    jitter = 0.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, delay))
+        content = completion_content(body.get("messages", []))
+        payload = json.dumps({
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (timeout or server shutting down)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(port: int = 0, latency_ms: float = 0.0, jitter_ms: float = 0.0) -> ThreadingHTTPServer:
+    """Serve the stub on a background thread; ``server.server_port`` is the bound port."""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {
+        "latency": latency_ms / 1000,
+        "jitter": jitter_ms / 1000
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="llm-stub", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Mean latency per completion")
+    parser.add_argument("--jitter-ms", type=float, default=200.0, help="Uniform +/- jitter on the latency")
+    args = parser.parse_args()
+
+    server = start_stub(args.port, args.latency_ms, args.jitter_ms)
+    print(f"LLM stub at http://127.0.0.1:{server.server_port}/v1 "
+          f"({args.latency_ms:.0f}ms +/- {args.jitter_ms:.0f}ms per completion)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+HTTP load generator and traffic replayer for the /search endpoint.
+
+Starts a local instance (or targets --url) with the LLM replaced by
+benchmarks/llm_stub.py, then steps through load levels and reports
+throughput, latency percentiles, error rate and the saturation point.
+
+Closed loop: N clients send back-to-back requests (--concurrency 1,4,16).
+Open loop: requests arrive at a fixed rate whether or not earlier ones have
+finished (--rates 5,10,20); latency is measured from the scheduled send time,
+so queueing inside the server is not hidden by a slow client.
+
+Queries are drawn from a synthetic mix built from the SDN file (exact names,
+typos, names with DOB and nationality, misses) or replayed from a recorded
+log (--replay): JSONL /search bodies with an optional "ts", the app's own
+"Starting search for" log lines, or one query per line. --replay-timing
+sends replayed queries at their recorded spacing.
+
+    python benchmarks/load_test.py data/sdn.csv --app merged --mode closed --concurrency 1,2,4,8
+    python benchmarks/load_test.py data/sdn.csv --app api --mode open --rates 2,5,10 --slo-ms 3000
+    python benchmarks/load_test.py data/sdn.csv --app asgi --server uvicorn --workers 2 --replay queries.jsonl
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from llm_stub import start_stub
+
+APPS = {
+    'merged': 'run_merged_app:app',
+    'api': 'sdn_api.api.main:app',
+    'ui': 'flask_ui.app.app:app',
+    'asgi': 'sdn_api.api.asgi:app',
+}
+
+SERVERS = ('dev', 'gunicorn', 'uvicorn')
+
+DEFAULT_MIX = "exact=0.4,typo=0.3,context=0.2,miss=0.1"
+
+# A step is saturated when it misses the SLO, errors more than this, or
+# (open loop) completes less than this share of the offered rate
+MAX_ERROR_RATE = 0.01
+MIN_DELIVERED = 0.95
+# Closed loop: more clients that add less than this throughput mark the knee
+MIN_THROUGHPUT_GAIN = 0.10
+
+LOG_QUERY_PATTERN = re.compile(r"Starting (?:async )?search for: '(.*)'")
+
+SYLLABLES = ["ka", "ro", "mi", "len", "dar", "vo", "shi", "tan", "bel", "qu", "zor", "ami", "nek", "ul"]
+
+
+# Queries
+
+def _typo(name: str, rng: random.Random) -> str:
+    if len(name) < 4:
+        return name
+    i = rng.randrange(1, len(name) - 1)
+    edit = rng.choice(('drop', 'swap', 'double'))
+    if edit == 'drop':
+        return name[:i] + name[i + 1:]
+    if edit == 'swap':
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return name[:i] + name[i] + name[i:]
+
+
+def _miss(rng: random.Random) -> str:
+    return " ".join(
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+        for _ in range(2)
+    )
+
+
+def synthetic_queries(sdn_file: str, mix: Dict[str, float], count: int, seed: int) -> List[Dict]:
+    """Request bodies drawn from the list according to the mix weights."""
+    from sdn_api.core.data_loader import SDNDataLoader
+
+    rng = random.Random(seed)
+    entries = SDNDataLoader(sdn_file).load_entries()
+    with_dob = [e for e in entries if e.dob] or entries
+    kinds, weights = zip(*mix.items())
+    bodies = []
+    for _ in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == 'exact':
+            query = rng.choice(entries).name
+        elif kind == 'typo':
+            query = _typo(rng.choice(entries).name, rng)
+        elif kind == 'context':
+            entry = rng.choice(with_dob)
+            query = ", ".join(part for part in (entry.name, entry.dob, entry.nationality) if part)
+        elif kind == 'miss':
+            query = _miss(rng)
+        else:
+            raise ValueError(f"Unknown query kind '{kind}' in mix")
+        bodies.append({'query': query, 'max_results': 10})
+    return bodies
+
+
+def _parse_ts(value) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        for fmt in ("%Y-%m-%d %H:%M:%S,%f", "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S"):
+            try:
+                return datetime.strptime(value, fmt).timestamp()
+            except ValueError:
+                continue
+    return None
+
+
+def replay_queries(path: str) -> List[Tuple[Optional[float], Dict]]:
+    """(timestamp, body) pairs from a recorded query log, in file order."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            ts, body = None, None
+            if line.startswith("{"):
+                record = json.loads(line)
+                ts = _parse_ts(record.get("ts"))
+                if "query" in record:
+                    body = {k: v for k, v in record.items() if k != "ts"}
+                else:
+                    match = LOG_QUERY_PATTERN.search(record.get("message", ""))
+                    body = {'query': match.group(1)} if match else None
+            else:
+                match = LOG_QUERY_PATTERN.search(line)
+                if match:
+                    ts = _parse_ts(line.split(" - ", 1)[0])
+                    body = {'query': match.group(1)}
+                elif " - " not in line:
+                    body = {'query': line}
+            if body:
+                records.append((ts, body))
+    if not records:
+        raise ValueError(f"No queries found in {path}")
+    return records
+
+
+# Server under test
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app: str, server: str, workers: int, port: int, env: Dict[str, str], log_path: str):
+    target = APPS[app]
+    module, attr = target.split(":")
+    if server == 'dev':
+        command = [sys.executable, "-c",
+                   f"from {module} import {attr}; {attr}.run(host='127.0.0.1', port={port}, threaded=True)"]
+    elif server == 'gunicorn':
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+                   "-b", f"127.0.0.1:{port}", "-w", str(workers), target]
+    else:
+        command = [sys.executable, "-m", "uvicorn", target, "--host", "127.0.0.1",
+                   "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    log = open(log_path, "w")
+    return subprocess.Popen(command, cwd=ROOT, env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_ready(base_url: str, process, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}; see the server log")
+        try:
+            status, body = Client(base_url, 5.0).request("GET", "/health")
+            if status == 200 and json.loads(body).get("sdn_loaded"):
+                return
+        except (OSError, http.client.HTTPException, ValueError):
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} not ready after {timeout:.0f}s")
+
+
+# Load generation
+
+class Client:
+    """Keep-alive HTTP connection, reopened after any error."""
+
+    def __init__(self, base_url: str, timeout: float):
+        url = urlparse(base_url)
+        self.host, self.port, self.timeout = url.hostname, url.port or 80, timeout
+        self.conn = None
+
+    def request(self, method: str, path: str, body: Optional[Dict] = None) -> Tuple[int, bytes]:
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            payload = json.dumps(body).encode("utf-8") if body is not None else None
+            headers = {"Content-Type": "application/json"} if payload else {}
+            self.conn.request(method, path, payload, headers)
+            response = self.conn.getresponse()
+            return response.status, response.read()
+        except Exception:
+            self.conn.close()
+            self.conn = None
+            raise
+
+
+class Recorder:
+    """Thread-safe list of (latency seconds, ok) samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: List[Tuple[float, bool]] = []
+
+    def add(self, latency: float, ok: bool):
+        with self._lock:
+            self.samples.append((latency, ok))
+
+
+class QuerySource:
+    def __init__(self, bodies: List[Dict]):
+        self.bodies = bodies
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def next(self) -> Dict:
+        with self._lock:
+            body = self.bodies[self._next % len(self.bodies)]
+            self._next += 1
+            return body
+
+
+def send(client: Client, body: Dict, started: float, recorder: Optional[Recorder]):
+    try:
+        status, payload = client.request("POST", "/search", body)
+        ok = status == 200 and b'"error"' not in payload[:200]
+    except (OSError, http.client.HTTPException):
+        ok = False
+    if recorder is not None:
+        recorder.add(time.perf_counter() - started, ok)
+
+
+def run_closed(base_url: str, source: QuerySource, concurrency: int, duration: float,
+               warmup: float, timeout: float) -> Tuple[Recorder, float]:
+    recorder = Recorder()
+    begin = time.perf_counter()
+    measure_from, end = begin + warmup, begin + warmup + duration
+
+    def worker():
+        client = Client(base_url, timeout)
+        while True:
+            started = time.perf_counter()
+            if started >= end:
+                return
+            send(client, source.next(), started, recorder if started >= measure_from else None)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder, time.perf_counter() - measure_from
+
+
+def run_open(base_url: str, source: QuerySource, schedule: List[float], warmup: float,
+             timeout: float, max_in_flight: int) -> Tuple[Recorder, float]:
+    """Send one request at each scheduled offset (seconds); warm-up sends are not recorded."""
+    recorder = Recorder()
+    local = threading.local()
+
+    def fire(body, scheduled, record):
+        if not hasattr(local, "client"):
+            local.client = Client(base_url, timeout)
+        send(local.client, body, scheduled, recorder if record else None)
+
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        for offset in schedule:
+            scheduled = begin + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, source.next(), scheduled, offset >= warmup)
+    return recorder, time.perf_counter() - begin - warmup
+
+
+def arrivals(rate: float, duration: float, rng: random.Random, poisson: bool) -> List[float]:
+    offsets, t = [], 0.0
+    while True:
+        t += rng.expovariate(rate) if poisson else 1.0 / rate
+        if t >= duration:
+            return offsets
+        offsets.append(t)
+
+
+# Reporting
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))]
+
+
+def summarize(label: str, recorder: Recorder, elapsed: float, offered: Optional[float]) -> Dict:
+    latencies = sorted(latency for latency, ok in recorder.samples if ok)
+    total = len(recorder.samples)
+    errors = total - len(latencies)
+    ms = lambda p: round(percentile(latencies, p) * 1000, 1)
+    return {
+        'step': label,
+        'requests': total,
+        'errors': errors,
+        'error_rate': round(errors / total, 4) if total else 0.0,
+        'offered_rps': offered,
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+        'p50_ms': ms(50), 'p90_ms': ms(90), 'p95_ms': ms(95), 'p99_ms': ms(99),
+        'max_ms': round(latencies[-1] * 1000, 1) if latencies else 0.0,
+    }
+
+
+def find_saturation(steps: List[Dict], slo_ms: float, mode: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """(last sustainable step, first saturated step) under the SLO and error budget."""
+    sustainable, previous = None, None
+    for step in steps:
+        saturated = step['p99_ms'] > slo_ms or step['error_rate'] > MAX_ERROR_RATE or not step['requests']
+        if mode == 'open' and step['offered_rps']:
+            saturated |= step['throughput_rps'] < MIN_DELIVERED * step['offered_rps']
+        elif mode == 'closed' and previous is not None:
+            saturated |= step['throughput_rps'] < (1 + MIN_THROUGHPUT_GAIN) * previous['throughput_rps']
+        if saturated:
+            return sustainable, step
+        sustainable = previous = step
+    return sustainable, None
+
+
+def print_report(title: str, steps: List[Dict], slo_ms: float, mode: str):
+    print(f"\n{title}")
+    print(f"{'step':>14} {'reqs':>6} {'err%':>6} {'rps':>8} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for s in steps:
+        print(f"{s['step']:>14} {s['requests']:>6} {s['error_rate'] * 100:>5.1f}% {s['throughput_rps']:>8.2f} "
+              f"{s['p50_ms']:>8.1f} {s['p90_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['max_ms']:>8.1f}")
+    if len(steps) > 1 or mode == 'open':
+        sustainable, saturated = find_saturation(steps, slo_ms, mode)
+        if sustainable:
+            print(f"Max sustainable: {sustainable['throughput_rps']:.2f} rps at {sustainable['step']} "
+                  f"(p99 {sustainable['p99_ms']:.0f}ms <= SLO {slo_ms:.0f}ms)")
+        else:
+            print(f"No step met the p99 SLO of {slo_ms:.0f}ms")
+        if saturated:
+            print(f"Saturated at {saturated['step']}")
+        else:
+            print("Not saturated at the highest step; raise --concurrency or --rates")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        mix[kind.strip()] = float(weight or 1)
+    return mix
+
+
+def parse_steps(spec: str, cast):
+    return [cast(v) for v in spec.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument("sdn_file", help="SDN CSV the server loads and the synthetic mix is drawn from")
+    target = parser.add_argument_group("server under test")
+    target.add_argument("--url", help="Target a running server instead of starting one")
+    target.add_argument("--app", choices=sorted(APPS), default="merged")
+    target.add_argument("--server", choices=SERVERS, help="Default: dev for Flask apps, uvicorn for asgi")
+    target.add_argument("--workers", type=int, default=2, help="gunicorn/uvicorn workers")
+    target.add_argument("--no-llm", action="store_true", help="Serve with USE_LLM=false instead of the stub")
+    target.add_argument("--llm-latency-ms", type=float, default=800.0)
+    target.add_argument("--llm-jitter-ms", type=float, default=200.0)
+    target.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra server environment, e.g. --env EXPLANATION_MODE=background")
+    target.add_argument("--startup-timeout", type=float, default=180.0)
+    target.add_argument("--server-log", default=str(Path(tempfile.gettempdir()) / "sdn_load_test_server.log"),
+                        help="Where the started server's output goes")
+    load = parser.add_argument_group("load")
+    load.add_argument("--mode", choices=("closed", "open"), default="closed")
+    load.add_argument("--concurrency", default="1,2,4,8", help="Closed-loop client counts, one step each")
+    load.add_argument("--rates", default="1,2,4,8", help="Open-loop arrival rates (req/s), one step each")
+    load.add_argument("--uniform", action="store_true", help="Open loop: evenly spaced instead of Poisson arrivals")
+    load.add_argument("--max-in-flight", type=int, default=512, help="Open-loop client threads")
+    load.add_argument("--duration", type=float, default=30.0, help="Measured seconds per step")
+    load.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before each step")
+    load.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout")
+    load.add_argument("--slo-ms", type=float, default=2000.0, help="p99 target that defines saturation")
+    queries = parser.add_argument_group("queries")
+    queries.add_argument("--mix", default=DEFAULT_MIX, help="Weights of exact, typo, context and miss queries")
+    queries.add_argument("--queries", type=int, default=2000, help="Synthetic queries to generate")
+    queries.add_argument("--replay", help="Recorded query log to replay instead of the synthetic mix")
+    queries.add_argument("--replay-timing", action="store_true", help="Send replayed queries at their recorded spacing")
+    queries.add_argument("--speed", type=float, default=1.0, help="Replay time compression factor")
+    queries.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the step results as JSON")
+    args = parser.parse_args()
+
+    server = args.server or ('uvicorn' if args.app == 'asgi' else 'dev')
+    rng = random.Random(args.seed)
+    if args.replay:
+        recorded = replay_queries(args.replay)
+        bodies = [body for _, body in recorded]
+    else:
+        recorded = None
+        bodies = synthetic_queries(args.sdn_file, parse_mix(args.mix), args.queries, args.seed)
+    source = QuerySource(bodies)
+
+    stub, process = None, None
+    base_url = args.url
+    if not base_url:
+        env = {
+            'SDN_FILE_PATH': str(Path(args.sdn_file).resolve()),
+            'USE_LLM': 'false' if args.no_llm else 'true',
+            'LOG_LEVEL': 'WARNING',
+        }
+        if not args.no_llm:
+            stub = start_stub(0, args.llm_latency_ms, args.llm_jitter_ms)
+            env.update(OPENAI_BASE_URL=f"http://127.0.0.1:{stub.server_port}/v1", OPENAI_API_KEY="stub")
+        env.update(item.split("=", 1) for item in args.env)
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        process = start_server(args.app, server, args.workers, port, env, args.server_log)
+    try:
+        wait_ready(base_url, process, args.startup_timeout)
+        steps = []
+        if recorded and args.replay_timing:
+            times = [ts for ts, _ in recorded]
+            if None in times:
+                raise ValueError("--replay-timing needs a timestamp on every replayed record")
+            schedule = [(ts - times[0]) / args.speed for ts in times]
+            recorder, elapsed = run_open(base_url, source, schedule, 0.0, args.timeout, args.max_in_flight)
+            steps.append(summarize(f"replay x{args.speed:g}", recorder, elapsed, len(schedule) / max(elapsed, 1e-9)))
+        elif args.mode == 'closed':
+            for concurrency in parse_steps(args.concurrency, int):
+                recorder, elapsed = run_closed(base_url, source, concurrency, args.duration, args.warmup, args.timeout)
+                steps.append(summarize(f"{concurrency} clients", recorder, elapsed, None))
+                print(f"  {steps[-1]['step']}: {steps[-1]['throughput_rps']} rps, p99 {steps[-1]['p99_ms']}ms")
+        else:
+            for rate in parse_steps(args.rates, float):
+                schedule = arrivals(rate, args.warmup + args.duration, rng, not args.uniform)
+                recorder, elapsed = run_open(base_url, source, schedule, args.warmup, args.timeout, args.max_in_flight)
+                steps.append(summarize(f"{rate:g} rps", recorder, elapsed, rate))
+                print(f"  {steps[-1]['step']}: {steps[-1]['throughput_rps']} rps, p99 {steps[-1]['p99_ms']}ms")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        if stub is not None:
+            stub.shutdown()
+
+    llm = "no LLM" if args.no_llm else f"stub LLM {args.llm_latency_ms:.0f}ms"
+    config = args.url or f"{args.app} on {server}" + (f" x{args.workers}" if server != 'dev' else "")
+    source_label = f"replay of {args.replay}" if args.replay else f"mix {args.mix}"
+    mode = 'open' if recorded and args.replay_timing else args.mode
+    print_report(f"{config}, {llm}, {mode} loop, {source_label}", steps, args.slo_ms, mode)
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            'config': config, 'llm': llm, 'mode': mode, 'queries': source_label,
+            'slo_ms': args.slo_ms, 'steps': steps
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
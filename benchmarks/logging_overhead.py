@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Measure logging overhead per search.
+
+Runs each local (no-LLM) search with logging disabled, with a synchronous
+StreamHandler on every logger (the previous setup), and with the shared
+queue handler, interleaved, and reports median search time. Output goes to
+/dev/null so only the cost on the request path is measured.
+
+    LOG_DEBUG_SAMPLE_RATE=0.01 python benchmarks/logging_overhead.py data/sdn.csv
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sdn_api.core.search_service import SDNSearchService
+from sdn_api.utils import logger as log_module
+
+
+def sdn_loggers():
+    return [logging.getLogger(name) for name in list(logging.root.manager.loggerDict)
+            if name.startswith("sdn_api") and logging.getLogger(name).handlers]
+
+
+def timed_search(service, query):
+    log_module.bind_request()
+    started = time.perf_counter()
+    service.search(query, 10)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("sdn_file", help="Path to the SDN CSV")
+    parser.add_argument("--queries", type=int, default=50, help="Distinct queries drawn from the list")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--records", type=int, default=20000, help="Records for the per-record measurement")
+    args = parser.parse_args()
+
+    service = SDNSearchService(args.sdn_file, use_llm=False, variation_mode='local')
+    random.seed(0)
+    queries = [entry.name for entry in random.sample(service.entries, min(args.queries, len(service.entries)))]
+    devnull = open(os.devnull, "w")
+
+    log_module._output.setStream(devnull)
+    sync_handler = logging.StreamHandler(devnull)
+    sync_handler.setFormatter(logging.Formatter(log_module.DEFAULT_FORMAT))
+    sync_handler.addFilter(log_module.ContextFilter())
+    loggers = sdn_loggers()
+    queue_handlers = {lg.name: lg.handlers for lg in loggers}
+
+    def disabled(query):
+        logging.disable(logging.CRITICAL)
+        try:
+            return timed_search(service, query)
+        finally:
+            logging.disable(logging.NOTSET)
+
+    def synchronous(query):
+        # Synchronous handlers format and write on the calling thread
+        for lg in loggers:
+            lg.handlers = [sync_handler]
+        try:
+            return timed_search(service, query)
+        finally:
+            for lg in loggers:
+                lg.handlers = queue_handlers[lg.name]
+
+    def queued(query):
+        return timed_search(service, query)
+
+    # Interleave the setups per query so drift in search time cancels out
+    modes = {'logging disabled': disabled, 'synchronous': synchronous, 'queue handler': queued}
+    timings = {label: [] for label in modes}
+    for query in queries[:5]:
+        queued(query)  # warm up
+    for _ in range(args.rounds):
+        for query in queries:
+            for label, mode in modes.items():
+                timings[label].append(mode(query))
+    medians = {label: statistics.median(values) * 1000 for label, values in timings.items()}
+    baseline = medians['logging disabled']
+
+    print(f"{len(queries)} queries x {args.rounds} rounds over {len(service.entries)} entries "
+          f"(LOG_LEVEL={log_module.LOG_LEVEL}, LOG_DEBUG_SAMPLE_RATE={log_module.LOG_DEBUG_SAMPLE_RATE})")
+    for label, median in medians.items():
+        print(f"  {label:<17} {median:8.2f} ms/search  (+{median - baseline:.3f} ms)")
+
+    # Calling-thread cost of one INFO record, isolated from search noise
+    probe = loggers[0]
+    for label, handlers in (('synchronous', [sync_handler]), ('queue handler', queue_handlers[probe.name])):
+        probe.handlers = handlers
+        started = time.perf_counter()
+        for i in range(args.records):
+            probe.info("Filtered to %d matches above threshold %s", i, 0.7)
+        per_record = (time.perf_counter() - started) / args.records * 1e6
+        print(f"  {label:<17} {per_record:8.2f} us/record on the calling thread")
+    probe.handlers = queue_handlers[probe.name]
+
+
+if __name__ == "__main__":
+    main()
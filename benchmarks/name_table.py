@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Measure name scoring with and without the unique-string table.
+
+Runs the same local (no-LLM) name filtering per query twice: scoring every
+name and alias occurrence of every candidate (the previous behavior), and
+scoring each distinct string once through the NameTable. Reports the size
+of the table, the fuzzy comparisons made and saved, and median
+milliseconds per query. The match lists are checked to be identical.
+
+    python benchmarks/name_table.py data/sdn.csv --queries 200
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sdn_api.core.search_service import SDNSearchService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("sdn_file", help="Path to the SDN CSV")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    service = SDNSearchService(args.sdn_file, use_llm=False, variation_mode='local')
+    matcher = service.name_matcher
+    table = matcher.name_table
+    shared = sum(1 for owners in table.owners if len(owners) > 1)
+    print(f"{len(service.entries):,} entries, {table.occurrences:,} name/alias occurrences, "
+          f"{len(table.strings):,} distinct strings ({shared:,} shared by several entries, "
+          f"max {max(map(len, table.owners)):,} owners)")
+
+    rng = random.Random(args.seed)
+    queries = []
+    for _ in range(args.queries):
+        entry = rng.choice(service.entries)
+        name = rng.choice([entry.name] + entry.aliases)
+        queries.append(name if rng.random() < 0.5 else name[:-1])
+
+    per_occurrence, per_string, made, saved, candidates = [], [], 0, 0, 0
+    for query in queries:
+        variations = matcher.generate_query_variations(query, use_llm=False)
+        narrowed = matcher._narrow_by_tokens(variations, service.entries)
+        candidates += len(narrowed)
+
+        matcher.name_table = None
+        started = time.perf_counter()
+        expected = matcher.filter_matches(variations, service.entries)
+        per_occurrence.append(time.perf_counter() - started)
+
+        matcher.name_table = table
+        started = time.perf_counter()
+        actual = matcher.filter_matches(variations, service.entries)
+        per_string.append(time.perf_counter() - started)
+
+        if [(m['entry'].id, m['score']) for m in actual] != [(m['entry'].id, m['score']) for m in expected]:
+            raise AssertionError(f"Results differ for '{query}'")
+        _, work = table.score(variations, narrowed, matcher._fuzzy_match_score)
+        made += work['comparisons']
+        saved += work['saved']
+
+    before, after = statistics.median(per_occurrence) * 1000, statistics.median(per_string) * 1000
+    print(f"{args.queries} queries, {candidates / args.queries:.0f} candidates per query after token narrowing")
+    print(f"fuzzy comparisons: {made + saved:,} per occurrence -> {made:,} per distinct string "
+          f"({saved:,} saved, {saved / max(made + saved, 1):.0%})")
+    print(f"median per query: {before:.2f} ms per occurrence, {after:.2f} ms per distinct string "
+          f"({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Compare LLM prompt sizes with and without field truncation.
+
+Builds the assessment and explanation prompts for every entry in the SDN
+list against a fixed query and reports token statistics for an untruncated
+builder and for the configured field budget, and the size of each call
+kind's static prefix against the minimum OpenAI caches.
+
+    python benchmarks/prompt_size.py data/sdn.csv --budget 600
+"""
+import argparse
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sdn_api.core.data_loader import SDNDataLoader
+from sdn_api.core.prompts import PROMPT_CACHE_MIN_TOKENS, PromptBuilder, _encoding, static_prefix_tokens
+
+
+def summarize(label: str, sizes):
+    sizes = sorted(sizes)
+    p95 = sizes[int(len(sizes) * 0.95) - 1] if len(sizes) >= 20 else sizes[-1]
+    print(f"  {label:<12} mean {statistics.mean(sizes):8.1f}  p95 {p95:6d}  max {sizes[-1]:6d}  total {sum(sizes):10d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("sdn_file", help="Path to the SDN CSV")
+    parser.add_argument("--budget", type=int, default=600, help="Field token budget to compare against")
+    args = parser.parse_args()
+
+    entries = SDNDataLoader(args.sdn_file).load_entries()
+    query_info = {'name': 'John Smith', 'dob': '1970', 'nationality': 'Iran'}
+    print(f"{len(entries)} entries, token counts {'from tiktoken' if _encoding() else 'estimated at 4 chars/token'}")
+
+    for label, builder in (("untruncated", PromptBuilder(None)), (f"budget {args.budget}", PromptBuilder(args.budget))):
+        print(label)
+        assessments = [builder.assessment(query_info, {'entry': e}) for e in entries]
+        explanations = [builder.explanation(query_info, {'entry': e, 'name_match_score': 0.9,
+                                                         'llm_score': 0.9, 'confidence': 'HIGH'})
+                        for e in entries]
+        summarize("assessment", [p.tokens for p in assessments])
+        summarize("explanation", [p.tokens for p in explanations])
+        print(f"  truncated    {sum(bool(p.truncated) for p in assessments)} of {len(assessments)} candidates")
+
+    print(f"static prefix (cacheable from {PROMPT_CACHE_MIN_TOKENS} tokens)")
+    for kind, tokens in static_prefix_tokens().items():
+        print(f"  {kind:<12} {tokens:6d}  {'cacheable' if tokens >= PROMPT_CACHE_MIN_TOKENS else 'below minimum'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Measure typeahead latency of the /suggest prefix index.
+
+Builds the SDN search service (no LLM), then replays what an analyst types:
+every prefix of randomly chosen names and aliases, in list ("LAST, First")
+or natural ("First Last") order. Reports the index size, its build time, and
+median, p99 and maximum milliseconds per suggest call, including the
+response models.
+
+    python benchmarks/suggest.py data/sdn.csv --names 500
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sdn_api.core.search_service import SDNSearchService
+from sdn_api.core.suggest import SuggestIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("sdn_file", help="Path to the SDN CSV")
+    parser.add_argument("--names", type=int, default=500, help="Names to type out, one prefix at a time")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    service = SDNSearchService(args.sdn_file, use_llm=False, variation_mode='local')
+    started = time.perf_counter()
+    index = SuggestIndex(service.name_matcher.name_table)
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"{len(service.entries):,} entries, {len(index.keys):,} keys, "
+          f"{len(index.top):,} precomputed prefixes, built in {build_ms:.0f} ms")
+
+    rng = random.Random(args.seed)
+    times, empty = [], 0
+    for _ in range(args.names):
+        entry = rng.choice(service.entries)
+        name = rng.choice([entry.name] + entry.aliases)
+        if "," in name and rng.random() < 0.5:
+            last, first = name.split(",", 1)
+            name = f"{first.strip()} {last}"
+        for end in range(1, len(name) + 1):
+            started = time.perf_counter()
+            response = service.suggest(name[:end], args.limit)
+            times.append(time.perf_counter() - started)
+            empty += not response.suggestions
+
+    times.sort()
+    print(f"{len(times):,} keystrokes, {empty:,} with no completion")
+    print(f"per call: median {statistics.median(times) * 1000:.3f} ms, "
+          f"p99 {times[int(len(times) * 0.99)] * 1000:.3f} ms, max {times[-1] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Measure load time and peak memory of the SDN loaders.
+
+Loads the legacy CSV and the SDN_ADVANCED.xml export of the same list, each
+in a fresh process so peak RSS is its own, and reports entries loaded,
+seconds and peak RSS. For reference, the XML is also parsed whole into an
+ElementTree (what a DOM loader would hold before building a single entry).
+
+    python benchmarks/xml_loader.py data/sdn.csv data/sdn_advanced.xml --runs 3
+"""
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+MODES = ('csv', 'xml', 'dom')
+
+
+def child(mode: str, path: str):
+    """Load once in this process and print the measurements as JSON."""
+    started = time.perf_counter()
+    if mode == 'dom':
+        import xml.etree.ElementTree as ET
+        count = sum(1 for elem in ET.parse(path).getroot().iter() if elem.tag.endswith('DistinctParty'))
+    else:
+        from sdn_api.core.data_loader import SDNDataLoader
+        count = len(SDNDataLoader(path).load_entries())
+    elapsed = time.perf_counter() - started
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    print(json.dumps({'entries': count, 'seconds': elapsed, 'peak_mb': peak_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("csv_file", help="Path to the SDN CSV")
+    parser.add_argument("xml_file", help="Path to SDN_ADVANCED.xml for the same list")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.xml_file if args.child != 'csv' else args.csv_file)
+        return
+
+    print(f"{'loader':<12} {'file MB':>8} {'entries':>8} {'seconds':>8} {'peak RSS MB':>12}")
+    for mode, label in (('csv', 'csv'), ('xml', 'xml stream'), ('dom', 'xml DOM')):
+        path = args.csv_file if mode == 'csv' else args.xml_file
+        runs = []
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, __file__, args.csv_file, args.xml_file, "--child", mode],
+                check=True, capture_output=True, text=True
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        size_mb = Path(path).stat().st_size / (1024 * 1024)
+        print(f"{label:<12} {size_mb:>8.1f} {runs[0]['entries']:>8,} "
+              f"{statistics.median(r['seconds'] for r in runs):>8.2f} "
+              f"{statistics.median(r['peak_mb'] for r in runs):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
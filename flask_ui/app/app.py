@@ -4,9 +4,10 @@ from pathlib import Path
 import traceback
 from dotenv import load_dotenv
 
-from sdn_api.core.search_service import SDNSearchService
+from sdn_api.api.startup import BackgroundService
 from sdn_api.config import settings
-from sdn_api.utils.logger import setup_logger
+from sdn_api.utils.logger import setup_logger, bind_request, get_correlation_id
+from sdn_api.utils.profiling import RequestProfiler, install_flask_profiling
 
 load_dotenv()
 
@@ -14,14 +15,30 @@ app = Flask(__name__, template_folder='../templates', static_folder='../static')
 
 logger = setup_logger(__name__)
 
-# Initialize search service directly
+@app.before_request
+def bind_correlation_id():
+    """Tag every log line of the request with the caller's X-Request-ID or a fresh id."""
+    bind_request(request.headers.get('X-Request-ID'))
+
+@app.after_request
+def add_correlation_header(response):
+    response.headers['X-Request-ID'] = get_correlation_id()
+    return response
+
+# Opt-in request profiling; no hooks are installed unless configured
+profiler = RequestProfiler(
+    settings.profile_dir or None,
+    settings.profile_token,
+    settings.profile_sample_rate,
+    settings.profile_format
+)
+if profiler.enabled:
+    install_flask_profiling(app, profiler)
+
+# Load the list and build the search service in the background, so the port
+# is bound straight away; /ready reports when searches can be served
 SDN_FILE_PATH = Path(__file__).parent.parent.parent / settings.sdn_file_path
-try:
-    search_service = SDNSearchService(str(SDN_FILE_PATH), use_llm=settings.use_llm)
-    logger.info(f"Initialized SDN Search Service with LLM: {settings.use_llm}")
-except FileNotFoundError:
-    logger.error(f"SDN file not found at {SDN_FILE_PATH}")
-    search_service = None
+startup = BackgroundService(str(SDN_FILE_PATH))
 
 @app.route('/')
 def index():
@@ -29,6 +46,7 @@ def index():
 
 @app.route('/search', methods=['POST'])
 def search():
+    search_service = startup.service
     if not search_service:
         return jsonify({"error": "SDN data not loaded"}), 503
     
@@ -37,39 +55,97 @@ def search():
         query = data.get('query', '')
         max_results = data.get('max_results', 10)
         
-        results = search_service.search(query, max_results)
+        response = search_service.search_response(
+            query,
+            max_results,
+            data.get('filters'),
+            data.get('exclude_dob_mismatches', False),
+            data.get('latency_budget_ms'),
+            data.get('entity_type')
+        )
         
-        return jsonify({
-            "query": query,
-            "total_matches": len(results),
-            "results": [result.dict() for result in results]
-        })
+        return jsonify(response.dict())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Search error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/search/identifier', methods=['POST'])
+def search_identifier():
+    """Exact lookup of a passport, national ID, IMO number, SWIFT/BIC or tax ID."""
+    search_service = startup.service
+    if not search_service:
+        return jsonify({"error": "SDN data not loaded"}), 503
+    
+    try:
+        data = request.get_json()
+        response = search_service.search_identifier(
+            data.get('identifier', ''),
+            data.get('kind'),
+            data.get('max_results', 10),
+            data.get('filters')
+        )
+        
+        return jsonify(response.dict())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Identifier search error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/suggest')
+def suggest():
+    """Typeahead completions for a partly typed name: ``?q=<text>&limit=<n>``."""
+    search_service = startup.service
+    if not search_service:
+        return jsonify({"error": "SDN data not loaded"}), 503
+    
+    try:
+        response = search_service.suggest(request.args.get('q', ''), request.args.get('limit', 10, type=int))
+        return jsonify(response.dict())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
 @app.route('/health')
 def health():
+    search_service = startup.service
     return jsonify({
         "status": "healthy",
         "sdn_loaded": search_service is not None,
         "entries_count": len(search_service.entries) if search_service else 0
     })
 
+@app.route('/live')
+def live():
+    """Liveness: the process is up and serving requests, whether or not the list is loaded."""
+    return jsonify({'status': 'alive'})
+
+@app.route('/ready')
+def ready():
+    """Readiness: 200 once the list is loaded and the indexes are built, 503 until then."""
+    status = startup.status()
+    return jsonify(status), 200 if status['status'] == 'ready' else 503
+
 @app.route('/stats')
 def stats():
+    search_service = startup.service
     if not search_service:
         return jsonify({"error": "SDN data not loaded"}), 503
     
-    individuals = sum(1 for e in search_service.entries if 'individual' in e.type.lower())
-    entities = len(search_service.entries) - individuals
+    return jsonify(search_service.get_stats())
+
+@app.route('/explanations/<job_id>')
+def explanation(job_id):
+    """Poll a background explanation job; ``?wait=<seconds>`` long-polls."""
+    search_service = startup.service
+    if not search_service:
+        return jsonify({"error": "SDN data not loaded"}), 503
     
-    return jsonify({
-        "total_entries": len(search_service.entries),
-        "individuals": individuals,
-        "entities": entities,
-        "programs": len(set(e.program for e in search_service.entries if e.program))
-    })
+    job = search_service.get_explanation(job_id, request.args.get('wait', 0.0, type=float))
+    if job is None:
+        return jsonify({"error": f"Unknown explanation id '{job_id}'"}), 404
+    return jsonify(job)
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -29,6 +29,15 @@ async function checkHealth() {
     }
 }
 
+// Run fn once calls have paused for `wait` ms
+function debounce(fn, wait) {
+    let timer = null;
+    return function(...args) {
+        clearTimeout(timer);
+        timer = setTimeout(() => fn.apply(this, args), wait);
+    };
+}
+
 function updateNavStats(stats) {
     const navStats = document.getElementById('nav-stats');
     if (stats.error) {
@@ -0,0 +1,30 @@
+"""
+Gunicorn configuration for the Flask apps.
+
+The app (and with it the SDN entry table and indexes) is loaded once in the
+master process and inherited by every forked worker. Freezing the GC after the
+load keeps the collector from touching those objects in the workers, so their
+pages stay shared copy-on-write and memory stays flat as workers are added.
+
+    gunicorn -c gunicorn.conf.py run_merged_app:app
+"""
+import gc
+import os
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+# With preloading, workers are forked only once the list is loaded, so they
+# share it but do not answer /live until then. GUNICORN_PRELOAD=false forks
+# at once and each worker loads in the background (sharing via USE_SNAPSHOT).
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is imported, before forking
+    if not preload_app:
+        return
+    from sdn_api.api.startup import wait_for_services
+    wait_for_services()
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Froze {gc.get_freeze_count()} objects before forking workers")
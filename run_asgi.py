@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Run the async (ASGI) SDN API server
+"""
+import uvicorn
+
+from sdn_api.config import settings
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "sdn_api.api.asgi:app",
+        host=settings.api_host,
+        port=settings.api_port
+    )
@@ -0,0 +1,179 @@
+import asyncio
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from pathlib import Path
+
+from ..models.sdn import SearchQuery, IdentifierQuery
+from .startup import BackgroundService
+from ..config import settings
+from ..utils.logger import setup_logger, bind_request
+from ..utils.profiling import RequestProfiler, PROFILE_HEADER
+
+logger = setup_logger(__name__)
+
+app = FastAPI(title="SDN Watchlist API")
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+
+
+@app.middleware("http")
+async def correlation_id_middleware(request: Request, call_next):
+    """Tag every log line of the request with the caller's X-Request-ID or a fresh id."""
+    correlation_id = bind_request(request.headers.get("x-request-id"))
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = correlation_id
+    return response
+
+
+# Opt-in request profiling; the middleware is only added when configured
+profiler = RequestProfiler(
+    settings.profile_dir or None,
+    settings.profile_token,
+    settings.profile_sample_rate,
+    settings.profile_format
+)
+
+
+async def profiling_middleware(request: Request, call_next):
+    """
+    Profile the event loop thread while the request runs. Other requests
+    served concurrently on the loop show up in the same profile.
+    """
+    capture = profiler.begin(request.headers.get(PROFILE_HEADER), request.url.path)
+    if capture is None:
+        return await call_next(request)
+    try:
+        response = await call_next(request)
+    except Exception as e:
+        profiler.end(capture, method=request.method, error=repr(e))
+        raise
+    profiler.end(
+        capture,
+        method=request.method,
+        status=response.status_code,
+        correlation_id=response.headers.get("X-Request-ID")
+    )
+    response.headers["X-Profile-Id"] = capture.id
+    return response
+
+
+if profiler.enabled:
+    app.middleware("http")(profiling_middleware)
+
+
+# Load the list and build the search service in the background, so the port
+# is bound straight away; /ready reports when searches can be served
+SDN_FILE_PATH = Path(__file__).parent.parent.parent / settings.sdn_file_path
+startup = BackgroundService(str(SDN_FILE_PATH))
+
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint."""
+    search_service = startup.service
+    return {
+        "status": "healthy",
+        "sdn_loaded": search_service is not None,
+        "entries_count": len(search_service.entries) if search_service else 0
+    }
+
+
+@app.get("/live")
+async def live():
+    """Liveness: the process is up and serving requests, whether or not the list is loaded."""
+    return {"status": "alive"}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: 200 once the list is loaded and the indexes are built, 503 until then."""
+    status = startup.status()
+    return JSONResponse(status, status_code=200 if status["status"] == "ready" else 503)
+
+
+@app.post("/search")
+async def search_sdn(search_query: SearchQuery):
+    """
+    Search the SDN list with two-step matching.
+
+    Same contract as the Flask app, but LLM round-trips are awaited so one
+    worker can serve many concurrent screenings.
+    """
+    search_service = startup.service
+    if not search_service:
+        return JSONResponse({"error": "SDN data not loaded"}, status_code=503)
+
+    try:
+        response = await search_service.search_response_async(
+            search_query.query,
+            search_query.max_results,
+            search_query.filters,
+            search_query.exclude_dob_mismatches,
+            search_query.latency_budget_ms,
+            search_query.entity_type
+        )
+
+        return response.model_dump()
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    except Exception as e:
+        logger.error(f"Search error: {str(e)}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+
+@app.post("/search/identifier")
+async def search_identifier(identifier_query: IdentifierQuery):
+    """Exact lookup of a passport, national ID, IMO number, SWIFT/BIC or tax ID."""
+    search_service = startup.service
+    if not search_service:
+        return JSONResponse({"error": "SDN data not loaded"}, status_code=503)
+
+    try:
+        response = search_service.search_identifier(
+            identifier_query.identifier,
+            identifier_query.kind,
+            identifier_query.max_results,
+            identifier_query.filters
+        )
+
+        return response.model_dump()
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    except Exception as e:
+        logger.error(f"Identifier search error: {str(e)}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+@app.get("/suggest")
+async def suggest(q: str = "", limit: int = 10):
+    """Typeahead completions for a partly typed name, from the prefix index."""
+    search_service = startup.service
+    if not search_service:
+        return JSONResponse({"error": "SDN data not loaded"}, status_code=503)
+
+    try:
+        return search_service.suggest(q, limit).model_dump()
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+@app.get("/stats")
+async def get_stats():
+    """Get statistics about the loaded SDN data."""
+    search_service = startup.service
+    if not search_service:
+        return JSONResponse({"error": "SDN data not loaded"}, status_code=503)
+
+    return search_service.get_stats()
+
+
+@app.get("/explanations/{job_id}")
+async def get_explanation(job_id: str, wait: float = 0.0):
+    """Poll a background explanation job; ``?wait=<seconds>`` long-polls."""
+    search_service = startup.service
+    if not search_service:
+        return JSONResponse({"error": "SDN data not loaded"}, status_code=503)
+
+    job = await asyncio.to_thread(search_service.get_explanation, job_id, wait)
+    if job is None:
+        return JSONResponse({"error": f"Unknown explanation id '{job_id}'"}, status_code=404)
+    return job
@@ -0,0 +1,107 @@
+import os
+import time
+import threading
+# Registers fork handlers on import; import it here rather than on the loading
+# thread while a fork may be running the handlers
+import concurrent.futures.thread  # noqa: F401
+from typing import Dict, List, Optional
+
+from ..config import settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Every service started in this process, so a gunicorn master can wait for them before forking
+_services: List["BackgroundService"] = []
+
+
+def create_search_service(sdn_file_path: str, **overrides):
+    """Build an SDNSearchService configured from settings; keyword arguments override them."""
+    # Imported here so the app module (and its port) comes up without the search stack
+    from ..core.search_service import SDNSearchService
+
+    options = dict(
+        use_llm=settings.use_llm,
+        use_snapshot=settings.use_snapshot,
+        snapshot_dir=settings.snapshot_dir or None,
+        variation_mode=settings.variation_mode,
+        name_cognates=settings.name_cognates,
+        latency_budget_ms=settings.latency_budget_ms or None,
+        explanation_mode=settings.explanation_mode,
+        explanation_store=settings.explanation_store or None,
+        explanation_workers=settings.explanation_workers,
+        detect_entity_types=settings.detect_entity_types,
+        rank_candidates=settings.rank_candidates,
+        llm_rank_candidates=settings.llm_rank_candidates
+    )
+    options.update(overrides)
+    return SDNSearchService(sdn_file_path, **options)
+
+
+class BackgroundService:
+    """
+    Builds the search service on a background thread so the app can bind its
+    port and answer liveness checks straight away.
+
+    ``service`` is None until the list is loaded, the indexes are built and
+    the LLM clients exist; ``status()`` backs the ``/ready`` endpoint.
+    A fork waits for a load in progress: the loading thread would not survive
+    it, and locks it holds (imports, logging) would stay held in the child.
+    """
+
+    def __init__(self, sdn_file_path: str):
+        self.sdn_file_path = sdn_file_path
+        self.service = None
+        self.error: Optional[str] = None
+        self.started_at = time.monotonic()
+        self.load_seconds: Optional[float] = None
+        self._done = threading.Event()
+        _services.append(self)
+        self._thread = threading.Thread(target=self._load, name="service-startup", daemon=True)
+        os.register_at_fork(before=self._thread.join)
+        self._thread.start()
+
+    def _load(self):
+        try:
+            service = create_search_service(self.sdn_file_path)
+        except FileNotFoundError:
+            self.error = f"SDN file not found at {self.sdn_file_path}"
+            logger.error(self.error)
+        except Exception as e:
+            self.error = f"Search service failed to start: {e}"
+            logger.exception(self.error)
+        else:
+            self.service = service
+            self.load_seconds = time.monotonic() - self.started_at
+            logger.info(f"Initialized SDN Search Service with LLM: {settings.use_llm} in {self.load_seconds:.2f}s")
+        finally:
+            self._done.set()
+
+    @property
+    def ready(self) -> bool:
+        return self.service is not None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until loading has finished (or failed); returns whether the service is ready."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def status(self) -> Dict:
+        if self.service is not None:
+            state = "ready"
+        elif self.error:
+            state = "failed"
+        else:
+            state = "starting"
+        return {
+            "status": state,
+            "error": self.error,
+            "entries_count": len(self.service.entries) if self.service else 0,
+            "uptime_seconds": round(time.monotonic() - self.started_at, 2),
+            "load_seconds": round(self.load_seconds, 2) if self.load_seconds is not None else None
+        }
+
+
+def wait_for_services(timeout: Optional[float] = None) -> bool:
+    """Wait for every service started in this process; for preloading servers."""
+    return all(service.wait(timeout) for service in _services)
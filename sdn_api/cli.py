@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Bulk-screen a customer file against the SDN list.
+
+    sdn-screen customers.csv results.jsonl --query-columns name,dob,nationality --workers 16
+    sdn-screen customers.jsonl results.parquet --executor process --workers 8 --no-llm
+
+Input is streamed as CSV or JSONL; results are written as JSONL or Parquet
+(a directory of part files). Progress is checkpointed next to the output
+after every chunk: rerun the same command to resume an interrupted run.
+"""
+import argparse
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+from .api.startup import create_search_service
+from .config import settings
+from .core.bulk import BulkScreener, EXECUTORS, INPUT_FORMATS, OUTPUT_FORMATS
+
+
+def _progress_printer(interval: float):
+    last = [0.0]
+
+    def report(totals):
+        now = time.monotonic()
+        if now - last[0] < interval:
+            return
+        last[0] = now
+        print(
+            f"{totals['rows_done']:,} rows ({totals['screened']:,} screened, "
+            f"{totals['from_ledger']:,} from ledger, {totals['errors']:,} errors) "
+            f"{totals['rows_per_second']:.1f} rows/s",
+            file=sys.stderr, flush=True
+        )
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="sdn-screen", description=__doc__.splitlines()[1],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument("input", help="Customer file (.csv or .jsonl)")
+    parser.add_argument("output", help="Results (.jsonl file or .parquet directory)")
+    parser.add_argument("--sdn-file", default=settings.sdn_file_path, help="SDN list (default: SDN_FILE_PATH)")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS, help="Default: from the file extension")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, help="Default: from the file extension")
+    parser.add_argument("--id-column", default="id", help="Customer id field (default: id)")
+    parser.add_argument("--query-columns", default="query",
+                        help="Comma-separated fields joined into the query, e.g. name,dob,nationality")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--executor", choices=EXECUTORS, default="thread",
+                        help="thread for LLM-bound runs; process for local (--no-llm) CPU-bound runs")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per chunk and checkpoint")
+    parser.add_argument("--max-results", type=int, default=settings.max_search_results)
+    parser.add_argument("--ledger", help="ScreeningLedger database: reuse results of unchanged customers")
+    parser.add_argument("--no-llm", action="store_true", help="Local matching and rule-based ranking only")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start over")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines")
+    args = parser.parse_args(argv)
+
+    overrides = {'explanation_mode': 'inline'}
+    if args.no_llm:
+        overrides.update(use_llm=False, variation_mode='local')
+    if args.executor == 'process':
+        # Workers load one snapshot of the parsed list instead of each re-parsing it
+        overrides['use_snapshot'] = True
+    factory = partial(create_search_service, str(Path(args.sdn_file)), **overrides)
+    service = factory()
+
+    ledger = None
+    if args.ledger:
+        from .core.ledger import ScreeningLedger
+        ledger = ScreeningLedger(args.ledger)
+
+    screener = BulkScreener(
+        service,
+        service_factory=factory,
+        workers=args.workers,
+        executor=args.executor,
+        chunk_size=args.chunk_size,
+        max_results=args.max_results,
+        ledger=ledger,
+        progress=_progress_printer(args.progress_interval)
+    )
+    started = time.monotonic()
+    try:
+        state = screener.run(
+            args.input,
+            args.output,
+            input_format=args.input_format,
+            output_format=args.output_format,
+            id_field=args.id_column,
+            query_fields=tuple(f.strip() for f in args.query_columns.split(",") if f.strip()),
+            restart=args.restart
+        )
+    except KeyboardInterrupt:
+        print("Interrupted; rerun the same command to resume from the last checkpoint", file=sys.stderr)
+        return 130
+    finally:
+        if ledger:
+            ledger.close()
+
+    elapsed = time.monotonic() - started
+    print(
+        f"Done: {state['rows_done']:,} rows ({state['screened']:,} screened, {state['from_ledger']:,} from ledger, "
+        f"{state['errors']:,} errors) in {elapsed:.1f}s -> {args.output}",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
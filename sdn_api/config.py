@@ -15,6 +15,8 @@ class Settings(BaseSettings):
     
     # SDN Data Configuration
     sdn_file_path: str = os.getenv("SDN_FILE_PATH", "data/sdn.csv")
+    use_snapshot: bool = os.getenv("USE_SNAPSHOT", "true").lower() == "true"
+    snapshot_dir: str = os.getenv("SNAPSHOT_DIR", "")
     
     # API Configuration
     api_host: str = os.getenv("API_HOST", "0.0.0.0")
@@ -23,6 +25,29 @@ class Settings(BaseSettings):
     # Search Configuration
     max_search_results: int = int(os.getenv("MAX_SEARCH_RESULTS", "10"))
     name_match_threshold: float = float(os.getenv("NAME_MATCH_THRESHOLD", "0.4"))
+    # Name matches kept for context ranking, and how many of those the LLM assesses
+    rank_candidates: int = int(os.getenv("RANK_CANDIDATES", "100"))
+    llm_rank_candidates: int = int(os.getenv("LLM_RANK_CANDIDATES", "10"))
+    # llm | local | prepass (see NameMatcher.VARIATION_MODES)
+    variation_mode: str = os.getenv("VARIATION_MODE", "llm")
+    # Offline variants also try the same name in other languages (Ivan/John)
+    name_cognates: bool = os.getenv("NAME_COGNATES", "false").lower() == "true"
+    # Default per-search latency budget in ms; 0 disables the deadline
+    latency_budget_ms: int = int(os.getenv("LATENCY_BUDGET_MS", "0"))
+    # inline | background (see SDNSearchService.EXPLANATION_MODES)
+    explanation_mode: str = os.getenv("EXPLANATION_MODE", "inline")
+    explanation_store: str = os.getenv("EXPLANATION_STORE", "")
+    explanation_workers: int = int(os.getenv("EXPLANATION_WORKERS", "4"))
+    # Route searches to the type partition the query names (company words, DOB, ...); off by
+    # default since a routed search never sees the other partitions
+    detect_entity_types: bool = os.getenv("DETECT_ENTITY_TYPES", "false").lower() == "true"
+    
+    # Profiling Configuration (off unless a token or sample rate is set)
+    profile_dir: str = os.getenv("PROFILE_DIR", "")
+    profile_token: str = os.getenv("PROFILE_TOKEN", "")
+    profile_sample_rate: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    # pstats | speedscope
+    profile_format: str = os.getenv("PROFILE_FORMAT", "pstats")
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,302 @@
+import calendar
+import xml.etree.ElementTree as ET
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..models.sdn import SDNEntry
+from ..utils.logger import setup_logger
+from .dob_index import CIRCA_YEARS
+from .gazetteer import gazetteer
+from .identifiers import extract_identifiers
+from .normalizer import normalize_name, normalize_names
+
+logger = setup_logger(__name__)
+
+# Reference value sets kept from <ReferenceValueSets>: element tag -> ID -> (text, attributes)
+ReferenceValues = Dict[str, Dict[str, Tuple[str, Dict[str, str]]]]
+# (first day, last day, approximate) of a date span
+Period = Tuple[date, date, bool]
+# One feature version: (feature type, date span, location ID, free text), one of the last three set
+Feature = Tuple[str, Optional[Period], Optional[str], str]
+
+# Entry type by party sub type or, failing that, party type, as sdn.csv writes it
+_SUB_TYPES = {'vessel': 'vessel', 'aircraft': 'aircraft'}
+_PARTY_TYPES = {'individual': 'individual'}
+
+
+# Sections holding one kind of record each; cleared when they end
+_SECTIONS = ('Locations', 'IDRegDocuments', 'DistinctParties', 'ProfileRelationships', 'SanctionsEntries',
+             'SanctionsEntryLinks')
+
+
+def _local(tag: str) -> str:
+    """Tag without its namespace: "{https://...}DistinctParty" -> "DistinctParty"."""
+    return tag.rpartition('}')[2]
+
+
+def _text(elem: Optional[ET.Element]) -> str:
+    return (elem.text or '').strip() if elem is not None else ''
+
+
+def _format_date(start: date, end: date) -> str:
+    """OFAC remark form of a date span: "21 Jun 1955", "Jun 1955", "1955" or "1959 to 1961"."""
+    if start == end:
+        return f"{start.day:02d} {calendar.month_abbr[start.month]} {start.year}"
+    if start.day == 1 and end.day == calendar.monthrange(end.year, end.month)[1]:
+        if start.month == 1 and end.month == 12:
+            return str(start.year) if start.year == end.year else f"{start.year} to {end.year}"
+        if (start.year, start.month) == (end.year, end.month):
+            return f"{calendar.month_abbr[start.month]} {start.year}"
+    return f"{_format_date(start, start)} to {_format_date(end, end)}"
+
+
+class AdvancedXMLParser:
+    """
+    Streaming parser for OFAC's SDN_ADVANCED.xml.
+
+    The file is read with ``iterparse`` and every record (the reference
+    value sets, a location, an identity document, a party, a sanctions
+    entry) is handled when its end tag arrives and then cleared, so no more
+    than one record's subtree is held at a time; the emptied records are
+    dropped when their section ends. Names, aliases, dates of birth, places of
+    birth, nationalities and identity documents come from their structured
+    elements; only the compact lookups between records are kept (locations,
+    identity documents, and parties waiting for their programs, which the
+    file lists last). References are resolved when an entry is built, and
+    each entry is yielded as soon as its sanctions entry is read.
+    """
+
+    def __init__(self, xml_file_path: str):
+        self.xml_file_path = xml_file_path
+        # "{namespace}" of the file's elements, read from the first one. Child
+        # lookups use full tags so find/findall stay in C
+        self.ns = ''
+        self.values: ReferenceValues = {}
+        # Location ID -> (display text, ISO country code or None)
+        self.locations: Dict[str, Tuple[str, Optional[str]]] = {}
+        # Identity ID -> ["<document type> <number> (<issuing country>)", ...]
+        self.documents: Dict[str, List[str]] = {}
+        # Profile ID -> entry fields, until the profile's programs are read
+        self.parties: Dict[str, Dict] = {}
+
+    def iter_entries(self) -> Iterator[SDNEntry]:
+        """Yield every party in the file as an SDNEntry."""
+        handlers = sections = None
+        # End events only: start events would double the per-element work
+        for _, elem in ET.iterparse(self.xml_file_path):
+            if handlers is None:
+                self.ns = elem.tag[:-len(_local(elem.tag))]
+                handlers = {
+                    self.ns + 'ReferenceValueSets': self._read_reference_values,
+                    self.ns + 'Location': self._read_location,
+                    self.ns + 'IDRegDocument': self._read_document,
+                    self.ns + 'DistinctParty': self._read_party,
+                }
+                sections = {self.ns + section for section in _SECTIONS}
+            if elem.tag == self.ns + 'SanctionsEntry':
+                entry = self._read_sanctions_entry(elem)
+                if entry:
+                    yield entry
+            elif elem.tag in handlers:
+                handlers[elem.tag](elem)
+            elif elem.tag not in sections:
+                continue
+            elem.clear()
+
+        if self.parties:
+            logger.info(f"{len(self.parties)} parties without a sanctions entry; loading them without programs")
+        for fields in self.parties.values():
+            yield self._entry(fields, [])
+        self.parties = {}
+
+    def _read_reference_values(self, value_sets: ET.Element):
+        for value_set in value_sets:
+            for value in value_set:
+                self.values.setdefault(_local(value.tag), {})[value.get('ID')] = (_text(value), dict(value.attrib))
+
+    def _value(self, kind: str, value_id: Optional[str]) -> str:
+        return self.values.get(kind, {}).get(value_id, ('', {}))[0]
+
+    def _country(self, country_id: Optional[str]) -> Tuple[str, Optional[str]]:
+        """Country name and ISO code for a CountryID."""
+        name, attributes = self.values.get('Country', {}).get(country_id, ('', {}))
+        return name, attributes.get('ISO2') or gazetteer.lookup(name)
+
+    def _read_location(self, location: ET.Element):
+        parts = [
+            _text(value_elem)
+            for part in location.findall(self.ns + 'LocationPart')
+            for part_value in part.findall(self.ns + 'LocationPartValue')
+            for value_elem in part_value.findall(self.ns + 'Value')
+            if _text(value_elem)
+        ]
+        country = location.find(self.ns + 'LocationCountry')
+        name, code = self._country(country.get('CountryID') if country is not None else None)
+        if name:
+            parts.append(name)
+        self.locations[location.get('ID')] = (', '.join(parts), code)
+
+    def _read_document(self, document: ET.Element):
+        number = _text(document.find(self.ns + 'IDRegistrationNo'))
+        if not number:
+            return
+        text = f"{self._value('IDRegDocType', document.get('IDRegDocTypeID'))} {number}"
+        country, _ = self._country(document.get('IssuedBy-CountryID'))
+        if country:
+            text += f" ({country})"
+        self.documents.setdefault(document.get('IdentityID'), []).append(text)
+
+    def _read_party(self, party: ET.Element):
+        profile = party.find(self.ns + 'Profile')
+        if profile is None:
+            return
+        sub_type, attributes = self.values.get('PartySubType', {}).get(profile.get('PartySubTypeID'), ('', {}))
+        party_type = self._value('PartyType', attributes.get('PartyTypeID'))
+        fields = {
+            'id': party.get('FixedRef') or profile.get('ID'),
+            'type': _SUB_TYPES.get(sub_type.lower()) or _PARTY_TYPES.get(party_type.lower(), ''),
+            'name': '',
+            'aliases': [],
+            'identities': [],
+            'features': [],
+        }
+        for identity in profile.findall(self.ns + 'Identity'):
+            self._read_identity(identity, fields)
+        for feature in profile.findall(self.ns + 'Feature'):
+            kind = self._value('FeatureType', feature.get('FeatureTypeID'))
+            for version in feature.findall(self.ns + 'FeatureVersion'):
+                fields['features'].append(self._read_feature_version(kind, version))
+        self.parties[profile.get('ID')] = fields
+
+    def _read_identity(self, identity: ET.Element, fields: Dict):
+        """Names from the identity's aliases; its documents are looked up when the entry is built."""
+        part_types = {}
+        for groups in identity.findall(self.ns + 'NamePartGroups'):
+            for master in groups.findall(self.ns + 'MasterNamePartGroup'):
+                for group in master.findall(self.ns + 'NamePartGroup'):
+                    part_types[group.get('ID')] = self._value('NamePartType', group.get('NamePartTypeID'))
+
+        for alias in identity.findall(self.ns + 'Alias'):
+            primary = alias.get('Primary') == 'true' and identity.get('Primary') != 'false'
+            for documented in alias.findall(self.ns + 'DocumentedName'):
+                name = self._compose_name(documented, part_types)
+                if not name:
+                    continue
+                if primary and not fields['name']:
+                    fields['name'] = name
+                elif name != fields['name'] and name not in fields['aliases']:
+                    fields['aliases'].append(name)
+        fields['identities'].append(identity.get('ID'))
+
+    def _compose_name(self, documented: ET.Element, part_types: Dict[str, str]) -> str:
+        """Join name parts the way sdn.csv writes them: "LAST, First Middle" when a last name is given."""
+        last, other = [], []
+        for part in documented.findall(self.ns + 'DocumentedNamePart'):
+            for value in part.findall(self.ns + 'NamePartValue'):
+                text = _text(value)
+                if text:
+                    (last if part_types.get(value.get('NamePartGroupID')) == 'Last Name' else other).append(text)
+        if last and other:
+            return f"{' '.join(last)}, {' '.join(other)}"
+        return ' '.join(last or other)
+
+    def _read_feature_version(self, kind: str, version: ET.Element) -> Feature:
+        """A feature's value: a date span, a location reference or free text."""
+        period = version.find(self.ns + 'DatePeriod')
+        location = version.find(self.ns + 'VersionLocation')
+        return (
+            kind,
+            self._read_period(period) if period is not None else None,
+            location.get('LocationID') if location is not None else None,
+            _text(version.find(self.ns + 'VersionDetail'))
+        )
+
+    def _read_period(self, period: ET.Element) -> Optional[Period]:
+        """(first day, last day, approximate) of a DatePeriod: Start/From up to End/To."""
+        def point(boundary_name: str, side: str) -> Optional[date]:
+            boundary = period.find(self.ns + boundary_name)
+            elem = boundary.find(self.ns + side) if boundary is not None else None
+            if elem is None:
+                return None
+            try:
+                return date(int(_text(elem.find(self.ns + 'Year'))), int(_text(elem.find(self.ns + 'Month')) or 1),
+                            int(_text(elem.find(self.ns + 'Day')) or 1))
+            except ValueError:
+                return None
+
+        start = point('Start', 'From') or point('End', 'From')
+        end = point('End', 'To') or point('Start', 'To') or start
+        if start is None:
+            return None
+        approximate = any(boundary.get('Approximate') == 'true' for boundary in period)
+        return min(start, end), max(start, end), approximate
+
+    def _read_sanctions_entry(self, sanctions_entry: ET.Element) -> Optional[SDNEntry]:
+        fields = self.parties.pop(sanctions_entry.get('ProfileID'), None)
+        if fields is None:
+            return None
+        programs = []
+        for measure in sanctions_entry.findall(self.ns + 'SanctionsMeasure'):
+            if self._value('SanctionsType', measure.get('SanctionsTypeID')) == 'Program':
+                program = _text(measure.find(self.ns + 'Comment'))
+                if program and program not in programs:
+                    programs.append(program)
+        return self._entry(fields, programs)
+
+    def _entry(self, fields: Dict, programs: List[str]) -> SDNEntry:
+        """Build the entry, with remarks in the sdn.csv form for display and context scoring."""
+        dobs, dob_ranges, pobs, nationalities, codes, title = [], [], [], [], [], ''
+        for kind, period, location_id, detail in fields['features']:
+            place, code = self.locations.get(location_id, ('', None)) if location_id else (detail, None)
+            if kind == 'Birthdate' and period:
+                start, end, approximate = period
+                if approximate:
+                    dobs.append(f"circa {_format_date(start, end)}")
+                    start = date(max(1, start.year - CIRCA_YEARS), 1, 1)
+                    end = date(min(9999, end.year + CIRCA_YEARS), 12, 31)
+                else:
+                    dobs.append(_format_date(start, end))
+                dob_ranges.append((start.toordinal(), end.toordinal()))
+            elif kind == 'Place of Birth' and place:
+                pobs.append(place)
+            elif kind in ('Nationality Country', 'Citizenship Country') and place:
+                nationalities.append((kind, place))
+                code = code or gazetteer.lookup(place)
+                if code and code not in codes:
+                    codes.append(code)
+            elif kind == 'Title' and detail and not title:
+                title = detail
+
+        remarks = [f"{'alt. ' if i else ''}DOB {dob}" for i, dob in enumerate(dobs)]
+        remarks += [f"{'alt. ' if i else ''}POB {pob}" for i, pob in enumerate(pobs)]
+        remarks += [f"{'nationality' if kind == 'Nationality Country' else 'citizen'} {text}"
+                    for kind, text in nationalities]
+        documents = [document for identity_id in fields['identities'] for document in self.documents.pop(identity_id, [])]
+        remarks += documents
+        remarks += [f"a.k.a. '{alias}'" for alias in fields['aliases']]
+
+        identifiers = []
+        for document in documents:
+            for identifier in extract_identifiers(document):
+                if identifier not in identifiers:
+                    identifiers.append(identifier)
+
+        return SDNEntry(
+            id=fields['id'],
+            name=fields['name'],
+            type=fields['type'],
+            program='] ['.join(programs),
+            programs=programs,
+            title=title,
+            nationality=next((text for kind, text in nationalities if kind == 'Nationality Country'), None),
+            nationality_codes=codes,
+            program_codes=gazetteer.program_codes(programs),
+            dob=dobs[0] if dobs else None,
+            dob_ranges=dob_ranges,
+            pob=pobs[0] if pobs else None,
+            aliases=fields['aliases'],
+            identifiers=identifiers,
+            normalized_name=normalize_name(fields['name']),
+            normalized_aliases=normalize_names(fields['aliases']),
+            remarks='; '.join(remarks) + ('.' if remarks else '')
+        )
@@ -0,0 +1,65 @@
+import time
+from typing import Dict, List, Optional
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# LLM stages in pipeline order
+STAGES = ('variations', 'ranking', 'explanations')
+
+# Stages are dropped in this order when the budget cannot cover them all
+DEGRADATION_ORDER = ('explanations', 'ranking', 'variations')
+
+# Typical LLM latency per stage, used to plan the budget and split it
+STAGE_COSTS_MS: Dict[str, float] = {
+    'variations': 1500.0,
+    'ranking': 2500.0,
+    'explanations': 8000.0,
+}
+
+
+class LatencyBudget:
+    """
+    Wall-clock deadline for one search, shared out across the LLM stages.
+
+    At creation the budget is compared with the typical cost of each stage.
+    Stages are dropped in ``DEGRADATION_ORDER`` until the rest fit, so a tight
+    budget first loses explanations, then LLM ranking, then LLM variations.
+    A planned stage gets a share of whatever time is left when it starts,
+    proportional to its cost among the stages still to run; when it overruns
+    its share the outstanding LLM calls are cancelled and the stage falls back
+    to its rule-based equivalent. Every stage that did not run in full is
+    recorded in ``degraded``.
+    """
+
+    def __init__(self, budget_ms: float, stage_costs: Optional[Dict[str, float]] = None):
+        self.budget_ms = budget_ms
+        self.deadline = time.monotonic() + budget_ms / 1000
+        self.stage_costs = stage_costs or STAGE_COSTS_MS
+        self.degraded: List[str] = []
+
+        self.planned = set(STAGES)
+        for stage in DEGRADATION_ORDER:
+            if sum(self.stage_costs[s] for s in self.planned) <= budget_ms:
+                break
+            self.planned.discard(stage)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline."""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def allows(self, stage: str) -> bool:
+        """Whether the stage was planned and there is still time to start it."""
+        return stage in self.planned and self.remaining() > 0
+
+    def timeout(self, stage: str) -> float:
+        """Seconds this stage may take, leaving proportional shares for later planned stages."""
+        upcoming = [s for s in STAGES[STAGES.index(stage):] if s in self.planned or s == stage]
+        share = self.stage_costs[stage] / sum(self.stage_costs[s] for s in upcoming)
+        return self.remaining() * share
+
+    def degrade(self, stage: str, reason: str):
+        if stage not in self.degraded:
+            self.degraded.append(stage)
+        logger.warning(f"Latency budget of {self.budget_ms:.0f}ms: degraded {stage} ({reason})")
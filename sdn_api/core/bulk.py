@@ -0,0 +1,307 @@
+import os
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .ledger import ScreeningLedger, record_hash
+from ..models.sdn import MatchResult
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+INPUT_FORMATS = ('csv', 'jsonl')
+OUTPUT_FORMATS = ('jsonl', 'parquet')
+EXECUTORS = ('thread', 'process')
+
+# A customer record to screen: (row number, customer id, query)
+Record = Tuple[int, str, str]
+
+
+def _format_for(path: str, choices: Tuple[str, ...]) -> str:
+    suffix = Path(path).suffix.lower().lstrip('.')
+    if suffix == 'ndjson':
+        suffix = 'jsonl'
+    if suffix not in choices:
+        raise ValueError(f"Cannot tell the format of '{path}'. Expected one of: {', '.join(choices)}")
+    return suffix
+
+
+def read_records(path: str, fmt: Optional[str] = None, id_field: str = 'id',
+                 query_fields: Tuple[str, ...] = ('query',)) -> Iterator[Record]:
+    """
+    Stream records from a CSV or JSONL file without loading it.
+
+    The query is the listed fields joined with ", " (e.g. name, dob,
+    nationality), the form ``SDNSearchService`` parses. Rows without an id
+    get their row number as id.
+    """
+    fmt = fmt or _format_for(path, INPUT_FORMATS)
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = csv.DictReader(f) if fmt == 'csv' else (json.loads(line) for line in f if line.strip())
+        for row_number, row in enumerate(rows):
+            query = ", ".join(str(row[field]).strip() for field in query_fields if row.get(field))
+            customer_id = str(row.get(id_field) or row_number)
+            yield row_number, customer_id, query
+
+
+class Checkpoint:
+    """
+    Progress of a bulk run, written atomically after every flushed chunk.
+
+    ``rows_done`` input rows have been written to the output, which was
+    ``output_offset`` bytes long (JSONL) or had ``parts`` part files
+    (Parquet) at that point. Anything written after it is discarded on resume.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.state: Dict = {}
+
+    def load(self) -> Optional[Dict]:
+        if not self.path.exists():
+            return None
+        self.state = json.loads(self.path.read_text())
+        return self.state
+
+    def save(self, **state):
+        self.state.update(state, updated_at=time.time())
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2))
+        os.replace(tmp, self.path)
+
+
+class JsonlWriter:
+    """One JSON object per input row, appended to a single file."""
+
+    def __init__(self, path: Path, resume_offset: Optional[int]):
+        self.path = path
+        self.file = open(path, 'r+b' if resume_offset is not None and path.exists() else 'wb')
+        if resume_offset is not None:
+            # Drop rows written after the last checkpoint
+            self.file.truncate(resume_offset)
+            self.file.seek(resume_offset)
+
+    def write_chunk(self, rows: List[Dict]):
+        for row in rows:
+            self.file.write(json.dumps(row, ensure_ascii=False).encode('utf-8') + b"\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def position(self) -> Dict:
+        return {'output_offset': self.file.tell()}
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """
+    One Parquet part file per chunk in an output directory.
+
+    A Parquet file cannot be appended to once closed, so each chunk becomes
+    ``part-<n>.parquet``; readers load the directory as one dataset. Match
+    lists are stored as JSON strings next to flattened summary columns.
+    """
+
+    def __init__(self, path: Path, resume_parts: Optional[int]):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise RuntimeError("Parquet output needs pyarrow: pip install 'sdn-api[parquet]'") from e
+        self.pa, self.pq = pyarrow, pyarrow.parquet
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.parts = resume_parts or 0
+        for stale in self.path.glob("part-*.parquet"):
+            if int(stale.stem.split("-")[1]) >= self.parts:
+                stale.unlink()
+
+    def write_chunk(self, rows: List[Dict]):
+        table = self.pa.table({
+            'row': [r['row'] for r in rows],
+            'id': [r['id'] for r in rows],
+            'query': [r['query'] for r in rows],
+            'match_count': [len(r['results']) for r in rows],
+            'top_score': [r['results'][0]['llm_score'] if r['results'] else None for r in rows],
+            'top_confidence': [r['results'][0]['confidence'] if r['results'] else None for r in rows],
+            'results': [json.dumps(r['results'], ensure_ascii=False) for r in rows],
+            'from_ledger': [r['from_ledger'] for r in rows],
+            'error': [r['error'] for r in rows],
+        })
+        tmp = self.path / f".part-{self.parts:06d}.parquet.tmp"
+        self.pq.write_table(table, tmp)
+        os.replace(tmp, self.path / f"part-{self.parts:06d}.parquet")
+        self.parts += 1
+
+    def position(self) -> Dict:
+        return {'parts': self.parts}
+
+    def close(self):
+        pass
+
+
+# Worker-process state for the process executor
+_worker_service = None
+
+
+def _init_worker(service_factory: Callable):
+    global _worker_service
+    _worker_service = service_factory()
+
+
+def _screen_in_worker(records: List[Record], max_results: int) -> List[Tuple[List[MatchResult], Optional[str]]]:
+    return [_screen_one(_worker_service, query, max_results) for _, _, query in records]
+
+
+def _screen_one(service, query: str, max_results: int) -> Tuple[List[MatchResult], Optional[str]]:
+    if not query:
+        return [], "empty query"
+    try:
+        return service.search(query, max_results), None
+    except Exception as e:
+        return [], f"{type(e).__name__}: {e}"
+
+
+class BulkScreener:
+    """
+    Screens a large customer file in chunks on a worker pool.
+
+    Input is streamed ``chunk_size`` rows at a time; each chunk is screened
+    (threads share ``service``; processes each build their own through
+    ``service_factory``, loading the shared snapshot), written in input
+    order and then checkpointed, so at most one chunk is redone after a
+    crash. With a ``ledger``, unchanged customers reuse their stored results.
+    """
+
+    def __init__(self, service, service_factory: Optional[Callable] = None, workers: int = 8,
+                 executor: str = 'thread', chunk_size: int = 1000, max_results: int = 10,
+                 ledger: Optional[ScreeningLedger] = None, progress: Optional[Callable[[Dict], None]] = None):
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}'. Expected one of: {', '.join(EXECUTORS)}")
+        if executor == 'process' and service_factory is None:
+            raise ValueError("The process executor needs a service_factory")
+        self.service = service
+        self.service_factory = service_factory
+        self.workers = workers
+        self.executor_kind = executor
+        self.chunk_size = chunk_size
+        self.max_results = max_results
+        self.ledger = ledger
+        self.progress = progress
+
+    def _executor(self) -> Executor:
+        if self.executor_kind == 'process':
+            return ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.service_factory,))
+        return ThreadPoolExecutor(self.workers, thread_name_prefix="bulk-screen")
+
+    def _screen_chunk(self, pool: Executor, records: List[Record]) -> List[Tuple[List[MatchResult], Optional[str]]]:
+        if self.executor_kind == 'process':
+            # A few slices per worker keeps them busy without pickling per row
+            size = max(1, len(records) // (self.workers * 4))
+            slices = [records[i:i + size] for i in range(0, len(records), size)]
+            return [outcome for part in pool.map(_screen_in_worker, slices, [self.max_results] * len(slices))
+                    for outcome in part]
+        return list(pool.map(lambda record: _screen_one(self.service, record[2], self.max_results), records))
+
+    def run(self, input_path: str, output_path: str, input_format: Optional[str] = None,
+            output_format: Optional[str] = None, id_field: str = 'id',
+            query_fields: Tuple[str, ...] = ('query',), restart: bool = False) -> Dict:
+        """Screen ``input_path`` into ``output_path``, resuming from its checkpoint unless ``restart``."""
+        output_format = output_format or _format_for(output_path, OUTPUT_FORMATS)
+        output = Path(output_path)
+        checkpoint = Checkpoint(output.with_name(output.name + ".checkpoint.json"))
+        state = None if restart else checkpoint.load()
+        if state:
+            if state['input'] != str(Path(input_path).resolve()):
+                raise ValueError(f"Checkpoint {checkpoint.path} belongs to {state['input']}; use restart to start over")
+            if state['list_version'] != self.service.list_version:
+                raise ValueError(
+                    f"Checkpoint was written against list version {state['list_version']}, "
+                    f"loaded list is {self.service.list_version}; use restart to start over"
+                )
+            if state.get('completed'):
+                logger.info(f"{output_path} is already complete ({state['rows_done']} rows)")
+                return state
+            logger.info(f"Resuming {input_path} at row {state['rows_done']}")
+        else:
+            checkpoint.state = {}
+            checkpoint.save(input=str(Path(input_path).resolve()), output=str(output.resolve()),
+                            list_version=self.service.list_version, rows_done=0, screened=0,
+                            from_ledger=0, errors=0, output_offset=0, parts=0, completed=False)
+
+        # A run interrupted before its first chunk was checkpointed resumes from an empty output
+        if output_format == 'jsonl':
+            writer = JsonlWriter(output, state.get('output_offset', 0) if state else None)
+        else:
+            writer = ParquetWriter(output, state.get('parts', 0) if state else None)
+
+        totals = {k: checkpoint.state[k] for k in ('rows_done', 'screened', 'from_ledger', 'errors')}
+        records = islice(read_records(input_path, input_format, id_field, query_fields), totals['rows_done'], None)
+        started, rows_this_run = time.monotonic(), 0
+        try:
+            with self._executor() as pool:
+                while True:
+                    chunk = list(islice(records, self.chunk_size))
+                    if not chunk:
+                        break
+                    rows = self._process_chunk(pool, chunk, totals)
+                    writer.write_chunk(rows)
+                    totals['rows_done'] += len(chunk)
+                    rows_this_run += len(chunk)
+                    checkpoint.save(**totals, **writer.position())
+                    if self.progress:
+                        elapsed = time.monotonic() - started
+                        self.progress(dict(totals, rows_per_second=rows_this_run / elapsed if elapsed else 0.0))
+        finally:
+            writer.close()
+        checkpoint.save(completed=True)
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Bulk screening complete: {totals['rows_done']} rows ({totals['screened']} screened, "
+            f"{totals['from_ledger']} from ledger, {totals['errors']} errors), "
+            f"{rows_this_run / elapsed if elapsed else 0:.1f} rows/s this run"
+        )
+        return checkpoint.state
+
+    def _process_chunk(self, pool: Executor, chunk: List[Record], totals: Dict) -> List[Dict]:
+        outcomes: Dict[int, Tuple[List[MatchResult], Optional[str], bool]] = {}
+        settings = self.service.screening_settings(self.max_results)
+        hashes = {row_number: record_hash(query, settings) for row_number, _, query in chunk}
+        to_screen = chunk
+        if self.ledger:
+            stored = self.ledger.get_many([customer_id for _, customer_id, _ in chunk])
+            to_screen = []
+            for record in chunk:
+                row = stored.get(record[1])
+                if row and row.is_current(hashes[record[0]], self.service.list_version):
+                    outcomes[record[0]] = (row.results, None, True)
+                else:
+                    to_screen.append(record)
+
+        for record, (results, error) in zip(to_screen, self._screen_chunk(pool, to_screen)):
+            outcomes[record[0]] = (results, error, False)
+        if self.ledger:
+            self.ledger.upsert_many(
+                (customer_id, hashes[row_number], self.service.list_version, outcomes[row_number][0])
+                for row_number, customer_id, _ in to_screen if outcomes[row_number][1] is None
+            )
+
+        rows = []
+        for row_number, customer_id, query in chunk:
+            results, error, from_ledger = outcomes[row_number]
+            totals['from_ledger' if from_ledger else 'screened'] += 1
+            totals['errors'] += error is not None
+            rows.append({
+                'row': row_number,
+                'id': customer_id,
+                'query': query,
+                'results': [r.model_dump(mode="json") for r in results],
+                'from_ledger': from_ledger,
+                'error': error
+            })
+        return rows
@@ -0,0 +1,142 @@
+import re
+from datetime import date
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Tuple
+
+from ..models.sdn import SDNEntry
+from .dob_index import DateRange, parse_date_ranges, ranges_overlap
+from .gazetteer import gazetteer
+from .partitions import detect_entity_type, entry_type
+
+_TERM = re.compile(r"[a-z0-9]{2,}")
+
+# (score, reasons) for one candidate
+ContextScore = Tuple[float, List[str]]
+Postings = Dict[Hashable, FrozenSet[int]]
+
+
+class ContextScorer:
+    """
+    Rule-based context scoring over precomputed feature columns.
+
+    Every feature the ranker looks at is indexed once at load time as
+    posting sets of entry positions: per DOB year, nationality code, program
+    country, entry type and remark term. Scoring a batch resolves each
+    query-side feature to its posting set once, intersects it with the
+    candidate positions (a C-level set operation), and adds the weight to
+    just the hits. No candidate's remarks are scanned, only DOB year hits
+    get an exact interval check, and hundreds of candidates can be ranked
+    per query.
+    """
+
+    DOB_WEIGHT = 0.3
+    NATIONALITY_WEIGHT = 0.2
+    PROGRAM_WEIGHT = 0.15
+    TYPE_WEIGHT = 0.05
+    TERM_WEIGHT = 0.02
+
+    def __init__(self, entries: List[SDNEntry]):
+        self.entries = entries
+        self.positions: Dict[str, int] = {}
+        dob_years: Dict[int, List[int]] = {}
+        nationalities: Dict[str, List[int]] = {}
+        programs: Dict[str, List[int]] = {}
+        types: Dict[str, List[int]] = {}
+        terms: Dict[str, List[int]] = {}
+        for i, entry in enumerate(entries):
+            self.positions[entry.id] = i
+            for year in self.years(entry.dob_ranges):
+                dob_years.setdefault(year, []).append(i)
+            for code in entry.nationality_codes:
+                nationalities.setdefault(code, []).append(i)
+            for code in entry.program_codes:
+                programs.setdefault(code, []).append(i)
+            types.setdefault(entry_type(entry), []).append(i)
+            for term in set(self.terms(entry.remarks)):
+                terms.setdefault(term, []).append(i)
+        self.dob_years: Postings = self._freeze(dob_years)
+        self.nationalities: Postings = self._freeze(nationalities)
+        self.programs: Postings = self._freeze(programs)
+        self.types: Postings = self._freeze(types)
+        self.remark_terms: Postings = self._freeze(terms)
+
+    @staticmethod
+    def years(ranges: Iterable[DateRange]) -> set:
+        """Calendar years a set of DOB ranges touches."""
+        years = set()
+        for start, end in ranges:
+            years.update(range(date.fromordinal(start).year, date.fromordinal(end).year + 1))
+        return years
+
+    @staticmethod
+    def _freeze(postings: Dict[Hashable, List[int]]) -> Postings:
+        return {key: frozenset(positions) for key, positions in postings.items()}
+
+    @staticmethod
+    def terms(text: str) -> List[str]:
+        return _TERM.findall(text.lower())
+
+    def score(self, query_info: Dict, matches: List[Dict]) -> List[ContextScore]:
+        """Context-adjusted score and reasons for each match, in the order given."""
+        scores = [match['score'] for match in matches]
+        # Reason lists only for candidates with a hit
+        reasons: Dict[int, List[str]] = {}
+        # Candidate position -> index in matches
+        located: Dict[int, int] = {}
+        strangers: List[int] = []
+        for k, match in enumerate(matches):
+            position = self.positions.get(match['entry'].id)
+            if position is not None and self.entries[position] is match['entry']:
+                located[position] = k
+            else:
+                strangers.append(k)
+
+        if strangers:
+            # Entries from outside this list (e.g. an older list version) get their own small columns
+            outside = ContextScorer([matches[k]['entry'] for k in strangers])
+            for k, (score, why) in zip(strangers, outside.score(query_info, [matches[k] for k in strangers])):
+                scores[k] = score
+                if why:
+                    reasons[k] = why
+
+        candidates = set(located)
+
+        def add(hits, weight: float, reason: str):
+            # Set intersection runs over the smaller side; only hits reach Python
+            for position in candidates.intersection(hits):
+                k = located[position]
+                scores[k] += weight
+                reasons.setdefault(k, []).append(reason)
+
+        query_dob_ranges = query_info.get('dob_ranges')
+        if query_dob_ranges is None:
+            query_dob_ranges = parse_date_ranges(query_info.get('dob'))
+        if located and query_dob_ranges:
+            same_year = set()
+            for year in self.years(query_dob_ranges):
+                same_year |= candidates.intersection(self.dob_years.get(year, ()))
+            add([position for position in same_year
+                 if ranges_overlap(query_dob_ranges, self.entries[position].dob_ranges)],
+                self.DOB_WEIGHT, "DOB match")
+
+        query_country = query_info.get('nationality_code') or gazetteer.lookup(query_info.get('nationality'))
+        if located and query_country:
+            add(self.nationalities.get(query_country, ()), self.NATIONALITY_WEIGHT, "Nationality match")
+            add(self.programs.get(query_country, ()), self.PROGRAM_WEIGHT, "Country/Program match")
+
+        query_name = query_info.get('name', '').lower()
+        query_type = query_info.get('entity_type') or detect_entity_type(query_name)
+        if located and query_type in (None, 'individual'):
+            add(self.types.get('individual', ()), self.TYPE_WEIGHT, "Individual type match")
+        elif located:
+            add(self.types.get(query_type, ()), self.TYPE_WEIGHT, f"{query_type.capitalize()} type match")
+
+        term_counts: Dict[int, int] = {}
+        for term in set(self.terms(query_name)):
+            for position in candidates.intersection(self.remark_terms.get(term, ())):
+                term_counts[position] = term_counts.get(position, 0) + 1
+        for position, count in term_counts.items():
+            k = located[position]
+            scores[k] += count * self.TERM_WEIGHT
+            reasons.setdefault(k, []).append(f"Context relevance ({count} terms)")
+
+        return [(score if score <= 1.0 else 1.0, reasons.get(k) or []) for k, score in enumerate(scores)]
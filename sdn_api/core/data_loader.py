@@ -1,13 +1,24 @@
 import csv
 import re
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from pathlib import Path
 
 from ..models.sdn import SDNEntry
+from .advanced_xml import AdvancedXMLParser
+from .dob_index import extract_dob_ranges
+from .gazetteer import gazetteer
+from .identifiers import extract_identifiers
+from .normalizer import normalize_name, normalize_names
 
 
 class SDNDataLoader:
-    """Handles loading and parsing of SDN CSV data."""
+    """
+    Handles loading and parsing of SDN data.
+
+    The format follows the file extension: ``.xml`` is OFAC's SDN_ADVANCED.xml,
+    read by the streaming AdvancedXMLParser; anything else is the legacy
+    sdn.csv.
+    """
     
     def __init__(self, sdn_file_path: str):
         self.sdn_file_path = Path(sdn_file_path)
@@ -15,9 +26,17 @@ class SDNDataLoader:
             raise FileNotFoundError(f"SDN file not found: {sdn_file_path}")
     
     def load_entries(self) -> List[SDNEntry]:
-        """Load and parse all SDN entries from CSV file."""
-        entries = []
-        
+        """Load and parse all SDN entries."""
+        return list(self.iter_entries())
+    
+    def iter_entries(self) -> Iterator[SDNEntry]:
+        """Yield SDN entries one at a time as the file is read."""
+        if self.sdn_file_path.suffix.lower() == '.xml':
+            return AdvancedXMLParser(str(self.sdn_file_path)).iter_entries()
+        return self._iter_csv()
+    
+    def _iter_csv(self) -> Iterator[SDNEntry]:
+        """Parse SDN entries from the legacy CSV file."""
         with open(self.sdn_file_path, 'r', encoding='utf-8') as f:
             reader = csv.reader(f)
             for row in reader:
@@ -34,13 +53,18 @@ class SDNDataLoader:
                     # Parse additional info from remarks
                     remarks = entry_dict['remarks']
                     entry_dict['dob'] = self._extract_dob(remarks)
+                    entry_dict['dob_ranges'] = extract_dob_ranges(remarks)
                     entry_dict['nationality'] = self._extract_nationality(remarks)
                     entry_dict['pob'] = self._extract_pob(remarks)
+                    entry_dict['programs'] = self._split_programs(entry_dict['program'])
+                    entry_dict['nationality_codes'] = self._extract_nationality_codes(remarks)
+                    entry_dict['program_codes'] = gazetteer.program_codes(entry_dict['programs'])
                     entry_dict['aliases'] = self._extract_aliases(remarks)
+                    entry_dict['identifiers'] = extract_identifiers(remarks)
+                    entry_dict['normalized_name'] = normalize_name(entry_dict['name'])
+                    entry_dict['normalized_aliases'] = normalize_names(entry_dict['aliases'])
                     
-                    entries.append(SDNEntry(**entry_dict))
-        
-        return entries
+                    yield SDNEntry(**entry_dict)
     
     @staticmethod
     def _extract_dob(remarks: str) -> Optional[str]:
@@ -58,6 +82,21 @@ class SDNDataLoader:
             return nat_match.group(1).strip()
         return None
     
+    @staticmethod
+    def _extract_nationality_codes(remarks: str) -> List[str]:
+        """Resolve every nationality and citizenship in remarks to ISO codes."""
+        codes = []
+        for value in re.findall(r'(?:nationality|citizen)\s+([^;]+)', remarks, re.IGNORECASE):
+            for code in gazetteer.find_all(value):
+                if code not in codes:
+                    codes.append(code)
+        return codes
+    
+    @staticmethod
+    def _split_programs(program: str) -> List[str]:
+        """Split a multi-program field like "SDGT] [IRGC" into tags."""
+        return [p.strip(' []') for p in re.split(r'\]\s*\[', program) if p.strip(' []')]
+    
     @staticmethod
     def _extract_pob(remarks: str) -> Optional[str]:
         """Extract place of birth from remarks."""
@@ -0,0 +1,85 @@
+import hashlib
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from ..models.sdn import SDNEntry, MatchResult
+from .token_index import NameTokenIndex
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def entry_content_hash(entry: SDNEntry) -> str:
+    """Hash the source fields of an entry; derived fields follow from these."""
+    raw = "\x1f".join([entry.name, entry.type, entry.program, entry.title, entry.remarks, entry.source])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ListDiff:
+    """Entries added, changed and removed between two versions of the list."""
+
+    def __init__(self, old_entries: List[SDNEntry], new_entries: List[SDNEntry]):
+        old_hashes: Dict[str, str] = {entry.id: entry_content_hash(entry) for entry in old_entries}
+        new_ids = set()
+
+        self.added: List[SDNEntry] = []
+        self.changed: List[SDNEntry] = []
+        for entry in new_entries:
+            new_ids.add(entry.id)
+            old_hash = old_hashes.get(entry.id)
+            if old_hash is None:
+                self.added.append(entry)
+            elif old_hash != entry_content_hash(entry):
+                self.changed.append(entry)
+
+        self.removed_ids: List[str] = [entry_id for entry_id in old_hashes if entry_id not in new_ids]
+
+    @property
+    def screened_entries(self) -> List[SDNEntry]:
+        """Entries a customer can newly match: everything added or amended."""
+        return self.added + self.changed
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'added': len(self.added),
+            'changed': len(self.changed),
+            'removed': len(self.removed_ids)
+        }
+
+
+class DeltaScreener:
+    """
+    Rescreen a customer population against only what changed in the list.
+
+    The added and changed entries get their own token index, and each
+    customer goes through the same candidate generation as a search (query
+    variations per the matcher's variation mode, LLM included when enabled)
+    narrowed with that index. Only customers with a name match in the delta
+    are ranked, so cost scales with the size of the change rather than the
+    list. Removed entry ids are exposed on ``diff`` so earlier alerts can be
+    closed.
+    """
+
+    def __init__(self, search_service, old_entries: List[SDNEntry]):
+        self.search_service = search_service
+        self.diff = ListDiff(old_entries, search_service.entries)
+        self.delta_entries = self.diff.screened_entries
+        self.token_index = NameTokenIndex(self.delta_entries)
+        logger.info(f"Delta screening against {self.diff.summary()}")
+
+    def rescreen(self, customers: Iterable[str], max_results: int = 10) -> Iterator[Tuple[str, List[MatchResult]]]:
+        """Yield ``(customer, results)`` for every customer with a match in the delta."""
+        if not self.delta_entries:
+            return
+
+        screened = hits = 0
+        for customer in customers:
+            screened += 1
+            query_info = self.search_service._parse_query(customer)
+            # Name matching comes first and ends the pipeline when nothing in the delta matches
+            results = self.search_service.search_candidates(query_info, self.delta_entries, max_results,
+                                                            self.token_index)
+            if results:
+                hits += 1
+                yield customer, results
+
+        logger.info(f"Delta rescreen complete: {hits} of {screened} customers hit the delta")
@@ -0,0 +1,180 @@
+import re
+import calendar
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import List, Optional, Tuple
+
+from ..models.sdn import SDNEntry
+
+# Date intervals are inclusive (start, end) pairs of proleptic Gregorian ordinals
+DateRange = Tuple[int, int]
+
+# "circa 1960" is treated as 1960 +/- this many years
+CIRCA_YEARS = 2
+
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_abbr) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_name) if name})
+
+_MONTH = r'(?P<{}>[A-Za-z]{{3,9}})\.?'
+_POINT = re.compile(
+    r'^(?:(?P<day>\d{1,2})\s+)?(?:' + _MONTH.format('month') + r'\s+)?(?P<year>\d{4})$'
+)
+_NUMERIC = re.compile(r'^(?P<a>\d{1,4})[/.-](?P<b>\d{1,2})[/.-](?P<c>\d{2,4})$')
+_RANGE_SPLIT = re.compile(r'\s+(?:to|-)\s+', re.IGNORECASE)
+_CIRCA = re.compile(r'^(?:circa|c\.|approximately|approx\.?)\s+', re.IGNORECASE)
+_REMARKS_DOB = re.compile(r'\bDOB\s+([^;]+)')
+
+
+def _year_range(year: int) -> DateRange:
+    return date(year, 1, 1).toordinal(), date(year, 12, 31).toordinal()
+
+
+def _day_range(year: int, month: int, day: int) -> Optional[DateRange]:
+    try:
+        ordinal = date(year, month, day).toordinal()
+    except ValueError:
+        return None
+    return ordinal, ordinal
+
+
+def _parse_point(text: str) -> Optional[DateRange]:
+    """Parse a single OFAC-style date ("12 Mar 1960", "Mar 1960", "1960") into a range."""
+    m = _POINT.match(text.strip())
+    if not m:
+        return None
+
+    year = int(m.group('year'))
+    if not 1 <= year <= 9999:
+        return None
+    if not m.group('month'):
+        return None if m.group('day') else _year_range(year)
+
+    month = MONTHS.get(m.group('month').lower())
+    if not month:
+        return None
+    if m.group('day'):
+        return _day_range(year, month, int(m.group('day')))
+    last_day = calendar.monthrange(year, month)[1]
+    return date(year, month, 1).toordinal(), date(year, month, last_day).toordinal()
+
+
+def _expand_year(year: int) -> int:
+    """Map two-digit years onto the most recent past century."""
+    if year >= 100:
+        return year
+    current = date.today().year
+    century = current - current % 100
+    return century + year if century + year <= current else century - 100 + year
+
+
+def _parse_numeric(text: str) -> List[DateRange]:
+    """Parse numeric dates. Ambiguous day/month orders yield both readings."""
+    m = _NUMERIC.match(text.strip())
+    if not m:
+        return []
+
+    a, b, c = m.group('a'), m.group('b'), m.group('c')
+    if len(a) == 4:  # ISO: 1955-06-21
+        day_range = _day_range(int(a), int(b), int(c))
+        return [day_range] if day_range else []
+
+    year = _expand_year(int(c))
+    ranges = []
+    for day, month in ((int(a), int(b)), (int(b), int(a))):
+        day_range = _day_range(year, month, day)
+        if day_range and day_range not in ranges:
+            ranges.append(day_range)
+    return ranges
+
+
+def parse_date_ranges(text: Optional[str]) -> List[DateRange]:
+    """
+    Parse a DOB expression into inclusive ordinal date ranges.
+
+    Handles exact dates, month/year and year-only values, "circa" dates,
+    "1955 to 1957" ranges and numeric query formats (21/06/1955, 1955-06-21).
+    Returns an empty list when nothing parseable is found.
+    """
+    if not text:
+        return []
+    text = text.strip().rstrip('.')
+
+    circa = _CIRCA.match(text)
+    if circa:
+        point = _parse_point(text[circa.end():])
+        if not point:
+            return []
+        year = date.fromordinal(point[0]).year
+        return [(_year_range(max(1, year - CIRCA_YEARS))[0], _year_range(year + CIRCA_YEARS)[1])]
+
+    bounds = _RANGE_SPLIT.split(text)
+    if len(bounds) == 2:
+        start, end = _parse_point(bounds[0]), _parse_point(bounds[1])
+        if start and end and start[0] <= end[1]:
+            return [(start[0], end[1])]
+        return []
+
+    point = _parse_point(text)
+    if point:
+        return [point]
+    return _parse_numeric(text)
+
+
+def extract_dob_ranges(remarks: str) -> List[DateRange]:
+    """Parse every "DOB ..." / "alt. DOB ..." value in OFAC remarks."""
+    ranges = []
+    for value in _REMARKS_DOB.findall(remarks):
+        for date_range in parse_date_ranges(value):
+            if date_range not in ranges:
+                ranges.append(date_range)
+    return ranges
+
+
+def ranges_overlap(left: List[DateRange], right: List[DateRange]) -> bool:
+    """Return True if any interval in ``left`` overlaps any interval in ``right``."""
+    return any(
+        left_start <= right_end and right_start <= left_end
+        for left_start, left_end in left
+        for right_start, right_end in right
+    )
+
+
+class DobIndex:
+    """
+    Sorted interval index over entry DOB ranges.
+
+    Intervals are kept sorted by start; an overlap lookup bisects to the
+    window ``[query_start - max_span, query_end]`` and only checks ends
+    inside it. Results are bitmaps over entry positions so they combine
+    directly with FacetIndex selections.
+    """
+
+    def __init__(self, entries: List[SDNEntry]):
+        intervals = sorted(
+            (start, end, i)
+            for i, entry in enumerate(entries)
+            for start, end in entry.dob_ranges
+        )
+        self.starts = [start for start, _, _ in intervals]
+        self.ends = [end for _, end, _ in intervals]
+        self.positions = [i for _, _, i in intervals]
+        self.max_span = max((end - start for start, end, _ in intervals), default=0)
+        self.unknown_bits = 0
+        for i, entry in enumerate(entries):
+            if not entry.dob_ranges:
+                self.unknown_bits |= 1 << i
+
+    def overlapping_bits(self, query_ranges: List[DateRange]) -> int:
+        """Bitmap of entries with at least one DOB range overlapping the query."""
+        bits = 0
+        for q_start, q_end in query_ranges:
+            lo = bisect_left(self.starts, q_start - self.max_span)
+            hi = bisect_right(self.starts, q_end)
+            for k in range(lo, hi):
+                if self.ends[k] >= q_start:
+                    bits |= 1 << self.positions[k]
+        return bits
+
+    def compatible_bits(self, query_ranges: List[DateRange]) -> int:
+        """Bitmap of entries whose DOB overlaps the query or is not recorded."""
+        return self.overlapping_bits(query_ranges) | self.unknown_bits
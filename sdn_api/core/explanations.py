@@ -0,0 +1,254 @@
+import os
+import time
+import uuid
+import socket
+import sqlite3
+import contextvars
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from ..utils.logger import setup_logger
+from ..utils.paths import private_dir, user_cache_dir
+
+logger = setup_logger(__name__)
+
+# Job lifecycle
+PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+
+# Finished jobs older than this are purged when a queue starts
+DEFAULT_RETENTION_SECONDS = 24 * 3600
+
+# How often a waiting caller re-reads a job written by another process
+POLL_INTERVAL = 0.25
+
+# An unfinished job not touched for this long is taken to be orphaned when
+# its owner runs on another host, where its pid cannot be checked
+DEFAULT_LEASE_SECONDS = 3600
+
+INTERRUPTED = "interrupted: the process running the job exited before it finished"
+
+HOSTNAME = socket.gethostname()
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ExplanationQueue:
+    """
+    Background worker pool for o3-mini match explanations.
+
+    Jobs live in a small SQLite store (WAL mode) so any worker process can
+    answer a status request, whichever process queued the job. Each process
+    runs its own thread pool; ``submit`` returns a job id immediately and the
+    explanation is written back to the store when the LLM call finishes.
+
+    The connection and the thread pool are opened lazily in each process: a
+    queue built before a fork (gunicorn ``preload_app``) never shares its
+    SQLite handle with the workers. Each job records the host and pid that
+    own it and when it was last touched. Jobs left pending or running by a
+    process on this host that has exited, or by any owner whose lease has
+    run out, are marked failed, since the query they were for is not stored.
+    """
+
+    def __init__(self, llm_service, store_path: Optional[str] = None, workers: int = 4,
+                 retention_seconds: int = DEFAULT_RETENTION_SECONDS, lease_seconds: int = DEFAULT_LEASE_SECONDS):
+        self.llm_service = llm_service
+        if store_path:
+            self.path = Path(store_path)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        else:
+            # Explanations name the screened customer: keep them out of shared temp directories
+            self.path = private_dir(user_cache_dir()) / "explanations.db"
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Handles inherited across a fork: never used, and never closed, which
+        # would drop the parent's SQLite locks
+        self._inherited: List[sqlite3.Connection] = []
+        os.register_at_fork(after_in_child=self._after_fork)
+        self._execute("""
+            CREATE TABLE IF NOT EXISTS explanation_jobs (
+                id TEXT PRIMARY KEY,
+                entry_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                explanation TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                completed_at REAL,
+                owner_pid INTEGER,
+                owner_host TEXT,
+                touched_at REAL
+            ) WITHOUT ROWID
+        """)
+        columns = {row[1] for row in self._execute("PRAGMA table_info(explanation_jobs)")}
+        for column, column_type in (('owner_pid', 'INTEGER'), ('owner_host', 'TEXT'), ('touched_at', 'REAL')):
+            if column not in columns:
+                self._execute(f"ALTER TABLE explanation_jobs ADD COLUMN {column} {column_type}")
+        self.purge(retention_seconds)
+        self.fail_interrupted()
+        logger.info(f"Explanation queue started with {workers} workers, store at {self.path}")
+
+    def _after_fork(self):
+        if self._conn is not None:
+            self._inherited.append(self._conn)
+        self._conn = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """This process's connection, opened on first use; call with the lock held."""
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = ()):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                return conn.execute(sql, params).fetchall()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """This process's worker pool, started on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="explanations")
+            return self._executor
+
+    def submit(self, query_info: Dict, match: Dict) -> str:
+        """Queue an explanation for a ranked match and return its job id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO explanation_jobs (id, entry_id, status, created_at, owner_pid, owner_host, touched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, match['entry'].id, PENDING, now, os.getpid(), HOSTNAME, now)
+        )
+        # The worker gets its own copies of the dicts, since the caller keeps
+        # mutating them, and the caller's context for its correlation id
+        context = contextvars.copy_context()
+        self.executor.submit(context.run, self._run, job_id, dict(query_info), dict(match))
+        return job_id
+
+    def _run(self, job_id: str, query_info: Dict, match: Dict):
+        self._execute("UPDATE explanation_jobs SET status = ?, touched_at = ? WHERE id = ?",
+                      (RUNNING, time.time(), job_id))
+        try:
+            # Raises on a failed LLM call, so the job is recorded as failed rather than done
+            explanation = self.llm_service.generate_explanation(query_info, match)
+        except Exception as e:
+            logger.error(f"Explanation job {job_id} failed: {e}")
+            self._execute(
+                "UPDATE explanation_jobs SET status = ?, error = ?, completed_at = ? WHERE id = ?",
+                (FAILED, str(e), time.time(), job_id)
+            )
+            return
+        self._execute(
+            "UPDATE explanation_jobs SET status = ?, explanation = ?, completed_at = ? WHERE id = ?",
+            (DONE, explanation, time.time(), job_id)
+        )
+        logger.info(f"Explanation job {job_id} done for entry {match['entry'].id}")
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Current state of a job, or None if the id is unknown."""
+        rows = self._execute(
+            "SELECT id, entry_id, status, explanation, error, created_at, completed_at, "
+            "owner_host, owner_pid, touched_at FROM explanation_jobs WHERE id = ?",
+            (job_id,)
+        )
+        if not rows:
+            return None
+        (job_id, entry_id, status, explanation, error, created_at, completed_at,
+         owner_host, owner_pid, touched_at) = rows[0]
+        if status in (PENDING, RUNNING) and self._orphaned(owner_host, owner_pid, touched_at or created_at):
+            completed_at = time.time()
+            self._execute(
+                "UPDATE explanation_jobs SET status = ?, error = ?, completed_at = ? WHERE id = ? AND status = ?",
+                (FAILED, INTERRUPTED, completed_at, job_id, status)
+            )
+            status, error = FAILED, INTERRUPTED
+        return {
+            'id': job_id,
+            'entry_id': entry_id,
+            'status': status,
+            'explanation': explanation,
+            'error': error,
+            'created_at': created_at,
+            'completed_at': completed_at
+        }
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Dict]:
+        """Long-poll: return the job once it has finished or ``timeout`` seconds have passed."""
+        deadline = time.monotonic() + timeout
+        job = self.get(job_id)
+        while job and job['status'] in (PENDING, RUNNING) and time.monotonic() < deadline:
+            time.sleep(min(POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+            job = self.get(job_id)
+        return job
+
+    def purge(self, older_than_seconds: int):
+        """Delete finished jobs older than the retention window."""
+        cutoff = time.time() - older_than_seconds
+        self._execute(
+            "DELETE FROM explanation_jobs WHERE status IN (?, ?) AND created_at < ?",
+            (DONE, FAILED, cutoff)
+        )
+
+    def _orphaned(self, owner_host: Optional[str], owner_pid: Optional[int], touched_at: float) -> bool:
+        """
+        Whether an unfinished job's owner is gone: a process on this host is
+        checked directly; another host's, or an unrecorded owner, by its lease.
+        """
+        if owner_host == HOSTNAME:
+            return not _process_alive(owner_pid)
+        return touched_at < time.time() - self.lease_seconds
+
+    def fail_interrupted(self) -> int:
+        """Mark jobs left pending or running by owners that are gone as failed."""
+        rows = self._execute(
+            "SELECT id, status, owner_host, owner_pid, COALESCE(touched_at, created_at) "
+            "FROM explanation_jobs WHERE status IN (?, ?)",
+            (PENDING, RUNNING)
+        )
+        failed = 0
+        now = time.time()
+        for job_id, status, owner_host, owner_pid, touched_at in rows:
+            if not self._orphaned(owner_host, owner_pid, touched_at):
+                continue
+            # The status check keeps a job that finished meanwhile as it is
+            self._execute(
+                "UPDATE explanation_jobs SET status = ?, error = ?, completed_at = ? WHERE id = ? AND status = ?",
+                (FAILED, INTERRUPTED, now, job_id, status)
+            )
+            failed += 1
+        if failed:
+            logger.warning(f"Marked {failed} interrupted explanation jobs as failed")
+        return failed
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._execute("SELECT status, COUNT(*) FROM explanation_jobs GROUP BY status")
+        return {status: count for status, count in rows}
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
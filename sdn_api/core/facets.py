@@ -0,0 +1,104 @@
+from typing import Dict, Iterable, List, Optional
+
+from ..models.sdn import SDNEntry
+from .gazetteer import gazetteer
+from .partitions import entry_type
+
+
+class FacetIndex:
+    """
+    Bitmap indexes over entry facets, built once at load time.
+
+    Each facet value maps to an integer bitmap where bit ``i`` is set when
+    ``entries[i]`` carries that value. Filters are answered with bitwise
+    OR (values within a facet) and AND (across facets) before any scoring,
+    and per-value counts come straight from the bitmaps.
+    """
+
+    FACETS = ('program', 'type', 'nationality', 'source')
+
+    def __init__(self, entries: List[SDNEntry]):
+        self.size = len(entries)
+        self.all_bits = (1 << self.size) - 1
+        self.bitmaps: Dict[str, Dict[str, int]] = {facet: {} for facet in self.FACETS}
+
+        for i, entry in enumerate(entries):
+            bit = 1 << i
+            for facet in self.FACETS:
+                bitmap = self.bitmaps[facet]
+                for value in self.entry_values(facet, entry):
+                    bitmap[value] = bitmap.get(value, 0) | bit
+
+        self.counts: Dict[str, Dict[str, int]] = {
+            facet: dict(sorted(
+                ((value, bits.bit_count()) for value, bits in bitmap.items()),
+                key=lambda item: item[1],
+                reverse=True
+            ))
+            for facet, bitmap in self.bitmaps.items()
+        }
+
+    @staticmethod
+    def entry_values(facet: str, entry: SDNEntry) -> List[str]:
+        """Return the normalized facet values an entry is indexed under."""
+        if facet == 'program':
+            return [p.upper() for p in entry.programs]
+        if facet == 'type':
+            return [entry_type(entry)]
+        if facet == 'nationality':
+            return entry.nationality_codes
+        if facet == 'source':
+            return [entry.source.upper()]
+        raise ValueError(f"Unknown facet: {facet}")
+
+    @classmethod
+    def normalize_filters(cls, filters: Optional[Dict[str, Iterable[str] | str]]) -> Dict[str, List[str]]:
+        """
+        Validate facet names and normalize values the same way entries are
+        indexed. Each facet takes a string or a list of strings; anything
+        else raises ValueError.
+        """
+        if filters and not isinstance(filters, dict):
+            raise ValueError("filters must be an object mapping facet names to values")
+        normalized = {}
+        for facet, values in (filters or {}).items():
+            if facet not in cls.FACETS:
+                raise ValueError(f"Unknown facet '{facet}'. Expected one of: {', '.join(cls.FACETS)}")
+            if isinstance(values, str):
+                values = [values]
+            elif not isinstance(values, (list, tuple, set, frozenset)) or not all(isinstance(v, str) for v in values):
+                raise ValueError(f"Filter '{facet}' must be a string or a list of strings")
+            if facet in ('program', 'source'):
+                values = [v.strip().upper() for v in values]
+            elif facet == 'nationality':
+                # Accept country names, demonyms and codes alike
+                values = [gazetteer.lookup(v) or v.strip().upper() for v in values]
+            else:
+                values = [v.strip().lower() for v in values]
+            values = [v for v in values if v]
+            if values:
+                normalized[facet] = values
+        return normalized
+
+    def select(self, filters: Dict[str, List[str]]) -> int:
+        """Return the bitmap of entries matching any value within each facet and all facets."""
+        bits = self.all_bits
+        for facet, values in filters.items():
+            facet_bits = 0
+            for value in values:
+                facet_bits |= self.bitmaps[facet].get(value, 0)
+            bits &= facet_bits
+            if not bits:
+                break
+        return bits
+
+    @staticmethod
+    def positions(bits: int) -> List[int]:
+        """Return the entry positions set in a bitmap, in ascending order."""
+        flags = bin(bits)[:1:-1]
+        positions = []
+        i = flags.find('1')
+        while i != -1:
+            positions.append(i)
+            i = flags.find('1', i + 1)
+        return positions
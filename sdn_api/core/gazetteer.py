@@ -0,0 +1,307 @@
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+# ISO 3166-1 alpha-2 code -> names, short forms, alpha-3 code and demonyms.
+# The first name is the canonical display name.
+COUNTRIES: Dict[str, tuple] = {
+    "AF": ("Afghanistan", "AFG", "Afghan", "Afghani"),
+    "AL": ("Albania", "ALB", "Albanian"),
+    "DZ": ("Algeria", "DZA", "Algerian"),
+    "AD": ("Andorra", "AND", "Andorran"),
+    "AO": ("Angola", "AGO", "Angolan"),
+    "AG": ("Antigua and Barbuda", "ATG", "Antiguan", "Barbudan"),
+    "AR": ("Argentina", "ARG", "Argentine", "Argentinian"),
+    "AM": ("Armenia", "ARM", "Armenian"),
+    "AU": ("Australia", "AUS", "Australian"),
+    "AT": ("Austria", "AUT", "Austrian"),
+    "AZ": ("Azerbaijan", "AZE", "Azerbaijani", "Azeri"),
+    "BS": ("Bahamas", "The Bahamas", "BHS", "Bahamian"),
+    "BH": ("Bahrain", "BHR", "Bahraini"),
+    "BD": ("Bangladesh", "BGD", "Bangladeshi"),
+    "BB": ("Barbados", "BRB", "Barbadian"),
+    "BY": ("Belarus", "BLR", "Belarusian", "Belarussian", "Byelorussia"),
+    "BE": ("Belgium", "BEL", "Belgian"),
+    "BZ": ("Belize", "BLZ", "Belizean"),
+    "BJ": ("Benin", "BEN", "Beninese"),
+    "BT": ("Bhutan", "BTN", "Bhutanese"),
+    "BO": ("Bolivia", "BOL", "Bolivian"),
+    "BA": ("Bosnia and Herzegovina", "Bosnia-Herzegovina", "Bosnia", "BIH", "Bosnian", "Herzegovinian"),
+    "BW": ("Botswana", "BWA", "Botswanan", "Motswana"),
+    "BR": ("Brazil", "BRA", "Brazilian"),
+    "BN": ("Brunei", "Brunei Darussalam", "BRN", "Bruneian"),
+    "BG": ("Bulgaria", "BGR", "Bulgarian"),
+    "BF": ("Burkina Faso", "BFA", "Burkinabe"),
+    "BI": ("Burundi", "BDI", "Burundian"),
+    "CV": ("Cabo Verde", "Cape Verde", "CPV", "Cape Verdean", "Cabo Verdean"),
+    "KH": ("Cambodia", "KHM", "Cambodian", "Kampuchea"),
+    "CM": ("Cameroon", "CMR", "Cameroonian"),
+    "CA": ("Canada", "CAN", "Canadian"),
+    "CF": ("Central African Republic", "CAR", "CAF", "Central African"),
+    "TD": ("Chad", "TCD", "Chadian"),
+    "CL": ("Chile", "CHL", "Chilean"),
+    "CN": ("China", "People's Republic of China", "PRC", "CHN", "Chinese"),
+    "CO": ("Colombia", "COL", "Colombian"),
+    "KM": ("Comoros", "COM", "Comoran", "Comorian"),
+    "CG": ("Congo, Republic of the", "Republic of the Congo", "Congo-Brazzaville", "COG", "Congolese"),
+    "CD": ("Congo, Democratic Republic of the", "Democratic Republic of the Congo", "DRC", "DR Congo",
+           "Congo-Kinshasa", "Zaire", "COD"),
+    "CR": ("Costa Rica", "CRI", "Costa Rican"),
+    "CI": ("Cote d'Ivoire", "Cote d Ivoire", "Ivory Coast", "CIV", "Ivorian"),
+    "HR": ("Croatia", "HRV", "Croatian", "Croat"),
+    "CU": ("Cuba", "CUB", "Cuban"),
+    "CY": ("Cyprus", "CYP", "Cypriot"),
+    "CZ": ("Czech Republic", "Czechia", "CZE", "Czech"),
+    "DK": ("Denmark", "DNK", "Danish", "Dane"),
+    "DJ": ("Djibouti", "DJI", "Djiboutian"),
+    "DM": ("Dominica", "DMA", "Dominican (Dominica)"),
+    "DO": ("Dominican Republic", "DOM", "Dominican"),
+    "EC": ("Ecuador", "ECU", "Ecuadorian", "Ecuadorean"),
+    "EG": ("Egypt", "EGY", "Egyptian"),
+    "SV": ("El Salvador", "SLV", "Salvadoran", "Salvadorean"),
+    "GQ": ("Equatorial Guinea", "GNQ", "Equatoguinean", "Equatorial Guinean"),
+    "ER": ("Eritrea", "ERI", "Eritrean"),
+    "EE": ("Estonia", "EST", "Estonian"),
+    "SZ": ("Eswatini", "Swaziland", "SWZ", "Swazi"),
+    "ET": ("Ethiopia", "ETH", "Ethiopian"),
+    "FJ": ("Fiji", "FJI", "Fijian"),
+    "FI": ("Finland", "FIN", "Finnish", "Finn"),
+    "FR": ("France", "FRA", "French"),
+    "GA": ("Gabon", "GAB", "Gabonese"),
+    "GM": ("Gambia", "The Gambia", "GMB", "Gambian"),
+    "GE": ("Georgia", "GEO", "Georgian"),
+    "DE": ("Germany", "DEU", "German"),
+    "GH": ("Ghana", "GHA", "Ghanaian"),
+    "GR": ("Greece", "GRC", "Greek", "Hellenic"),
+    "GD": ("Grenada", "GRD", "Grenadian"),
+    "GT": ("Guatemala", "GTM", "Guatemalan"),
+    "GN": ("Guinea", "GIN", "Guinean"),
+    "GW": ("Guinea-Bissau", "GNB", "Bissau-Guinean"),
+    "GY": ("Guyana", "GUY", "Guyanese"),
+    "HT": ("Haiti", "HTI", "Haitian"),
+    "HN": ("Honduras", "HND", "Honduran"),
+    "HK": ("Hong Kong", "HKG", "Hong Konger", "Hongkonger"),
+    "HU": ("Hungary", "HUN", "Hungarian"),
+    "IS": ("Iceland", "ISL", "Icelandic", "Icelander"),
+    "IN": ("India", "IND", "Indian"),
+    "ID": ("Indonesia", "IDN", "Indonesian"),
+    "IR": ("Iran", "Islamic Republic of Iran", "IRN", "Iranian", "Persia", "Persian"),
+    "IQ": ("Iraq", "IRQ", "Iraqi"),
+    "IE": ("Ireland", "IRL", "Irish"),
+    "IL": ("Israel", "ISR", "Israeli"),
+    "IT": ("Italy", "ITA", "Italian"),
+    "JM": ("Jamaica", "JAM", "Jamaican"),
+    "JP": ("Japan", "JPN", "Japanese"),
+    "JO": ("Jordan", "JOR", "Jordanian"),
+    "KZ": ("Kazakhstan", "KAZ", "Kazakh", "Kazakhstani"),
+    "KE": ("Kenya", "KEN", "Kenyan"),
+    "KI": ("Kiribati", "KIR", "I-Kiribati"),
+    "KP": ("Korea, North", "North Korea", "Democratic People's Republic of Korea", "DPRK", "PRK",
+           "North Korean"),
+    "KR": ("Korea, South", "South Korea", "Republic of Korea", "ROK", "KOR", "South Korean", "Korean"),
+    "XK": ("Kosovo", "XKX", "Kosovar", "Kosovan"),
+    "KW": ("Kuwait", "KWT", "Kuwaiti"),
+    "KG": ("Kyrgyzstan", "Kyrgyz Republic", "KGZ", "Kyrgyz", "Kyrgyzstani"),
+    "LA": ("Laos", "Lao People's Democratic Republic", "LAO", "Lao", "Laotian"),
+    "LV": ("Latvia", "LVA", "Latvian"),
+    "LB": ("Lebanon", "LBN", "Lebanese"),
+    "LS": ("Lesotho", "LSO", "Basotho", "Mosotho"),
+    "LR": ("Liberia", "LBR", "Liberian"),
+    "LY": ("Libya", "LBY", "Libyan"),
+    "LI": ("Liechtenstein", "LIE", "Liechtensteiner"),
+    "LT": ("Lithuania", "LTU", "Lithuanian"),
+    "LU": ("Luxembourg", "LUX", "Luxembourgish", "Luxembourger"),
+    "MO": ("Macau", "Macao", "MAC", "Macanese"),
+    "MG": ("Madagascar", "MDG", "Malagasy"),
+    "MW": ("Malawi", "MWI", "Malawian"),
+    "MY": ("Malaysia", "MYS", "Malaysian"),
+    "MV": ("Maldives", "MDV", "Maldivian"),
+    "ML": ("Mali", "MLI", "Malian"),
+    "MT": ("Malta", "MLT", "Maltese"),
+    "MH": ("Marshall Islands", "MHL", "Marshallese"),
+    "MR": ("Mauritania", "MRT", "Mauritanian"),
+    "MU": ("Mauritius", "MUS", "Mauritian"),
+    "MX": ("Mexico", "MEX", "Mexican"),
+    "FM": ("Micronesia", "Federated States of Micronesia", "FSM", "Micronesian"),
+    "MD": ("Moldova", "MDA", "Moldovan"),
+    "MC": ("Monaco", "MCO", "Monegasque"),
+    "MN": ("Mongolia", "MNG", "Mongolian"),
+    "ME": ("Montenegro", "MNE", "Montenegrin"),
+    "MA": ("Morocco", "MAR", "Moroccan"),
+    "MZ": ("Mozambique", "MOZ", "Mozambican"),
+    "MM": ("Burma", "Myanmar", "MMR", "Burmese", "Myanma"),
+    "NA": ("Namibia", "NAM", "Namibian"),
+    "NR": ("Nauru", "NRU", "Nauruan"),
+    "NP": ("Nepal", "NPL", "Nepali", "Nepalese"),
+    "NL": ("Netherlands", "The Netherlands", "Holland", "NLD", "Dutch"),
+    "NZ": ("New Zealand", "NZL", "New Zealander"),
+    "NI": ("Nicaragua", "NIC", "Nicaraguan"),
+    "NE": ("Niger", "NER", "Nigerien"),
+    "NG": ("Nigeria", "NGA", "Nigerian"),
+    "MK": ("North Macedonia", "Macedonia", "MKD", "Macedonian"),
+    "NO": ("Norway", "NOR", "Norwegian"),
+    "OM": ("Oman", "OMN", "Omani"),
+    "PK": ("Pakistan", "PAK", "Pakistani"),
+    "PW": ("Palau", "PLW", "Palauan"),
+    "PS": ("Palestinian Territories", "Palestine", "West Bank", "Gaza", "Gaza Strip", "PSE", "Palestinian"),
+    "PA": ("Panama", "PAN", "Panamanian"),
+    "PG": ("Papua New Guinea", "PNG", "Papua New Guinean"),
+    "PY": ("Paraguay", "PRY", "Paraguayan"),
+    "PE": ("Peru", "PER", "Peruvian"),
+    "PH": ("Philippines", "The Philippines", "PHL", "Filipino", "Philippine"),
+    "PL": ("Poland", "POL", "Polish", "Pole"),
+    "PT": ("Portugal", "PRT", "Portuguese"),
+    "QA": ("Qatar", "QAT", "Qatari"),
+    "RO": ("Romania", "ROU", "Romanian"),
+    "RU": ("Russia", "Russian Federation", "RUS", "Russian"),
+    "RW": ("Rwanda", "RWA", "Rwandan"),
+    "KN": ("Saint Kitts and Nevis", "St. Kitts and Nevis", "KNA", "Kittitian", "Nevisian"),
+    "LC": ("Saint Lucia", "St. Lucia", "LCA", "Saint Lucian"),
+    "VC": ("Saint Vincent and the Grenadines", "St. Vincent and the Grenadines", "VCT", "Vincentian"),
+    "WS": ("Samoa", "WSM", "Samoan"),
+    "SM": ("San Marino", "SMR", "Sammarinese"),
+    "ST": ("Sao Tome and Principe", "STP", "Sao Tomean"),
+    "SA": ("Saudi Arabia", "SAU", "Saudi", "Saudi Arabian"),
+    "SN": ("Senegal", "SEN", "Senegalese"),
+    "RS": ("Serbia", "SRB", "Serbian", "Serb"),
+    "SC": ("Seychelles", "SYC", "Seychellois"),
+    "SL": ("Sierra Leone", "SLE", "Sierra Leonean"),
+    "SG": ("Singapore", "SGP", "Singaporean"),
+    "SK": ("Slovakia", "SVK", "Slovak", "Slovakian"),
+    "SI": ("Slovenia", "SVN", "Slovenian", "Slovene"),
+    "SB": ("Solomon Islands", "SLB", "Solomon Islander"),
+    "SO": ("Somalia", "SOM", "Somali"),
+    "ZA": ("South Africa", "ZAF", "RSA", "South African"),
+    "SS": ("South Sudan", "SSD", "South Sudanese"),
+    "ES": ("Spain", "ESP", "Spanish", "Spaniard"),
+    "LK": ("Sri Lanka", "LKA", "Sri Lankan"),
+    "SD": ("Sudan", "SDN", "Sudanese"),
+    "SR": ("Suriname", "SUR", "Surinamese"),
+    "SE": ("Sweden", "SWE", "Swedish", "Swede"),
+    "CH": ("Switzerland", "CHE", "Swiss"),
+    "SY": ("Syria", "Syrian Arab Republic", "SYR", "Syrian"),
+    "TW": ("Taiwan", "TWN", "Taiwanese"),
+    "TJ": ("Tajikistan", "TJK", "Tajik", "Tajikistani"),
+    "TZ": ("Tanzania", "TZA", "Tanzanian"),
+    "TH": ("Thailand", "THA", "Thai"),
+    "TL": ("Timor-Leste", "East Timor", "TLS", "Timorese"),
+    "TG": ("Togo", "TGO", "Togolese"),
+    "TO": ("Tonga", "TON", "Tongan"),
+    "TT": ("Trinidad and Tobago", "TTO", "Trinidadian", "Tobagonian"),
+    "TN": ("Tunisia", "TUN", "Tunisian"),
+    "TR": ("Turkey", "Turkiye", "TUR", "Turkish", "Turk"),
+    "TM": ("Turkmenistan", "TKM", "Turkmen"),
+    "TV": ("Tuvalu", "TUV", "Tuvaluan"),
+    "UG": ("Uganda", "UGA", "Ugandan"),
+    "UA": ("Ukraine", "UKR", "Ukrainian"),
+    "AE": ("United Arab Emirates", "UAE", "ARE", "Emirati", "Emirates"),
+    "GB": ("United Kingdom", "UK", "Great Britain", "Britain", "England", "Scotland", "Wales",
+           "Northern Ireland", "GBR", "British", "English", "Scottish", "Welsh"),
+    "US": ("United States", "United States of America", "USA", "America", "American", "U.S."),
+    "UY": ("Uruguay", "URY", "Uruguayan"),
+    "UZ": ("Uzbekistan", "UZB", "Uzbek", "Uzbekistani"),
+    "VU": ("Vanuatu", "VUT", "Ni-Vanuatu"),
+    "VA": ("Holy See", "Vatican", "Vatican City", "VAT"),
+    "VE": ("Venezuela", "VEN", "Venezuelan"),
+    "VN": ("Vietnam", "Viet Nam", "VNM", "Vietnamese"),
+    "YE": ("Yemen", "YEM", "Yemeni"),
+    "ZM": ("Zambia", "ZMB", "Zambian"),
+    "ZW": ("Zimbabwe", "ZWE", "Zimbabwean"),
+}
+
+# OFAC program tags that name a country without using its name
+PROGRAM_COUNTRIES: Dict[str, str] = {
+    "CAR": "CF",
+    "DRCONGO": "CD",
+    "DPRK": "KP",
+    "NKOREA": "KP",
+    "BALKANS": "RS",
+    "CAATSA": "RU",
+    "HK": "HK",
+    "IFSR": "IR",
+    "IRGC": "IR",
+    "ISA": "IR",
+}
+
+# Abbreviations accepted in lowercase; other codes must be written in capitals
+# so that words like "and", "can" or "per" are never read as countries
+CASUAL_ABBREVIATIONS = {"uk", "usa", "us", "uae", "dprk", "prc", "drc"}
+
+
+def normalize_place(text: str) -> str:
+    """Lowercase, strip accents and punctuation so lookups ignore formatting."""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^a-z0-9]+", ' ', text.lower())
+    return re.sub(r'^the ', '', text.strip())
+
+
+class Gazetteer:
+    """
+    Country, demonym and ISO-code lookup compiled into a hash table once.
+
+    Every name, short form, alpha-3 code and demonym maps to the country's
+    ISO 3166-1 alpha-2 code, so nationality comparisons reduce to code
+    equality instead of string similarity.
+    """
+
+    def __init__(self, countries: Dict[str, tuple] = COUNTRIES):
+        self.names = {code: names[0] for code, names in countries.items()}
+        self.lookup_table: Dict[str, str] = {}
+        self.abbreviations: Dict[str, str] = {code: code for code in countries}
+        for code, names in countries.items():
+            for name in names:
+                compact = name.replace('.', '')
+                if compact.isupper() and len(compact) <= 4:
+                    self.abbreviations.setdefault(compact, code)
+                else:
+                    self.lookup_table.setdefault(normalize_place(name), code)
+        self.max_words = max(len(key.split()) for key in self.lookup_table)
+
+    def lookup(self, text: Optional[str]) -> Optional[str]:
+        """Resolve a whole country name, demonym or code to its alpha-2 code."""
+        if not text:
+            return None
+        stripped = text.strip()
+        compact = stripped.replace('.', '')
+        if compact.isupper() or compact.lower() in CASUAL_ABBREVIATIONS:
+            code = self.abbreviations.get(compact.upper())
+            if code:
+                return code
+        return self.lookup_table.get(normalize_place(stripped))
+
+    def find_all(self, text: Optional[str]) -> List[str]:
+        """Find every country mentioned in free text, longest phrase first."""
+        if not text:
+            return []
+        words = normalize_place(text).split()
+        codes = []
+        i = 0
+        while i < len(words):
+            for size in range(min(self.max_words, len(words) - i), 0, -1):
+                code = self.lookup_table.get(' '.join(words[i:i + size]))
+                if code:
+                    if code not in codes:
+                        codes.append(code)
+                    i += size
+                    break
+            else:
+                i += 1
+        return codes
+
+    def program_codes(self, programs: List[str]) -> List[str]:
+        """Resolve OFAC program tags (e.g. "IRAN", "RUSSIA-EO14024", "DPRK3") to countries."""
+        codes = []
+        for tag in programs:
+            base = re.split(r'[-\d\s]', tag.upper(), maxsplit=1)[0]
+            code = (
+                PROGRAM_COUNTRIES.get(base)
+                or self.lookup_table.get(normalize_place(tag))
+                or self.lookup_table.get(normalize_place(base))
+            )
+            if code and code not in codes:
+                codes.append(code)
+        return codes
+
+
+gazetteer = Gazetteer()
@@ -0,0 +1,138 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from ..models.sdn import SDNEntry
+from .gazetteer import gazetteer, normalize_place
+
+# An identifier is a (kind, normalized value, issuing country) triple; the
+# country is an alpha-2 code, or '' when none is given
+Identifier = Tuple[str, str, str]
+
+IDENTIFIER_KINDS = ('passport', 'national_id', 'imo', 'swift', 'tax_id')
+IDENTIFIER_LABELS = {
+    'passport': 'passport', 'national_id': 'national ID', 'imo': 'IMO number', 'swift': 'SWIFT/BIC', 'tax_id': 'tax ID'
+}
+
+# A value is one token carrying at least one digit ("A7368886", "770-52-3481")
+_VALUE = r'([A-Z0-9][A-Z0-9./-]*\d[A-Z0-9./-]*)'
+_LABEL_END = r'\s*[:#]?\s*'
+
+# Labels as OFAC writes them in remarks; queries use the same forms in any case
+_PATTERNS: Dict[str, re.Pattern] = {
+    'passport': re.compile(r'\bPassport(?:\s+No\.?)?' + _LABEL_END + _VALUE, re.IGNORECASE),
+    'national_id': re.compile(
+        r'\b(?:National\s+ID(?:\s+No\.?)?|Personal\s+ID(?:\s+No\.?)?|Identification\s+Number|Cedula\s+No\.?)'
+        + _LABEL_END + _VALUE, re.IGNORECASE
+    ),
+    'imo': re.compile(r'\bIMO' + _LABEL_END + r'(\d{7})\b', re.IGNORECASE),
+    'swift': re.compile(
+        r'\b(?:SWIFT/BIC|SWIFT\s+code|BIC)' + _LABEL_END + r'([A-Z]{6}[A-Z0-9]{2}(?:[A-Z0-9]{3})?)\b', re.IGNORECASE
+    ),
+    'tax_id': re.compile(
+        r'\b(?:Tax\s+ID(?:\s+No\.?)?|RFC|NIT\s+#|VAT\s+Number)' + _LABEL_END + _VALUE, re.IGNORECASE
+    ),
+}
+_COUNTRY_SUFFIX = re.compile(r'\s*(?:\(([^)]*)\))?\s*')
+
+
+def normalize_identifier(kind: str, value: str) -> str:
+    """
+    Fold an identifier to the form it is indexed under: uppercase, separators
+    removed. SWIFT codes keep their 8-character institution part, so a branch
+    code finds the listed bank.
+    """
+    normalized = re.sub(r'[^A-Z0-9]', '', value.upper())
+    if kind == 'swift':
+        return normalized[:8]
+    return normalized
+
+
+def normalize_country(text: Optional[str]) -> str:
+    """
+    Issuing country as an alpha-2 code. A name the gazetteer does not know
+    is kept in folded form, so two spellings of it still compare equal.
+    """
+    if not text or not text.strip():
+        return ''
+    return gazetteer.lookup(text) or normalize_place(text)
+
+
+def countries_agree(query_country: str, entry_country: str) -> bool:
+    """An identifier match stands unless both sides name an issuing country and they differ."""
+    return not query_country or not entry_country or query_country == entry_country
+
+
+def extract_identifiers(text: str) -> List[Identifier]:
+    """Find every labelled identifier ("Passport A123 (Iran)", "IMO 9187629", ...) in remarks or a query."""
+    found = []
+    for kind, pattern in _PATTERNS.items():
+        for m in pattern.finditer(text):
+            country = _COUNTRY_SUFFIX.match(text, m.end()).group(1)
+            identifier = (kind, normalize_identifier(kind, m.group(1)), normalize_country(country))
+            if identifier[1] and identifier not in found:
+                found.append(identifier)
+    return found
+
+
+def parse_identifier(part: str) -> Optional[Identifier]:
+    """
+    Read a query part that is exactly one labelled identifier, optionally
+    followed by the issuing country: "passport A7368886 (Lebanon)".
+    """
+    part = part.strip()
+    for kind, pattern in _PATTERNS.items():
+        m = pattern.match(part)
+        suffix = _COUNTRY_SUFFIX.fullmatch(part[m.end():]) if m else None
+        if suffix:
+            return kind, normalize_identifier(kind, m.group(1)), normalize_country(suffix.group(1))
+    return None
+
+
+class IdentifierIndex:
+    """
+    Exact-match hash index over the identifiers in entry remarks.
+
+    Built once at load time: one dict per identifier kind maps the
+    normalized value to ``(position, issuing country)`` for the entries
+    that carry it, so a lookup is a single dict probe per kind. A query that
+    names an issuing country only matches documents issued there, or whose
+    country the list does not record.
+    """
+
+    def __init__(self, entries: List[SDNEntry]):
+        self.values: Dict[str, Dict[str, Tuple[Tuple[int, str], ...]]] = {kind: {} for kind in IDENTIFIER_KINDS}
+        for i, entry in enumerate(entries):
+            for kind, value, country in entry.identifiers:
+                by_value = self.values.setdefault(kind, {})
+                by_value[value] = by_value.get(value, ()) + ((i, country),)
+        self.counts: Dict[str, int] = {kind: len(by_value) for kind, by_value in self.values.items()}
+
+    @staticmethod
+    def normalize_kind(kind: Optional[str]) -> Optional[str]:
+        if not kind:
+            return None
+        normalized = kind.strip().lower().replace(' ', '_').replace('-', '_')
+        if normalized not in IDENTIFIER_KINDS:
+            raise ValueError(f"Unknown identifier kind '{kind}'. Expected one of: {', '.join(IDENTIFIER_KINDS)}")
+        return normalized
+
+    def lookup(self, value: str, kind: Optional[str] = None) -> List[Tuple[str, int]]:
+        """``(kind, position)`` of entries carrying the value, under one kind or any."""
+        kinds = (kind,) if kind else IDENTIFIER_KINDS
+        hits = []
+        for k in kinds:
+            for position, _ in self.values.get(k, {}).get(normalize_identifier(k, value), ()):
+                hits.append((k, position))
+        return hits
+
+    def lookup_all(self, identifiers: List[Identifier]) -> List[Tuple[str, str, int]]:
+        """
+        ``(kind, value, position)`` for every entry matching any of the given
+        identifiers; a document issued by a different country is no match.
+        """
+        return [
+            (kind, value, position)
+            for kind, value, country in identifiers
+            for position, entry_country in self.values.get(kind, {}).get(value, ())
+            if countries_agree(country, entry_country)
+        ]
@@ -0,0 +1,152 @@
+import json
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..models.sdn import MatchResult
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# SQLite caps the number of bound parameters per statement
+LOOKUP_CHUNK = 500
+
+
+def record_hash(record: str, settings: Optional[Dict] = None) -> str:
+    """
+    Hash a customer record, with the search settings it was screened under,
+    so unchanged customers can be recognised. A change to any setting that
+    shapes the results (see ``SDNSearchService.screening_settings``) makes
+    the stored row stale.
+    """
+    raw = record.strip() + "\x1f" + json.dumps(settings or {}, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class LedgerRow:
+    """One stored screening outcome."""
+
+    __slots__ = ('customer_id', 'record_hash', 'list_version', 'results', 'screened_at')
+
+    def __init__(self, customer_id: str, record_hash: str, list_version: str,
+                 results: List[MatchResult], screened_at: float):
+        self.customer_id = customer_id
+        self.record_hash = record_hash
+        self.list_version = list_version
+        self.results = results
+        self.screened_at = screened_at
+
+    def is_current(self, current_record_hash: str, current_list_version: str) -> bool:
+        return self.record_hash == current_record_hash and self.list_version == current_list_version
+
+
+class ScreeningLedger:
+    """
+    Persistent SQLite ledger of customer screening outcomes.
+
+    Rows are keyed by customer id in a WITHOUT ROWID table, so lookups and
+    ordered range scans walk the primary key B-tree directly. Each row holds
+    the customer record hash, the list version it was screened against and
+    the serialized MatchResult set. Writes go through bulk upserts in WAL mode.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS screenings (
+                customer_id TEXT PRIMARY KEY,
+                record_hash TEXT NOT NULL,
+                list_version TEXT NOT NULL,
+                results TEXT NOT NULL,
+                screened_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_screenings_list_version ON screenings (list_version)")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _to_row(raw: Tuple) -> LedgerRow:
+        customer_id, rec_hash, list_version, results, screened_at = raw
+        return LedgerRow(
+            customer_id,
+            rec_hash,
+            list_version,
+            [MatchResult.model_validate(r) for r in json.loads(results)],
+            screened_at
+        )
+
+    def get_many(self, customer_ids: List[str]) -> Dict[str, LedgerRow]:
+        """Fetch stored rows for a batch of customer ids."""
+        rows = {}
+        for start in range(0, len(customer_ids), LOOKUP_CHUNK):
+            chunk = customer_ids[start:start + LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = self.conn.execute(
+                f"SELECT customer_id, record_hash, list_version, results, screened_at "
+                f"FROM screenings WHERE customer_id IN ({placeholders})",
+                chunk
+            )
+            for raw in cursor:
+                rows[raw[0]] = self._to_row(raw)
+        return rows
+
+    def upsert_many(self, rows: Iterable[Tuple[str, str, str, List[MatchResult]]]):
+        """Bulk insert or replace ``(customer_id, record_hash, list_version, results)`` rows."""
+        now = time.time()
+        payload = [
+            (customer_id, rec_hash, list_version,
+             json.dumps([r.model_dump(mode="json") for r in results]), now)
+            for customer_id, rec_hash, list_version, results in rows
+        ]
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO screenings (customer_id, record_hash, list_version, results, screened_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(customer_id) DO UPDATE SET
+                    record_hash = excluded.record_hash,
+                    list_version = excluded.list_version,
+                    results = excluded.results,
+                    screened_at = excluded.screened_at
+            """, payload)
+
+    def scan(self, start_id: Optional[str] = None, end_id: Optional[str] = None,
+             batch_size: int = 10000) -> Iterator[LedgerRow]:
+        """Range scan in customer id order using keyset pagination."""
+        last_id = None
+        while True:
+            clauses, params = [], []
+            if last_id is not None:
+                clauses.append("customer_id > ?")
+                params.append(last_id)
+            elif start_id is not None:
+                clauses.append("customer_id >= ?")
+                params.append(start_id)
+            if end_id is not None:
+                clauses.append("customer_id < ?")
+                params.append(end_id)
+            where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+            batch = self.conn.execute(
+                f"SELECT customer_id, record_hash, list_version, results, screened_at "
+                f"FROM screenings {where} ORDER BY customer_id LIMIT ?",
+                params + [batch_size]
+            ).fetchall()
+            if not batch:
+                return
+            for raw in batch:
+                yield self._to_row(raw)
+            last_id = batch[-1][0]
+
+    def count_stale(self, list_version: str) -> int:
+        """Number of customers last screened against a different list version."""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM screenings WHERE list_version != ?", (list_version,)
+        ).fetchone()[0]
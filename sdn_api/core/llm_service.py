@@ -1,17 +1,50 @@
 import os
 import json
+import time
 import asyncio
-from typing import List, Dict, Optional
-from openai import OpenAI, AsyncOpenAI
+import threading
+from typing import Awaitable, List, Dict, Optional, TypeVar
 
+from .single_flight import SingleFlight
+from .prompts import Prompt, PromptBuilder, TokenAccounting
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+T = TypeVar("T")
+
+_loop_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+
+
+def run_coroutine(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+    
+    The AsyncOpenAI clients bind their connections to the event loop of their
+    first request, so sync callers share one long-lived loop per process,
+    running on a daemon thread, rather than creating and closing one per call.
+    """
+    global _loop, _loop_pid
+    with _loop_lock:
+        # A forked child has the loop object but not the thread running it
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name="llm-event-loop", daemon=True).start()
+        loop = _loop
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
 
 class LLMService:
     """Service for LLM-based operations including name generation and match assessment."""
     
+    # Shared by every instance so identical concurrent prompts hit the API once
+    flights = SingleFlight("llm")
+    # Prompt size, billed tokens and latency per call kind, across all instances
+    usage = TokenAccounting()
+    
     def __init__(self, api_key: Optional[str] = None):
         # Load environment variables
         from dotenv import load_dotenv
@@ -21,36 +54,84 @@ class LLMService:
         if not self.api_key:
             raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
         
+        # Imported on first use: the SDK is slow to import and unused when use_llm is off
+        from openai import OpenAI, AsyncOpenAI
+
         self.client = OpenAI(api_key=self.api_key)
         self.async_client = AsyncOpenAI(api_key=self.api_key)
         self.model = "gpt-4.1-mini"
         self.explanation_model = "o3-mini"  # Model for generating detailed explanations
+        # Token budget for the variable candidate fields (aliases, remarks); 0 disables truncation
+        field_budget = int(os.getenv("PROMPT_FIELD_TOKEN_BUDGET", "600"))
+        self.prompts = PromptBuilder(field_budget or None)
+    
+    def _complete(self, prompt: Prompt, model: str, **params):
+        """Send a built prompt and account for its tokens and latency."""
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self.client.chat.completions.create(model=model, messages=prompt.messages, **params)
+            return response
+        finally:
+            self.usage.record(prompt, getattr(response, 'usage', None), time.perf_counter() - started)
+    
+    async def _complete_async(self, prompt: Prompt, model: str, **params):
+        """Async version of _complete."""
+        started = time.perf_counter()
+        response = None
+        try:
+            response = await self.async_client.chat.completions.create(model=model, messages=prompt.messages, **params)
+            return response
+        finally:
+            self.usage.record(prompt, getattr(response, 'usage', None), time.perf_counter() - started)
+    
+    @staticmethod
+    def _query_key(query_info: Dict) -> tuple:
+        return (query_info['name'], query_info.get('dob'), query_info.get('nationality'))
+    
+    @classmethod
+    def _match_key(cls, kind: str, query_info: Dict, match: Dict) -> tuple:
+        """Everything that goes into an assessment or explanation prompt for one candidate."""
+        return (kind, cls._query_key(query_info), match['entry'].id, match.get('score'),
+                match.get('name_match_score'), match.get('llm_score'), str(match.get('confidence')))
     
     def generate_name_variations(self, name: str, max_variations: int = 10) -> List[str]:
+        """Generate name variations using LLM while preserving identity."""
+        return list(self.flights.do(('variations', name, max_variations),
+                                    self._generate_name_variations, name, max_variations))
+    
+    async def generate_name_variations_async(self, name: str, max_variations: int = 10) -> List[str]:
+        """Async version of generate_name_variations for the ASGI pipeline."""
+        return list(await self.flights.do_async(('variations', name, max_variations),
+                                                lambda: self._generate_name_variations_async(name, max_variations)))
+    
+    def assess_match(self, query_info: Dict, candidate: Dict) -> Dict[str, any]:
+        """Use LLM to assess if a candidate is a true match for the query."""
+        return self.flights.do(self._match_key('assess', query_info, candidate),
+                               self._assess_match, query_info, candidate)
+    
+    async def assess_match_async(self, query_info: Dict, candidate: Dict) -> Dict[str, any]:
+        """Async version of assess_match for parallel processing."""
+        return await self.flights.do_async(self._match_key('assess', query_info, candidate),
+                                           lambda: self._assess_match_async(query_info, candidate))
+    
+    def generate_explanation(self, query_info: Dict, match: Dict) -> str:
+        """Synchronous version of generate_explanation for compatibility."""
+        return self.flights.do(self._match_key('explanation', query_info, match),
+                               self._generate_explanation, query_info, match)
+    
+    async def generate_explanation_async(self, query_info: Dict, match: Dict) -> str:
+        """Generate detailed explanation for high-confidence matches using o3-mini."""
+        return await self.flights.do_async(self._match_key('explanation', query_info, match),
+                                           lambda: self._generate_explanation_async(query_info, match))
+    
+    def _generate_name_variations(self, name: str, max_variations: int = 10) -> List[str]:
         """Generate name variations using LLM while preserving identity."""
         logger.info(f"Generating name variations for '{name}'")
-        prompt = f"""Generate up to {max_variations} name variations for the person: "{name}"
-        
-        Include variations such as:
-        - Different name orders (first last, last first)
-        - Common nicknames and diminutives
-        - Alternative transliterations
-        - With/without middle names or initials
-        - Common spelling variations
-        
-        Return ONLY a JSON array of name strings, nothing else.
-        Example: ["John Smith", "Smith, John", "J. Smith", "Johnny Smith"]"""
+        prompt = self.prompts.variations(name, max_variations)
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a name variation generator. Return only JSON arrays."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=500
-            )
+            response = self._complete(prompt, self.model, temperature=0.3, max_tokens=500)
             
             result = response.choices[0].message.content.strip()
             if not result:
@@ -80,53 +161,55 @@ class LLMService:
             logger.error(f"Error generating name variations: {e}")
             return [name]
     
-    def assess_match(self, query_info: Dict, candidate: Dict) -> Dict[str, any]:
+    async def _generate_name_variations_async(self, name: str, max_variations: int = 10) -> List[str]:
+        """
+        Async version of generate_name_variations for the ASGI pipeline.
+        
+        Failures are raised rather than replaced, so the caller can fall back
+        and report the stage as degraded.
+        """
+        logger.info(f"Generating name variations for '{name}'")
+        prompt = self.prompts.variations(name, max_variations)
+        
+        try:
+            response = await self._complete_async(prompt, self.model, temperature=0.3, max_tokens=500)
+            
+            result = response.choices[0].message.content.strip()
+            if not result:
+                raise ValueError("Empty response from OpenAI API")
+            
+            # Remove markdown code block formatting if present
+            if result.startswith('```json'):
+                result = result[7:]  # Remove ```json
+            if result.startswith('```'):
+                result = result[3:]   # Remove ```
+            if result.endswith('```'):
+                result = result[:-3]  # Remove trailing ```
+            result = result.strip()
+            
+            logger.debug(f"OpenAI response: {result}")
+            variations = json.loads(result)
+            
+            # Always include the original name
+            if name not in variations:
+                variations.insert(0, name)
+            
+            return variations[:max_variations]
+            
+        except Exception as e:
+            logger.error(f"Error generating name variations: {e}")
+            raise
+    
+    def _assess_match(self, query_info: Dict, candidate: Dict) -> Dict[str, any]:
         """Use LLM to assess if a candidate is a true match for the query."""
         entry = candidate['entry']
         initial_score = candidate.get('score', 0)
         logger.info(f"Assessing match for '{entry.name}' (initial score: {initial_score:.3f})")
         
-        prompt = f"""Assess if this is a true match for the search query.
-
-Search Query:
-- Name: {query_info['name']}
-- Date of Birth: {query_info.get('dob', 'Not specified')}
-- Nationality/Country: {query_info.get('nationality', 'Not specified')}
-
-Candidate:
-- Name: {entry.name}
-- Type: {entry.type}
-- Date of Birth: {entry.dob or 'Not specified'}
-- Place of Birth: {entry.pob or 'Not specified'}
-- Nationality: {entry.nationality or 'Not specified'}
-- Program: {entry.program}
-- Aliases: {', '.join(entry.aliases) if entry.aliases else 'None'}
-- Remarks: {entry.remarks or 'None'}
-
-Analyze the match considering:
-1. Name similarity (including aliases)
-2. DOB match (if provided)
-3. Nationality/country match (if provided)
-4. Overall context and likelihood
-
-Return a JSON object with:
-{{
-    "is_match": true/false,
-    "confidence": "HIGH"/"MEDIUM"/"LOW",
-    "score": 0.0-1.0,
-    "reasoning": "Brief explanation"
-}}"""
+        prompt = self.prompts.assessment(query_info, candidate)
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert at identity matching and sanctions screening. Return only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=300
-            )
+            response = self._complete(prompt, self.model, temperature=0.1, max_tokens=300)
             
             result = response.choices[0].message.content.strip()
             
@@ -162,53 +245,16 @@ Return a JSON object with:
                 'reasoning': 'LLM assessment failed, using fuzzy match score'
             }
     
-    async def assess_match_async(self, query_info: Dict, candidate: Dict) -> Dict[str, any]:
-        """Async version of assess_match for parallel processing."""
+    async def _assess_match_async(self, query_info: Dict, candidate: Dict) -> Dict[str, any]:
+        """Async version of assess_match for parallel processing; failures are raised."""
         entry = candidate['entry']
         initial_score = candidate.get('score', 0)
         logger.info(f"Assessing match for '{entry.name}' (initial score: {initial_score:.3f})")
         
-        prompt = f"""Assess if this is a true match for the search query.
-
-Search Query:
-- Name: {query_info['name']}
-- Date of Birth: {query_info.get('dob', 'Not specified')}
-- Nationality/Country: {query_info.get('nationality', 'Not specified')}
-
-Candidate:
-- Name: {entry.name}
-- Type: {entry.type}
-- Date of Birth: {entry.dob or 'Not specified'}
-- Place of Birth: {entry.pob or 'Not specified'}
-- Nationality: {entry.nationality or 'Not specified'}
-- Program: {entry.program}
-- Aliases: {', '.join(entry.aliases) if entry.aliases else 'None'}
-- Remarks: {entry.remarks or 'None'}
-
-Analyze the match considering:
-1. Name similarity (including aliases)
-2. DOB match (if provided)
-3. Nationality/country match (if provided)
-4. Overall context and likelihood
-
-Return a JSON object with:
-{{
-    "is_match": true/false,
-    "confidence": "HIGH"/"MEDIUM"/"LOW",
-    "score": 0.0-1.0,
-    "reasoning": "Brief explanation"
-}}"""
+        prompt = self.prompts.assessment(query_info, candidate)
         
         try:
-            response = await self.async_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert at identity matching and sanctions screening. Return only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=300
-            )
+            response = await self._complete_async(prompt, self.model, temperature=0.1, max_tokens=300)
             
             result = response.choices[0].message.content.strip()
             
@@ -236,16 +282,15 @@ Return a JSON object with:
             
         except Exception as e:
             logger.error(f"Error in LLM assessment: {e}")
-            # Fallback to original score
-            return {
-                'is_match': candidate.get('score', 0) > 0.5,
-                'confidence': 'LOW',
-                'llm_score': candidate.get('score', 0),
-                'reasoning': 'LLM assessment failed, using fuzzy match score'
-            }
+            raise
     
     async def assess_matches_parallel(self, query_info: Dict, candidates: List[Dict]) -> List[Dict]:
-        """Assess multiple matches in parallel."""
+        """
+        Assess multiple matches in parallel.
+        
+        A failed assessment falls back to the fuzzy match score and marks the
+        candidate with ``llm_failed``.
+        """
         logger.info(f"Starting parallel assessment of {len(candidates)} matches")
         
         # Create tasks for parallel execution
@@ -265,6 +310,7 @@ Return a JSON object with:
                 candidate.update({
                     'llm_score': candidate.get('score', 0),
                     'confidence': 'LOW',
+                    'llm_failed': True,
                     'match_reasons': candidate.get('match_reasons', []) + ['LLM assessment failed, using fuzzy match score']
                 })
                 # Ensure name_match_score is preserved
@@ -283,51 +329,16 @@ Return a JSON object with:
         logger.info(f"Completed parallel assessment of {len(candidates)} matches")
         return candidates
     
-    async def generate_explanation_async(self, query_info: Dict, match: Dict) -> str:
-        """Generate detailed explanation for high-confidence matches using o3-mini."""
+    async def _generate_explanation_async(self, query_info: Dict, match: Dict) -> str:
+        """Generate detailed explanation for high-confidence matches using o3-mini; failures are raised."""
         entry = match['entry']
         logger.info(f"Generating detailed explanation for '{entry.name}' using {self.explanation_model}")
         
-        prompt = f"""You are an expert sanctions compliance analyst. Provide a detailed assessment of the likelihood that this is a true match.
-
-Search Query:
-- Name: {query_info['name']}
-- Date of Birth: {query_info.get('dob', 'Not specified')}
-- Nationality/Country: {query_info.get('nationality', 'Not specified')}
-
-Matched Individual/Entity:
-- Name: {entry.name}
-- Type: {entry.type}
-- Date of Birth: {entry.dob or 'Not specified'}
-- Place of Birth: {entry.pob or 'Not specified'}
-- Nationality: {entry.nationality or 'Not specified'}
-- Program: {entry.program}
-- Aliases: {', '.join(entry.aliases) if entry.aliases else 'None'}
-- Remarks: {entry.remarks or 'None'}
-
-Initial Scores:
-- Name Match Score: {match.get('name_match_score', 0):.3f}
-- Context Score: {match.get('llm_score', 0):.3f}
-- Confidence Level: {match.get('confidence', 'UNKNOWN')}
-
-Please provide:
-1. A thorough analysis of the match likelihood
-2. Key factors supporting or contradicting the match
-3. Any red flags or areas requiring additional verification
-4. Your overall assessment of whether this is likely the same person/entity
-
-Be specific and detailed in your analysis, considering all available data points."""
+        prompt = self.prompts.explanation(query_info, match)
         
         try:
             # o3-mini has different parameter requirements
-            response = await self.async_client.chat.completions.create(
-                model=self.explanation_model,
-                messages=[
-                    {"role": "system", "content": "You are a sanctions compliance expert providing detailed match assessments for screening systems."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_completion_tokens=1000
-            )
+            response = await self._complete_async(prompt, self.explanation_model, max_completion_tokens=1000)
             
             explanation = response.choices[0].message.content.strip()
             logger.info(f"Generated explanation of {len(explanation)} characters")
@@ -336,53 +347,18 @@ Be specific and detailed in your analysis, considering all available data points
         except Exception as e:
             logger.error(f"Error generating explanation with {self.explanation_model}: {e}")
             logger.error(f"Exception type: {type(e).__name__}")
-            return f"High-confidence match based on name similarity ({match.get('name_match_score', 0):.2f}) and context analysis ({match.get('llm_score', 0):.2f})."
+            raise
     
-    def generate_explanation(self, query_info: Dict, match: Dict) -> str:
-        """Synchronous version of generate_explanation for compatibility."""
+    def _generate_explanation(self, query_info: Dict, match: Dict) -> str:
+        """Synchronous version of generate_explanation for compatibility; failures are raised."""
         entry = match['entry']
         logger.info(f"Generating detailed explanation for '{entry.name}' using {self.explanation_model}")
         
-        prompt = f"""You are an expert sanctions compliance analyst. Provide a detailed assessment of the likelihood that this is a true match.
-
-Search Query:
-- Name: {query_info['name']}
-- Date of Birth: {query_info.get('dob', 'Not specified')}
-- Nationality/Country: {query_info.get('nationality', 'Not specified')}
-
-Matched Individual/Entity:
-- Name: {entry.name}
-- Type: {entry.type}
-- Date of Birth: {entry.dob or 'Not specified'}
-- Place of Birth: {entry.pob or 'Not specified'}
-- Nationality: {entry.nationality or 'Not specified'}
-- Program: {entry.program}
-- Aliases: {', '.join(entry.aliases) if entry.aliases else 'None'}
-- Remarks: {entry.remarks or 'None'}
-
-Initial Scores:
-- Name Match Score: {match.get('name_match_score', 0):.3f}
-- Context Score: {match.get('llm_score', 0):.3f}
-- Confidence Level: {match.get('confidence', 'UNKNOWN')}
-
-Please provide:
-1. A thorough analysis of the match likelihood
-2. Key factors supporting or contradicting the match
-3. Any red flags or areas requiring additional verification
-4. Your overall assessment of whether this is likely the same person/entity
-
-Be specific and detailed in your analysis, considering all available data points."""
+        prompt = self.prompts.explanation(query_info, match)
         
         try:
             # o3-mini has different parameter requirements
-            response = self.client.chat.completions.create(
-                model=self.explanation_model,
-                messages=[
-                    {"role": "system", "content": "You are a sanctions compliance expert providing detailed match assessments for screening systems."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_completion_tokens=1000
-            )
+            response = self._complete(prompt, self.explanation_model, max_completion_tokens=1000)
             
             explanation = response.choices[0].message.content.strip()
             logger.info(f"Generated explanation of {len(explanation)} characters")
@@ -391,4 +367,4 @@ Be specific and detailed in your analysis, considering all available data points
         except Exception as e:
             logger.error(f"Error generating explanation with {self.explanation_model}: {e}")
             logger.error(f"Exception type: {type(e).__name__}")
-            return f"High-confidence match based on name similarity ({match.get('name_match_score', 0):.2f}) and context analysis ({match.get('llm_score', 0):.2f})."
\ No newline at end of file
+            raise
\ No newline at end of file
@@ -1,9 +1,15 @@
+import asyncio
 from typing import List, Tuple, Dict, Optional
 from difflib import SequenceMatcher
 
 from ..models.sdn import SDNEntry
 from .llm_service import LLMService
-from ..utils.logger import setup_logger
+from .normalizer import normalize_name, normalize_names
+from .variants import cognate_variant_engine, variant_engine
+from .token_index import NameTokenIndex
+from .name_table import NameScore, NameTable
+from .budget import LatencyBudget
+from ..utils.logger import setup_logger, debug_enabled
 
 logger = setup_logger(__name__)
 
@@ -11,27 +17,134 @@ logger = setup_logger(__name__)
 class NameMatcher:
     """Step 1: Flexible name matching for initial filtering."""
     
-    def __init__(self, threshold: float = 0.7, use_llm: bool = True):
+    # llm: LLM variations with local fallback; local: never call the LLM;
+    # prepass: local variations first, LLM only when they find no strong match
+    VARIATION_MODES = ('llm', 'local', 'prepass')
+    
+    def __init__(self, threshold: float = 0.7, use_llm: bool = True, variation_mode: str = 'llm',
+                 prepass_threshold: float = 0.95, max_candidates: int = 100, use_cognates: bool = False):
+        if variation_mode not in self.VARIATION_MODES:
+            raise ValueError(f"Unknown variation mode '{variation_mode}'. Expected one of: {', '.join(self.VARIATION_MODES)}")
         self.threshold = threshold
-        self.use_llm = use_llm
-        self.llm_service = LLMService() if use_llm else None
+        self.use_llm = use_llm and variation_mode != 'local'
+        self.variation_mode = variation_mode
+        self.prepass_threshold = prepass_threshold
+        # Pre-ranking cut-off: how many name matches go on to context ranking
+        self.max_candidates = max_candidates
+        # Cognates (Ivan/John) are different names, so the offline engine only offers them on request
+        self.use_cognates = use_cognates
+        self.variant_engine = cognate_variant_engine if use_cognates else variant_engine
+        self.llm_service = LLMService() if self.use_llm else None
+        # Set by the search service once the list is loaded
+        self.token_index: Optional[NameTokenIndex] = None
+        self.name_table: Optional[NameTable] = None
+    
+    def generate_query_variations(self, query_name: str, use_llm: bool = True) -> List[str]:
+        """
+        Generate name variations for the query once.
+        
+        Variations are run through the same normalization as the list so that
+        Cyrillic, Greek, Arabic and accented queries meet SDN names in Latin.
+        """
+        if not use_llm:
+            variations = self._generate_rule_based_variations(query_name)
+        else:
+            variations = self._generate_name_variations(query_name)
+        return normalize_names([query_name] + variations)
+    
+    async def generate_query_variations_async(self, query_name: str,
+                                              budget: Optional[LatencyBudget] = None) -> List[str]:
+        """
+        Async version of generate_query_variations for the ASGI pipeline.
+        
+        A failed LLM call falls back to rule-based variations and is recorded
+        on the budget as a degraded stage.
+        """
+        if self.use_llm and self.llm_service:
+            try:
+                llm_variations = await self.llm_service.generate_name_variations_async(query_name)
+                return normalize_names([query_name] + llm_variations)
+            except Exception as e:
+                logger.warning(f"LLM name generation failed, falling back to rule-based: {e}")
+                if budget is not None:
+                    budget.degrade('variations', f"LLM variations failed: {e}")
+        
+        return normalize_names([query_name] + self._generate_rule_based_variations(query_name))
     
-    def generate_query_variations(self, query_name: str) -> List[str]:
-        """Generate name variations for the query once."""
-        return self._generate_name_variations(query_name)
+    def match(self, query_name: str, entries: List[SDNEntry], token_index=None) -> List[Dict]:
+        """
+        Generate variations according to the variation mode and filter entries with them.
+        
+        ``token_index`` narrows with the index of the partition ``entries``
+        came from instead of the index over the whole list.
+        """
+        if self.variation_mode == 'prepass' and self.use_llm:
+            local_variations = self.generate_query_variations(query_name, use_llm=False)
+            matches = self.filter_matches(local_variations, entries, token_index)
+            if self._prepass_is_conclusive(matches):
+                return matches
+            variations = normalize_names(local_variations + self.generate_query_variations(query_name))
+        else:
+            variations = self.generate_query_variations(query_name)
+        
+        logger.info("Generated %d query variations", len(variations))
+        return self.filter_matches(variations, entries, token_index)
     
-    def filter_matches(self, query_variations: List[str], entries: List[SDNEntry]) -> List[Dict]:
+    async def match_async(self, query_name: str, entries: List[SDNEntry],
+                          budget: Optional[LatencyBudget] = None, token_index=None) -> List[Dict]:
+        """
+        Async version of match; CPU-bound filtering runs in a worker thread.
+        
+        With a latency budget the LLM variation call is skipped or cancelled
+        once it would overrun, and rule-based variations are used instead.
+        """
+        if self.variation_mode == 'prepass' and self.use_llm:
+            local_variations = self.generate_query_variations(query_name, use_llm=False)
+            matches = await asyncio.to_thread(self.filter_matches, local_variations, entries, token_index)
+            if self._prepass_is_conclusive(matches):
+                return matches
+            llm_variations = await self._budgeted_variations_async(query_name, budget)
+            variations = normalize_names(local_variations + llm_variations)
+        else:
+            variations = await self._budgeted_variations_async(query_name, budget)
+        
+        logger.info("Generated %d query variations", len(variations))
+        return await asyncio.to_thread(self.filter_matches, variations, entries, token_index)
+    
+    async def _budgeted_variations_async(self, query_name: str, budget: Optional[LatencyBudget]) -> List[str]:
+        """Query variations from the LLM within the budget's share, rule-based otherwise."""
+        if budget is None or not self.use_llm:
+            return await self.generate_query_variations_async(query_name)
+        
+        if not budget.allows('variations'):
+            budget.degrade('variations', "not enough budget for LLM variations")
+        else:
+            try:
+                return await asyncio.wait_for(
+                    self.generate_query_variations_async(query_name, budget), budget.timeout('variations')
+                )
+            except asyncio.TimeoutError:
+                budget.degrade('variations', "LLM variations timed out")
+        return self.generate_query_variations(query_name, use_llm=False)
+    
+    def _prepass_is_conclusive(self, matches: List[Dict]) -> bool:
+        """A strong local match makes the LLM variation call unnecessary."""
+        if matches and matches[0]['score'] >= self.prepass_threshold:
+            logger.info(f"Local variations matched at {matches[0]['score']:.2f}; skipping LLM variations")
+            return True
+        return False
+    
+    def filter_matches(self, query_variations: List[str], entries: List[SDNEntry], token_index=None) -> List[Dict]:
         """Filter entries based on flexible name matching using pre-generated variations."""
         matches = []
         
-        for entry in entries:
-            # Flexible name matching using pre-generated query variations
-            name_score, match_type = self._flexible_name_match_with_variations(
-                query_variations, entry.name, entry.aliases
-            )
-            
+        log_matches = debug_enabled(logger)
+        
+        candidates = self._narrow_by_tokens(query_variations, entries, token_index)
+        for entry, (name_score, match_type) in zip(candidates, self._score_names(query_variations, candidates)):
             if name_score > self.threshold:
-                logger.debug(f"Match: '{entry.name}' -> score: {name_score:.3f} ({match_type})")
+                if log_matches:
+                    logger.debug("Match: '%s' -> score: %.3f (%s)", entry.name, name_score, match_type)
                 matches.append({
                     'entry': entry,
                     'score': name_score,  # Keep for backward compatibility
@@ -41,27 +154,69 @@ class NameMatcher:
         
         # Sort by score
         matches.sort(key=lambda x: x['score'], reverse=True)
-        logger.info(f"Filtered to {len(matches)} matches above threshold {self.threshold}")
-        return matches[:10]  # Return top 10 matches for LLM processing
+        logger.info("Filtered to %d matches above threshold %s", len(matches), self.threshold)
+        return matches[:self.max_candidates]
+    
+    def _narrow_by_tokens(self, query_variations: List[str], entries: List[SDNEntry],
+                          token_index=None) -> List[SDNEntry]:
+        """
+        Keep only entries with a name or alias token within a few edits of a
+        query token, or sharing enough of its bigrams.
+        
+        A query token with no indexed neighbour at all (a concatenated or
+        badly misspelled word, or a query of short tokens only) means the
+        index cannot place the query, and every entry is scored instead.
+        """
+        if token_index is None:
+            token_index = self.token_index
+        if token_index is None or not query_variations:
+            return entries
+        
+        # The first variation is the query itself
+        query = query_variations[0]
+        unplaced = token_index.unplaced_tokens(query)
+        if unplaced or not NameTokenIndex.tokenize(query):
+            logger.debug("Token index cannot place %s; scanning all %d entries", unplaced or query, len(entries))
+            return entries
+        ids = token_index.candidate_ids(query_variations)
+        narrowed = [entry for entry in entries if entry.id in ids]
+        logger.debug("Token index narrowed %d entries to %d", len(entries), len(narrowed))
+        return narrowed
+    
+    def _score_names(self, query_variations: List[str], entries: List[SDNEntry]) -> List[NameScore]:
+        """Flexible name matching of each entry, scoring each distinct name string once."""
+        if self.name_table is None:
+            return [
+                self._flexible_name_match_with_variations(query_variations, entry.normalized_name, entry.normalized_aliases)
+                for entry in entries
+            ]
+        
+        scores, work = self.name_table.score(query_variations, entries, self._fuzzy_match_score)
+        logger.debug("Scored %d distinct name strings, %d comparisons saved", work['comparisons'], work['saved'])
+        for k, score in enumerate(scores):
+            if score is None:
+                entry = entries[k]
+                scores[k] = self._flexible_name_match_with_variations(
+                    query_variations, entry.normalized_name, entry.normalized_aliases
+                )
+        return scores
     
     def _flexible_name_match_with_variations(self, query_variations: List[str], target_name: str, aliases: List[str]) -> Tuple[float, str]:
         """Perform flexible name matching using pre-generated query variations."""
         best_score = 0.0
         best_match_type = ""
         
-        # Check main name against all query variations
-        target_name_lower = target_name.lower().strip()
+        # Names, aliases and variations are all pre-normalized
         for q_var in query_variations:
-            score = self._fuzzy_match_score(q_var, target_name_lower)
+            score = self._fuzzy_match_score(q_var, target_name)
             if score > best_score:
                 best_score = score
                 best_match_type = "name"
         
         # Check aliases against all query variations
         for alias in aliases:
-            alias_lower = alias.lower().strip()
             for q_var in query_variations:
-                score = self._fuzzy_match_score(q_var, alias_lower)
+                score = self._fuzzy_match_score(q_var, alias)
                 if score > best_score:
                     best_score = score
                     best_match_type = "alias"
@@ -79,11 +234,17 @@ class NameMatcher:
             except Exception as e:
                 logger.warning(f"LLM name generation failed, falling back to rule-based: {e}")
         
-        # Fallback to rule-based variations
-        variations = [name.lower().strip()]
+        return self._generate_rule_based_variations(name)
+    
+    def _generate_rule_based_variations(self, name: str) -> List[str]:
+        """Generate name variations without the LLM."""
+        name = normalize_name(name)
+        
+        # Nicknames, transliteration variants and word orders from the offline engine
+        variations = self.variant_engine.generate(name, max_variations=10)
         
         # Split name into parts
-        parts = name.lower().split()
+        parts = name.split()
         
         # Add variations with different orders
         if len(parts) >= 2:
@@ -107,7 +268,7 @@ class NameMatcher:
             if len(part) > 3:  # Only for longer names
                 variations.append(part)
         
-        return list(set(variations))  # Remove duplicates
+        return list(dict.fromkeys(variations))  # Remove duplicates, keep ranking
     
     @staticmethod
     def _fuzzy_match_score(str1: str, str2: str) -> float:
@@ -0,0 +1,86 @@
+from typing import Callable, Dict, List, Tuple
+
+from ..models.sdn import SDNEntry
+
+# (best score, "name" | "alias" | "") for one entry
+NameScore = Tuple[float, str]
+
+
+class NameTable:
+    """
+    Every distinct normalized name and alias, stored once.
+
+    Built at load time: ``strings`` holds each distinct string, ``owners``
+    maps a string id back to the positions of the entries that use it, and
+    each entry keeps the ids of its name and aliases. Common names and
+    aliases shared by linked entities are therefore scored once per query
+    and the score is fanned out to every entry that carries them.
+    """
+
+    def __init__(self, entries: List[SDNEntry]):
+        self.entries = entries
+        self.positions: Dict[str, int] = {}
+        self.strings: List[str] = []
+        string_ids: Dict[str, int] = {}
+        owners: List[List[int]] = []
+        # Per entry position: (name string id, alias string ids)
+        self.entry_strings: List[Tuple[int, Tuple[int, ...]]] = []
+        for i, entry in enumerate(entries):
+            self.positions[entry.id] = i
+            ids = []
+            for string in [entry.normalized_name] + entry.normalized_aliases:
+                string_id = string_ids.get(string)
+                if string_id is None:
+                    string_id = string_ids[string] = len(self.strings)
+                    self.strings.append(string)
+                    owners.append([])
+                if not owners[string_id] or owners[string_id][-1] != i:
+                    owners[string_id].append(i)
+                ids.append(string_id)
+            self.entry_strings.append((ids[0], tuple(ids[1:])))
+        self.owners: List[Tuple[int, ...]] = [tuple(positions) for positions in owners]
+        self.occurrences = sum(1 + len(aliases) for _, aliases in self.entry_strings)
+
+    def score(self, query_variations: List[str], entries: List[SDNEntry],
+              fuzzy: Callable[[str, str], float]) -> Tuple[List[NameScore], Dict[str, int]]:
+        """
+        Best name or alias score for each entry, in the order given, and the
+        number of string comparisons made and saved.
+
+        Each distinct string among the entries is compared with the query
+        variations once. As before, an alias only wins over the primary name
+        with a strictly higher score. Entries not in the table (e.g. from an
+        older list) return None for the caller to score directly.
+        """
+        located: Dict[int, int] = {}
+        for k, entry in enumerate(entries):
+            position = self.positions.get(entry.id)
+            if position is not None and self.entries[position] is entry:
+                located[position] = k
+
+        string_ids = set()
+        for position in located:
+            name_id, alias_ids = self.entry_strings[position]
+            string_ids.add(name_id)
+            string_ids.update(alias_ids)
+
+        best = {}
+        for string_id in string_ids:
+            string = self.strings[string_id]
+            best[string_id] = max((fuzzy(q_var, string) for q_var in query_variations), default=0.0)
+
+        scores: List = [None] * len(entries)
+        for position, k in located.items():
+            name_id, alias_ids = self.entry_strings[position]
+            score, match_type = best[name_id], "name"
+            for alias_id in alias_ids:
+                if best[alias_id] > score:
+                    score, match_type = best[alias_id], "alias"
+            scores[k] = (score, match_type if score > 0 else "")
+
+        occurrences = sum(1 + len(self.entry_strings[position][1]) for position in located)
+        work = {
+            'comparisons': len(string_ids) * len(query_variations),
+            'saved': (occurrences - len(string_ids)) * len(query_variations)
+        }
+        return scores, work
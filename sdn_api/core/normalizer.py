@@ -0,0 +1,92 @@
+import re
+import unicodedata
+from typing import Dict, Iterable, List
+
+# Rule-based romanization tables, keyed by lowercase source character.
+# Cyrillic follows BGN/PCGN-style conventions (Russian, Ukrainian, Serbian).
+CYRILLIC = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'e', 'ж': 'zh', 'з': 'z',
+    'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r',
+    'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'kh', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh',
+    'щ': 'shch', 'ъ': '', 'ы': 'y', 'ь': '', 'э': 'e', 'ю': 'yu', 'я': 'ya',
+    'і': 'i', 'ї': 'yi', 'є': 'ye', 'ґ': 'g', 'ў': 'u',
+    'ђ': 'dj', 'ј': 'j', 'љ': 'lj', 'њ': 'nj', 'ћ': 'c', 'џ': 'dz', 'ѓ': 'gj', 'ќ': 'kj', 'ѕ': 'dz',
+}
+
+GREEK = {
+    'α': 'a', 'β': 'v', 'γ': 'g', 'δ': 'd', 'ε': 'e', 'ζ': 'z', 'η': 'i', 'θ': 'th', 'ι': 'i',
+    'κ': 'k', 'λ': 'l', 'μ': 'm', 'ν': 'n', 'ξ': 'x', 'ο': 'o', 'π': 'p', 'ρ': 'r', 'σ': 's',
+    'ς': 's', 'τ': 't', 'υ': 'y', 'φ': 'f', 'χ': 'ch', 'ψ': 'ps', 'ω': 'o',
+}
+
+# Arabic script (including Persian/Urdu letters). Short vowels are written as
+# diacritics and are dropped with the other combining marks.
+ARABIC = {
+    'ا': 'a', 'أ': 'a', 'إ': 'i', 'آ': 'a', 'ٱ': 'a', 'ب': 'b', 'ت': 't', 'ث': 'th', 'ج': 'j',
+    'ح': 'h', 'خ': 'kh', 'د': 'd', 'ذ': 'dh', 'ر': 'r', 'ز': 'z', 'س': 's', 'ش': 'sh', 'ص': 's',
+    'ض': 'd', 'ط': 't', 'ظ': 'z', 'ع': '', 'غ': 'gh', 'ف': 'f', 'ق': 'q', 'ك': 'k', 'ل': 'l',
+    'م': 'm', 'ن': 'n', 'ه': 'h', 'و': 'w', 'ي': 'y', 'ى': 'a', 'ة': 'a', 'ء': '', 'ئ': 'y',
+    'ؤ': 'w', 'پ': 'p', 'چ': 'ch', 'ژ': 'zh', 'گ': 'g', 'ک': 'k', 'ی': 'y', 'ے': 'y', 'ٹ': 't',
+    'ڈ': 'd', 'ڑ': 'r', 'ں': 'n', 'ھ': 'h', 'ـ': '',
+}
+
+# Greek vowel digraphs romanized as a unit
+GREEK_DIGRAPHS = {'ου': 'ou', 'αυ': 'av', 'ευ': 'ev'}
+
+# Latin letters that NFKD does not decompose into a base letter + mark
+LATIN_SPECIAL = {
+    'æ': 'ae', 'ø': 'o', 'œ': 'oe', 'ł': 'l', 'đ': 'd', 'ð': 'd', 'þ': 'th', 'ħ': 'h',
+    'ı': 'i', 'ŋ': 'ng', 'ſ': 's',
+}
+
+# Apostrophes and similar marks are deleted ("O'Brien" -> "obrien")
+DELETED = "'‘’ʼʻ`´"
+
+# Cyrillic and Arabic are romanized before decomposition, since NFKD would
+# split letters such as "й" into a base letter and a mark
+_PRE_TABLE: Dict[int, str] = {
+    ord(char): latin
+    for table in (CYRILLIC, ARABIC)
+    for char, latin in table.items()
+}
+_PRE_TABLE.update({ord(char): '' for char in DELETED})
+# Greek is romanized after decomposition so accented vowels reach their base form
+_POST_TABLE: Dict[int, str] = {
+    ord(char): latin
+    for table in (GREEK, LATIN_SPECIAL)
+    for char, latin in table.items()
+}
+_GREEK_DIGRAPH = re.compile('|'.join(GREEK_DIGRAPHS))
+
+_SEPARATORS = re.compile(r'[^a-z0-9,]+')
+_COMMA_SPACING = re.compile(r'\s*,\s*')
+
+
+def normalize_name(text: str) -> str:
+    """
+    Fold a name to lowercase ASCII for matching.
+
+    Casefolds, romanizes Cyrillic, Greek and Arabic script, strips diacritics
+    (NFKD), drops apostrophes and turns other punctuation into spaces.
+    Commas are kept so "LAST, First" forms line up with the SDN list.
+    """
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFC', text).casefold().translate(_PRE_TABLE)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = _GREEK_DIGRAPH.sub(lambda m: GREEK_DIGRAPHS[m.group(0)], text)
+    text = text.translate(_POST_TABLE)
+    text = _SEPARATORS.sub(' ', text)
+    text = _COMMA_SPACING.sub(', ', text)
+    return ' '.join(text.split()).strip(' ,')
+
+
+def normalize_names(names: Iterable[str]) -> List[str]:
+    """Normalize names, dropping empties and duplicates while keeping order."""
+    seen = []
+    for name in names:
+        normalized = normalize_name(name)
+        if normalized and normalized not in seen:
+            seen.append(normalized)
+    return seen
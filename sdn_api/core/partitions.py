@@ -0,0 +1,129 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..models.sdn import SDNEntry
+from .token_index import NameTokenIndex
+
+# Entry types a search can be routed to; blank SDN types are entities
+ENTITY_TYPES = ('individual', 'entity', 'vessel', 'aircraft')
+
+# Whole words that mark a query as naming an organization, a vessel or an aircraft
+ORGANIZATION_WORDS = frozenset({
+    'company', 'corp', 'corporation', 'inc', 'incorporated', 'ltd', 'limited', 'llc', 'plc', 'gmbh',
+    'bank', 'association', 'group', 'holding', 'holdings', 'trading', 'industries', 'enterprise',
+    'enterprises', 'establishment', 'foundation', 'organization', 'organisation', 'institute', 'ministry',
+    'fze', 'fzco', 'jsc', 'ojsc', 'pjsc', 'cjsc'
+})
+VESSEL_WORDS = frozenset({'vessel', 'tanker', 'mv', 'm/v', 'm/t', 'imo'})
+AIRCRAFT_WORDS = frozenset({'aircraft', 'airplane', 'aeroplane', 'helicopter'})
+
+_WORD = re.compile(r"[a-z0-9/]+")
+
+
+def entry_type(entry: SDNEntry) -> str:
+    """Normalized type an entry is partitioned (and faceted) under."""
+    return entry.type.strip().lower() or 'entity'
+
+
+def normalize_entity_type(value: str) -> str:
+    """Validate an explicitly requested entity type."""
+    normalized = value.strip().lower()
+    if normalized not in ENTITY_TYPES:
+        raise ValueError(f"Unknown entity type '{value}'. Expected one of: {', '.join(ENTITY_TYPES)}")
+    return normalized
+
+
+def detect_entity_type(name: str, dob_ranges: Iterable = ()) -> Optional[str]:
+    """
+    Guess the entry type a query is looking for, or None when it could be any.
+
+    Only positive evidence routes a search: organization, vessel or aircraft
+    words in the name, or a date of birth, which only individuals carry. A bare
+    name, or one with markers of more than one type, is searched against every
+    partition, since it may equally be a person or an organization.
+    """
+    words = set(_WORD.findall(name.lower()))
+    marked = [type_ for type_, markers in (('vessel', VESSEL_WORDS), ('aircraft', AIRCRAFT_WORDS),
+                                           ('entity', ORGANIZATION_WORDS)) if words & markers]
+    if marked:
+        # "Tanker Management Ltd" is a company: conflicting evidence routes nowhere
+        return marked[0] if len(marked) == 1 else None
+    if dob_ranges:
+        return 'individual'
+    return None
+
+
+class TokenIndexUnion:
+    """Answers token lookups from several partition indexes at once."""
+
+    def __init__(self, indexes: List[NameTokenIndex]):
+        self.indexes = indexes
+
+    def unplaced_tokens(self, name: str, max_distance: Optional[int] = None) -> List[str]:
+        """Tokens no partition index can place."""
+        unplaced = NameTokenIndex.tokenize(name)
+        for index in self.indexes:
+            if not unplaced:
+                break
+            unplaced = [token for token in unplaced if not index.within(token, max_distance)]
+        return unplaced
+
+    def candidate_ids(self, names: Iterable[str], max_distance: Optional[int] = None) -> Set[str]:
+        names = list(names)
+        ids: Set[str] = set()
+        for index in self.indexes:
+            ids |= index.candidate_ids(names, max_distance)
+        return ids
+
+
+class TypePartitions:
+    """
+    The entry list split by entry type at load time, each partition with its
+    own token index.
+
+    A search routed to one type scans only that partition and looks its
+    tokens up in that partition's (smaller) index; a person search never
+    touches the entity, vessel or aircraft entries.
+    """
+
+    def __init__(self, entries: List[SDNEntry]):
+        self.entries: Dict[str, List[SDNEntry]] = {}
+        for entry in entries:
+            self.entries.setdefault(entry_type(entry), []).append(entry)
+        self.token_indexes: Dict[str, NameTokenIndex] = {
+            type_: NameTokenIndex(partition) for type_, partition in self.entries.items()
+        }
+        self.all_types: Tuple[str, ...] = tuple(self.entries)
+
+    @staticmethod
+    def route(entity_type: Optional[str], filter_types: Optional[List[str]]) -> Optional[Tuple[str, ...]]:
+        """
+        Types a search covers, or None for all of them.
+
+        A ``type`` facet filter is a hard restriction; the query's entity type
+        narrows within it and is ignored when the two disagree.
+        """
+        if filter_types:
+            if entity_type in filter_types:
+                return (entity_type,)
+            return tuple(filter_types)
+        return (entity_type,) if entity_type else None
+
+    def select(self, types: Optional[Tuple[str, ...]], all_entries: List[SDNEntry]) -> List[SDNEntry]:
+        """Entries of the given types; several types keep the original list order."""
+        if types is None:
+            return all_entries
+        if len(types) == 1:
+            return self.entries.get(types[0], [])
+        wanted = set(types)
+        return [entry for entry in all_entries if entry_type(entry) in wanted]
+
+    def token_index(self, types: Optional[Tuple[str, ...]]):
+        """The token index covering the given types (all of them for None)."""
+        types = self.all_types if types is None else [t for t in types if t in self.token_indexes]
+        if len(types) == 1:
+            return self.token_indexes[types[0]]
+        return TokenIndexUnion([self.token_indexes[t] for t in types])
+
+    def counts(self) -> Dict[str, int]:
+        return {type_: len(partition) for type_, partition in self.entries.items()}
@@ -0,0 +1,273 @@
+import math
+import threading
+from typing import Dict, List, Optional
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Loaded on first use; tiktoken reads its BPE tables when the encoding is created
+_ENCODING = None
+_ENCODING_LOADED = False
+
+# Average characters per token for English and romanized names
+CHARS_PER_TOKEN = 4
+
+TRUNCATION_MARK = " [...]"
+
+
+def _encoding():
+    global _ENCODING, _ENCODING_LOADED
+    if not _ENCODING_LOADED:
+        try:
+            import tiktoken
+            _ENCODING = tiktoken.get_encoding("o200k_base")
+        except Exception:  # tiktoken is optional; fall back to a character heuristic
+            _ENCODING = None
+        _ENCODING_LOADED = True
+    return _ENCODING
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of ``text``: exact with tiktoken installed, estimated otherwise."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` at a word boundary so it fits in ``max_tokens``, marking the cut."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= estimate_tokens(TRUNCATION_MARK):
+        return ""
+    limit = (max_tokens - estimate_tokens(TRUNCATION_MARK)) * CHARS_PER_TOKEN
+    cut = text[:limit]
+    while cut and estimate_tokens(cut) > max_tokens - estimate_tokens(TRUNCATION_MARK):
+        cut = cut[:int(len(cut) * 0.9)]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,;') + TRUNCATION_MARK
+
+
+# Static instructions come first so every call of a kind starts with an
+# identical prefix; per-call data follows. OpenAI only caches prompts from
+# PROMPT_CACHE_MIN_TOKENS up, and these prefixes are far smaller
+# (see static_prefix_tokens), so calls are not cached today and
+# cached_tokens stays 0. The ordering only pays off if the instructions grow
+# past that size.
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+VARIATIONS_SYSTEM = "You are a name variation generator. Return only JSON arrays."
+VARIATIONS_TEMPLATE = """Generate up to {max_variations} name variations for the person named at the end.
+
+Include variations such as:
+- Different name orders (first last, last first)
+- Common nicknames and diminutives
+- Alternative transliterations
+- With/without middle names or initials
+- Common spelling variations
+
+Return ONLY a JSON array of name strings, nothing else.
+Example: ["John Smith", "Smith, John", "J. Smith", "Johnny Smith"]
+
+Person: "{name}\""""
+
+ASSESSMENT_SYSTEM = "You are an expert at identity matching and sanctions screening. Return only valid JSON."
+ASSESSMENT_INSTRUCTIONS = """Assess if the candidate below is a true match for the search query.
+
+Analyze the match considering:
+1. Name similarity (including aliases)
+2. DOB match (if provided)
+3. Nationality/country match (if provided)
+4. Overall context and likelihood
+
+Return a JSON object with:
+{
+    "is_match": true/false,
+    "confidence": "HIGH"/"MEDIUM"/"LOW",
+    "score": 0.0-1.0,
+    "reasoning": "Brief explanation"
+}"""
+
+EXPLANATION_SYSTEM = "You are a sanctions compliance expert providing detailed match assessments for screening systems."
+EXPLANATION_INSTRUCTIONS = """You are an expert sanctions compliance analyst. Provide a detailed assessment of the likelihood that the matched individual/entity below is a true match for the search query.
+
+Please provide:
+1. A thorough analysis of the match likelihood
+2. Key factors supporting or contradicting the match
+3. Any red flags or areas requiring additional verification
+4. Your overall assessment of whether this is likely the same person/entity
+
+Be specific and detailed in your analysis, considering all available data points."""
+
+QUERY_TEMPLATE = """Search Query:
+- Name: {name}
+- Date of Birth: {dob}
+- Nationality/Country: {nationality}"""
+
+ENTRY_TEMPLATE = """{heading}:
+- Name: {name}
+- Type: {type}
+- Date of Birth: {dob}
+- Place of Birth: {pob}
+- Nationality: {nationality}
+- Program: {program}
+- Aliases: {aliases}
+- Remarks: {remarks}"""
+
+SCORES_TEMPLATE = """Initial Scores:
+- Name Match Score: {name_match_score:.3f}
+- Context Score: {llm_score:.3f}
+- Confidence Level: {confidence}"""
+
+
+def static_prefix_tokens() -> Dict[str, int]:
+    """Tokens of the part of each call kind's prompt that is the same on every call."""
+    return {
+        'variations': estimate_tokens(VARIATIONS_SYSTEM) + estimate_tokens(VARIATIONS_TEMPLATE.split('{name}')[0]),
+        'assessment': estimate_tokens(ASSESSMENT_SYSTEM) + estimate_tokens(ASSESSMENT_INSTRUCTIONS),
+        'explanation': estimate_tokens(EXPLANATION_SYSTEM) + estimate_tokens(EXPLANATION_INSTRUCTIONS)
+    }
+
+
+class Prompt:
+    """Chat messages for one LLM call plus their estimated size."""
+
+    __slots__ = ('kind', 'messages', 'tokens', 'truncated')
+
+    def __init__(self, kind: str, system: str, user: str, truncated: List[str]):
+        self.kind = kind
+        self.messages = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user}
+        ]
+        self.tokens = estimate_tokens(system) + estimate_tokens(user)
+        self.truncated = truncated
+
+
+class PromptBuilder:
+    """
+    Builds every LLM prompt from the shared templates.
+
+    The variable part of a candidate (aliases and remarks, which can run to
+    kilobytes) is fitted into ``field_token_budget``: aliases are kept whole
+    up to half of the budget left after the fixed fields, and remarks get
+    the rest. ``None`` disables truncation.
+    """
+
+    def __init__(self, field_token_budget: Optional[int] = 600):
+        self.field_token_budget = field_token_budget
+
+    def variations(self, name: str, max_variations: int) -> Prompt:
+        user = VARIATIONS_TEMPLATE.format(max_variations=max_variations, name=name)
+        return Prompt('variations', VARIATIONS_SYSTEM, user, [])
+
+    def assessment(self, query_info: Dict, candidate: Dict) -> Prompt:
+        entry_block, truncated = self._entry_block("Candidate", candidate['entry'])
+        user = "\n\n".join([ASSESSMENT_INSTRUCTIONS, self._query_block(query_info), entry_block])
+        return Prompt('assessment', ASSESSMENT_SYSTEM, user, truncated)
+
+    def explanation(self, query_info: Dict, match: Dict) -> Prompt:
+        entry_block, truncated = self._entry_block("Matched Individual/Entity", match['entry'])
+        scores = SCORES_TEMPLATE.format(
+            name_match_score=match.get('name_match_score', 0),
+            llm_score=match.get('llm_score', 0),
+            confidence=match.get('confidence', 'UNKNOWN')
+        )
+        user = "\n\n".join([EXPLANATION_INSTRUCTIONS, self._query_block(query_info), entry_block, scores])
+        return Prompt('explanation', EXPLANATION_SYSTEM, user, truncated)
+
+    @staticmethod
+    def _query_block(query_info: Dict) -> str:
+        return QUERY_TEMPLATE.format(
+            name=query_info['name'],
+            dob=query_info.get('dob') or 'Not specified',
+            nationality=query_info.get('nationality') or 'Not specified'
+        )
+
+    def _entry_block(self, heading: str, entry):
+        fields = {
+            'heading': heading,
+            'name': entry.name,
+            'type': entry.type,
+            'dob': entry.dob or 'Not specified',
+            'pob': entry.pob or 'Not specified',
+            'nationality': entry.nationality or 'Not specified',
+            'program': entry.program,
+            'aliases': ', '.join(entry.aliases) if entry.aliases else 'None',
+            'remarks': entry.remarks or 'None'
+        }
+        if self.field_token_budget is None:
+            return ENTRY_TEMPLATE.format(**fields), []
+
+        truncated = []
+        fixed = ENTRY_TEMPLATE.format(**dict(fields, aliases='', remarks=''))
+        remaining = max(0, self.field_token_budget - estimate_tokens(fixed))
+
+        if estimate_tokens(fields['aliases']) > remaining // 2:
+            kept, used = [], 0
+            for alias in entry.aliases:
+                cost = estimate_tokens(alias) + 1
+                if used + cost > remaining // 2:
+                    break
+                kept.append(alias)
+                used += cost
+            fields['aliases'] = ', '.join(kept) + f" (+{len(entry.aliases) - len(kept)} more)"
+            truncated.append('aliases')
+        remaining -= estimate_tokens(fields['aliases'])
+
+        remarks = truncate_to_tokens(fields['remarks'], max(0, remaining))
+        if remarks != fields['remarks']:
+            fields['remarks'] = remarks or 'Truncated'
+            truncated.append('remarks')
+        return ENTRY_TEMPLATE.format(**fields), truncated
+
+
+class TokenAccounting:
+    """Thread-safe per-kind counters of prompt size, provider token usage and latency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, float]] = {}
+
+    def record(self, prompt: Prompt, usage, latency: float):
+        """Add one call; ``usage`` is the provider's usage object (or None on failure)."""
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', 0) or 0
+        with self._lock:
+            totals = self._totals.setdefault(prompt.kind, {
+                'calls': 0, 'estimated_prompt_tokens': 0, 'prompt_tokens': 0, 'cached_tokens': 0,
+                'completion_tokens': 0, 'truncated_calls': 0, 'latency': 0.0
+            })
+            totals['calls'] += 1
+            totals['estimated_prompt_tokens'] += prompt.tokens
+            totals['prompt_tokens'] += prompt_tokens
+            totals['cached_tokens'] += cached_tokens
+            totals['completion_tokens'] += completion_tokens
+            totals['truncated_calls'] += bool(prompt.truncated)
+            totals['latency'] += latency
+        logger.debug(
+            f"{prompt.kind} call: ~{prompt.tokens} prompt tokens estimated, {prompt_tokens} billed "
+            f"({cached_tokens} cached), {completion_tokens} completion, {latency * 1000:.0f}ms"
+        )
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                kind: {
+                    'calls': totals['calls'],
+                    'avg_estimated_prompt_tokens': round(totals['estimated_prompt_tokens'] / totals['calls'], 1),
+                    'prompt_tokens': totals['prompt_tokens'],
+                    'cached_tokens': totals['cached_tokens'],
+                    'completion_tokens': totals['completion_tokens'],
+                    'truncated_calls': totals['truncated_calls'],
+                    'avg_latency_ms': round(totals['latency'] / totals['calls'] * 1000, 1)
+                }
+                for kind, totals in self._totals.items()
+            }
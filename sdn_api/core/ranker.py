@@ -1,10 +1,10 @@
-import re
 import asyncio
-from typing import List, Dict, Optional
-from difflib import SequenceMatcher
+from typing import List, Dict, Optional, Tuple
 
 from ..models.sdn import ConfidenceLevel
-from .llm_service import LLMService
+from .llm_service import LLMService, run_coroutine
+from .context_scorer import ContextScorer
+from .budget import LatencyBudget
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -13,114 +13,103 @@ logger = setup_logger(__name__)
 class MatchRanker:
     """Step 2: Rank filtered matches using additional context."""
     
-    def __init__(self, use_llm: bool = True):
+    def __init__(self, use_llm: bool = True, llm_candidates: int = 10):
         self.use_llm = use_llm
         self.llm_service = LLMService() if use_llm else None
+        # Only the best pre-ranked candidates are sent for LLM assessment
+        self.llm_candidates = llm_candidates
+        # Set by the search service once the list is loaded
+        self.context: Optional[ContextScorer] = None
     
     def rank_matches(self, query_info: Dict[str, Optional[str]], filtered_matches: List[Dict]) -> List[Dict]:
         """
         Rank matches considering nationality, DOB, and other contextual factors.
-        Uses parallel LLM assessment for speed.
+        
+        Every match is pre-ranked by the rule-based context scorer; with the
+        LLM enabled the top ``llm_candidates`` are then assessed in parallel
+        and ranked ahead of the rest.
         """
-        if self.use_llm and self.llm_service and filtered_matches:
+        window, rest = self._pre_rank(query_info, filtered_matches)
+        if window:
             try:
-                # Use parallel LLM assessment
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    filtered_matches = loop.run_until_complete(
-                        self.llm_service.assess_matches_parallel(query_info, filtered_matches)
-                    )
-                finally:
-                    loop.close()
+                # Use parallel LLM assessment on the shared background loop
+                window = run_coroutine(self.llm_service.assess_matches_parallel(query_info, window))
             except Exception as e:
                 logger.warning(f"Parallel LLM assessment failed, falling back to rule-based: {e}")
                 # Fall back to rule-based scoring for all matches
-                self._apply_rule_based_scoring(query_info, filtered_matches)
-        else:
-            # Use rule-based scoring when LLM is disabled
-            self._apply_rule_based_scoring(query_info, filtered_matches)
+                self._apply_rule_based_scoring(query_info, window)
         
         # Re-sort by LLM score
-        filtered_matches.sort(key=lambda x: x['llm_score'], reverse=True)
-        return filtered_matches
+        window.sort(key=lambda x: x['llm_score'], reverse=True)
+        return window + rest
     
-    def _apply_rule_based_scoring(self, query_info: Dict[str, Optional[str]], filtered_matches: List[Dict]):
-        """Apply rule-based scoring as fallback."""
-        query_dob = query_info.get('dob')
-        query_nationality = query_info.get('nationality')
-        query_name = query_info.get('name', '').lower()
+    async def rank_matches_async(self, query_info: Dict[str, Optional[str]], filtered_matches: List[Dict],
+                                 budget: Optional[LatencyBudget] = None) -> List[Dict]:
+        """
+        Async version of rank_matches that runs on the caller's event loop.
         
-        for match in filtered_matches:
-            entry = match['entry']
-            enhanced_score = match['score']
-            additional_reasons = []
-            
-            # DOB matching (strong indicator)
-            if query_dob and entry.dob:
-                if self._compare_dates(query_dob, entry.dob):
-                    enhanced_score += 0.3
-                    additional_reasons.append("DOB match")
-            
-            # Nationality matching
-            if query_nationality and entry.nationality:
-                nat_score = self._fuzzy_match_score(query_nationality, entry.nationality)
-                if nat_score > 0.8:
-                    enhanced_score += 0.2
-                    additional_reasons.append("Nationality match")
-            
-            # Country/Program matching (for organizations)
-            if query_nationality and entry.program:
-                country_score = self._fuzzy_match_score(query_nationality, entry.program)
-                if country_score > 0.8:
-                    enhanced_score += 0.15
-                    additional_reasons.append("Country/Program match")
-            
-            # Type consistency (individual vs entity)
-            if 'individual' in entry.type.lower():
-                if not any(org_word in query_name 
-                          for org_word in ['company', 'corp', 'inc', 'ltd', 'bank', 'association']):
-                    enhanced_score += 0.05
-                    additional_reasons.append("Individual type match")
+        With a latency budget, outstanding LLM assessments are cancelled when
+        the ranking share runs out and rule-based scoring is used instead;
+        timeouts and failed assessments are recorded as a degraded stage.
+        """
+        window, rest = self._pre_rank(query_info, filtered_matches)
+        if window and budget is not None and not budget.allows('ranking'):
+            budget.degrade('ranking', "not enough budget for LLM ranking")
+            self._apply_rule_based_scoring(query_info, window)
+        elif window:
+            try:
+                window = await asyncio.wait_for(
+                    self.llm_service.assess_matches_parallel(query_info, window),
+                    budget.timeout('ranking') if budget else None
+                )
+            except asyncio.TimeoutError:
+                if budget is not None:
+                    budget.degrade('ranking', "LLM assessments timed out")
+                self._apply_rule_based_scoring(query_info, window)
+            except Exception as e:
+                logger.warning(f"Parallel LLM assessment failed, falling back to rule-based: {e}")
+                if budget is not None:
+                    budget.degrade('ranking', f"LLM assessment failed: {e}")
+                self._apply_rule_based_scoring(query_info, window)
             else:
-                if any(org_word in query_name 
-                      for org_word in ['company', 'corp', 'inc', 'ltd', 'bank', 'association']):
-                    enhanced_score += 0.05
-                    additional_reasons.append("Entity type match")
-            
-            # Context relevance from remarks
-            if entry.remarks:
-                remarks_lower = entry.remarks.lower()
-                query_words = query_name.split()
-                context_matches = sum(1 for word in query_words if word in remarks_lower)
-                if context_matches > 0:
-                    enhanced_score += context_matches * 0.02
-                    additional_reasons.append(f"Context relevance ({context_matches} terms)")
-            
-            match['match_reasons'].extend(additional_reasons)
-            match['llm_score'] = min(enhanced_score, 1.0)  # Cap at 1.0
-            match['confidence'] = self._calculate_confidence(match['llm_score'], additional_reasons)
-            # Ensure name_match_score is preserved
-            if 'name_match_score' not in match:
-                match['name_match_score'] = match.get('score', 0)
-    
-    @staticmethod
-    def _compare_dates(query_date: str, entry_date: str) -> bool:
-        """Compare dates allowing for different formats."""
-        # Simple comparison - in production you'd want more robust date parsing
-        query_clean = re.sub(r'[^0-9]', '', query_date)
-        entry_clean = re.sub(r'[^0-9]', '', entry_date)
-        
-        # Check if dates contain similar numbers
-        if len(query_clean) >= 6 and len(entry_clean) >= 6:
-            return query_clean in entry_clean or entry_clean in query_clean
+                failed = sum(1 for match in window if match.get('llm_failed'))
+                if failed and budget is not None:
+                    budget.degrade('ranking', f"{failed} of {len(window)} LLM assessments failed")
         
-        return False
+        window.sort(key=lambda x: x['llm_score'], reverse=True)
+        return window + rest
     
-    @staticmethod
-    def _fuzzy_match_score(str1: str, str2: str) -> float:
-        """Calculate fuzzy match score between two strings."""
-        return SequenceMatcher(None, str1.lower(), str2.lower()).ratio()
+    def _pre_rank(self, query_info: Dict[str, Optional[str]], filtered_matches: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Order every match by its rule-based context score and split off the
+        LLM window: ``(unscored window for the LLM, scored rest)``. Without the
+        LLM the window is empty and every match is scored.
+        """
+        scores = self._context_scorer(filtered_matches).score(query_info, filtered_matches)
+        order = sorted(range(len(filtered_matches)), key=lambda k: scores[k][0], reverse=True)
+        llm_window = self.llm_candidates if self.use_llm and self.llm_service else 0
+        for k in order[llm_window:]:
+            self._apply_score(filtered_matches[k], *scores[k])
+        ranked = [filtered_matches[k] for k in order]
+        return ranked[:llm_window], ranked[llm_window:]
+    
+    def _apply_rule_based_scoring(self, query_info: Dict[str, Optional[str]], filtered_matches: List[Dict]):
+        """Apply rule-based scoring as fallback."""
+        scores = self._context_scorer(filtered_matches).score(query_info, filtered_matches)
+        for match, (score, additional_reasons) in zip(filtered_matches, scores):
+            self._apply_score(match, score, additional_reasons)
+    
+    def _context_scorer(self, matches: List[Dict]) -> ContextScorer:
+        # Without the list-wide columns, build them over just these candidates
+        return self.context or ContextScorer([match['entry'] for match in matches])
+    
+    def _apply_score(self, match: Dict, score: float, additional_reasons: List[str]):
+        match['match_reasons'].extend(additional_reasons)
+        match['llm_score'] = score
+        match['confidence'] = self._calculate_confidence(score, additional_reasons)
+        # Ensure name_match_score is preserved
+        if 'name_match_score' not in match:
+            match['name_match_score'] = match.get('score', 0)
     
     @staticmethod
     def _calculate_confidence(score: float, additional_reasons: List[str]) -> ConfidenceLevel:
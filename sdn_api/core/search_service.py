@@ -1,12 +1,28 @@
-import re
 import asyncio
-from typing import List, Dict, Optional
+import hashlib
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 
 from .data_loader import SDNDataLoader
 from .name_matcher import NameMatcher
 from .ranker import MatchRanker
-from .llm_service import LLMService
-from ..models.sdn import SDNEntry, MatchResult, ConfidenceLevel
+from .llm_service import LLMService, run_coroutine
+from .snapshot import EntrySnapshot
+from .facets import FacetIndex
+from .dob_index import DobIndex, parse_date_ranges
+from .partitions import TypePartitions, detect_entity_type, entry_type, normalize_entity_type
+from .context_scorer import ContextScorer
+from .name_table import NameTable
+from .suggest import MAX_SUGGESTIONS, SuggestIndex
+from .identifiers import IDENTIFIER_LABELS, IdentifierIndex, normalize_identifier, parse_identifier
+from .normalizer import normalize_name
+from .gazetteer import gazetteer
+from .delta import DeltaScreener, entry_content_hash
+from .ledger import ScreeningLedger, record_hash
+from .single_flight import SingleFlight
+from .budget import LatencyBudget
+from .explanations import ExplanationQueue
+from ..models.sdn import SDNEntry, MatchResult, ConfidenceLevel, SearchResponse, Suggestion, SuggestResponse
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -15,44 +31,300 @@ logger = setup_logger(__name__)
 class SDNSearchService:
     """Main search service combining both steps."""
     
-    def __init__(self, sdn_file_path: str, use_llm: bool = True):
+    # inline: explanations are generated inside the search; background: the
+    # search returns explanation ids and a worker pool fills them in
+    EXPLANATION_MODES = ('inline', 'background')
+    MAX_EXPLANATION_WAIT = 30.0
+    
+    def __init__(self, sdn_file_path: str, use_llm: bool = True, use_snapshot: bool = False,
+                 snapshot_dir: Optional[str] = None, variation_mode: str = 'llm',
+                 latency_budget_ms: Optional[int] = None, explanation_mode: str = 'inline',
+                 explanation_store: Optional[str] = None, explanation_workers: int = 4,
+                 detect_entity_types: bool = False, rank_candidates: int = 100, llm_rank_candidates: int = 10,
+                 name_cognates: bool = False):
         logger.info(f"Initializing SDNSearchService with LLM: {use_llm}")
         self.loader = SDNDataLoader(sdn_file_path)
+        self.snapshot = EntrySnapshot(sdn_file_path, snapshot_dir) if use_snapshot else None
         logger.debug("Data loader initialized")
-        self.name_matcher = NameMatcher(use_llm=use_llm)
+        self.name_matcher = NameMatcher(use_llm=use_llm, variation_mode=variation_mode,
+                                        max_candidates=rank_candidates, use_cognates=name_cognates)
         logger.debug("Name matcher initialized")
-        self.ranker = MatchRanker(use_llm=use_llm)
+        self.ranker = MatchRanker(use_llm=use_llm, llm_candidates=llm_rank_candidates)
         logger.debug("Ranker initialized")
         self.use_llm = use_llm
+        # Default per-search latency budget; None waits as long as the LLM takes
+        self.latency_budget_ms = latency_budget_ms
+        # Route searches to the partition of the type the query looks for
+        self.detect_entity_types = detect_entity_types
+        if explanation_mode not in self.EXPLANATION_MODES:
+            raise ValueError(f"Unknown explanation mode '{explanation_mode}'. Expected one of: {', '.join(self.EXPLANATION_MODES)}")
+        self.explanation_queue: Optional[ExplanationQueue] = None
         if use_llm:
             self.llm_service = LLMService()
             logger.debug("LLM service initialized for explanations")
+            if explanation_mode == 'background':
+                self.explanation_queue = ExplanationQueue(self.llm_service, explanation_store, explanation_workers)
         self.entries: List[SDNEntry] = []
+        # Identical concurrent searches share one execution
+        self.flights = SingleFlight("search")
         logger.info("Loading SDN data...")
         self.load_data()
         logger.info(f"Service fully initialized with {len(self.entries)} entries")
     
     def load_data(self):
-        """Load SDN data into memory."""
-        self.entries = self.loader.load_entries()
+        """Load SDN data into memory, via the shared snapshot when enabled."""
+        if self.snapshot:
+            tables = self.snapshot.load_or_build(self._build_tables)
+        else:
+            tables = self._build_tables()
+        self.entries = tables['entries']
+        self.facets: FacetIndex = tables['facets']
+        self.dob_index: DobIndex = tables['dob_index']
+        self.partitions: TypePartitions = tables['partitions']
+        self.identifier_index: IdentifierIndex = tables['identifier_index']
+        self.ranker.context = tables['context']
+        self.name_matcher.token_index = self.partitions.token_index(None)
+        self.name_matcher.name_table = tables['name_table']
+        self.suggest_index: SuggestIndex = tables['suggest_index']
+        self.list_version: str = tables['list_version']
+    
+    def _build_tables(self) -> Dict:
+        """Parse the SDN list and build everything derived from it at load time."""
+        # The list is kept whole, not streamed into the builders: every index
+        # addresses entries by position, searches scan it, and it is served
+        # and snapshotted with the tables. The streaming loaders hold no parse
+        # tree or rows alongside it, so peak memory is the list plus indexes.
+        entries = self.loader.load_entries()
+        facets = FacetIndex(entries)
+        dob_index = DobIndex(entries)
+        name_table = NameTable(entries)
+        return {
+            'entries': entries,
+            'facets': facets,
+            'dob_index': dob_index,
+            'context': ContextScorer(entries),
+            'partitions': TypePartitions(entries),
+            'name_table': name_table,
+            'suggest_index': SuggestIndex(name_table),
+            'identifier_index': IdentifierIndex(entries),
+            'list_version': self._compute_list_version(entries)
+        }
+    
+    @staticmethod
+    def _compute_list_version(entries: List[SDNEntry]) -> str:
+        """Content-derived version of the list, stable across reloads of the same data."""
+        digest = hashlib.sha1()
+        for entry in sorted(entries, key=lambda e: e.id):
+            digest.update(f"{entry.id}:{entry_content_hash(entry)}\n".encode("utf-8"))
+        return digest.hexdigest()[:16]
     
-    def search(self, query: str, max_results: int = 10) -> List[MatchResult]:
+    def get_stats(self) -> Dict:
+        """Entry statistics answered from the precomputed facet counts."""
+        types = self.facets.counts['type']
+        individuals = types.get('individual', 0)
+        return {
+            'total_entries': len(self.entries),
+            'individuals': individuals,
+            'entities': len(self.entries) - individuals,
+            'programs': len(self.facets.counts['program']),
+            'partitions': self.partitions.counts(),
+            'identifiers': self.identifier_index.counts,
+            'facets': self.facets.counts,
+            'explanation_jobs': self.explanation_queue.stats() if self.explanation_queue else None,
+            'llm_usage': LLMService.usage.stats(),
+            'coalescing': {
+                'searches': self.flights.stats(),
+                'llm_calls': LLMService.flights.stats()
+            }
+        }
+    
+    def rescreen_delta(self, previous_sdn_file_path: str, customers: Iterable[str],
+                       max_results: int = 10) -> Iterator[Tuple[str, List[MatchResult]]]:
         """
-        Main search function that combines both steps.
+        Rescreen customers against only the entries added or amended since a
+        previous version of the list. Yields ``(customer, results)`` pairs.
         """
-        # Parse query
+        old_entries = SDNDataLoader(previous_sdn_file_path).load_entries()
+        screener = DeltaScreener(self, old_entries)
+        yield from screener.rescreen(customers, max_results)
+    
+    def screening_settings(self, max_results: int, filters: Optional[Dict] = None) -> Dict:
+        """Every search setting a stored screening result depends on, for the ledger key."""
+        normalized_filters = FacetIndex.normalize_filters(filters)
+        return {
+            'max_results': max_results,
+            'threshold': self.name_matcher.threshold,
+            'use_llm': self.use_llm,
+            'variation_mode': self.name_matcher.variation_mode,
+            'prepass_threshold': self.name_matcher.prepass_threshold,
+            'cognates': self.name_matcher.use_cognates,
+            'rank_candidates': self.name_matcher.max_candidates,
+            'llm_rank_candidates': self.ranker.llm_candidates,
+            'detect_entity_types': self.detect_entity_types,
+            'latency_budget_ms': self.latency_budget_ms,
+            'explanation_mode': 'background' if self.explanation_queue else 'inline',
+            'filters': {facet: sorted(values) for facet, values in normalized_filters.items()}
+        }
+    
+    def screen_batch(self, records: Iterable[Tuple[str, str]], ledger: ScreeningLedger,
+                     max_results: int = 10, chunk_size: int = 1000,
+                     filters: Optional[Dict] = None) -> Iterator[Tuple[str, List[MatchResult], bool]]:
+        """
+        Screen ``(customer_id, query)`` records, skipping unchanged pairs.
+        
+        A customer is only searched again when its record hash (which covers
+        the search settings too) or the list version differs from what the
+        ledger holds; otherwise the stored results are returned. Yields
+        ``(customer_id, results, from_ledger)``.
+        """
+        settings = self.screening_settings(max_results, filters)
+        records = iter(records)
+        reused = recomputed = 0
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            
+            stored = ledger.get_many([customer_id for customer_id, _ in chunk])
+            updates = []
+            for customer_id, query in chunk:
+                current_hash = record_hash(query, settings)
+                row = stored.get(customer_id)
+                if row and row.is_current(current_hash, self.list_version):
+                    reused += 1
+                    yield customer_id, row.results, True
+                    continue
+                
+                recomputed += 1
+                results = self.search(query, max_results, filters)
+                updates.append((customer_id, current_hash, self.list_version, results))
+                yield customer_id, results, False
+            
+            if updates:
+                ledger.upsert_many(updates)
+        
+        logger.info(f"Batch screening complete: {recomputed} screened, {reused} reused from ledger")
+    
+    def _query_info(self, query: str, entity_type: Optional[str]) -> Dict:
+        """Parse the query; an explicit entity type replaces the detected one."""
         query_info = self._parse_query(query)
+        if entity_type:
+            query_info['entity_type'] = normalize_entity_type(entity_type)
+        elif not self.detect_entity_types:
+            query_info['entity_type'] = None
+        return query_info
+    
+    def _select_candidates(self, query_info: Dict, filters: Optional[Dict],
+                           exclude_dob_mismatches: bool) -> Tuple[List[SDNEntry], object]:
+        """
+        Narrow the entry list with the type partitions, facet and DOB indexes
+        before any scoring. Returns the candidates and the token index that
+        covers them.
+        """
+        filters = FacetIndex.normalize_filters(filters)
+        types = TypePartitions.route(query_info['entity_type'], filters.pop('type', None))
+        token_index = self.partitions.token_index(types)
+        restrict_dob = exclude_dob_mismatches and query_info['dob_ranges']
+        if not filters and not restrict_dob:
+            return self.partitions.select(types, self.entries), token_index
         
-        # Generate name variations once for the query
-        logger.info(f"Starting search for: '{query_info['name']}'")
-        logger.debug(f"Searching against {len(self.entries)} entries")
-        query_variations = self.name_matcher.generate_query_variations(query_info['name'])
-        logger.info(f"Generated {len(query_variations)} query variations")
+        if types is not None:
+            filters['type'] = list(types)
+        bits = self.facets.select(filters)
+        if restrict_dob:
+            bits &= self.dob_index.compatible_bits(query_info['dob_ranges'])
+        return [self.entries[i] for i in FacetIndex.positions(bits)], token_index
+    
+    def search(self, query: str, max_results: int = 10, filters: Optional[Dict] = None,
+               exclude_dob_mismatches: bool = False, latency_budget_ms: Optional[int] = None,
+               entity_type: Optional[str] = None) -> List[MatchResult]:
+        """
+        Main search function that combines both steps.
+        
+        ``filters`` restricts the candidate set by facet (program, type,
+        nationality, source) before any scoring. ``exclude_dob_mismatches``
+        additionally drops entries whose recorded DOB cannot overlap the
+        query DOB; entries without a DOB are always kept. ``entity_type``
+        (individual, entity, vessel, aircraft) searches only that partition
+        of the list; without it every partition is searched, unless entity
+        type detection is switched on. Concurrent searches for the same
+        normalized query share one execution.
+        """
+        return list(self.search_response(query, max_results, filters, exclude_dob_mismatches,
+                                         latency_budget_ms, entity_type).results)
+    
+    def search_response(self, query: str, max_results: int = 10, filters: Optional[Dict] = None,
+                        exclude_dob_mismatches: bool = False,
+                        latency_budget_ms: Optional[int] = None,
+                        entity_type: Optional[str] = None) -> SearchResponse:
+        """
+        Search and return the full response, including degraded stages.
+        
+        With ``latency_budget_ms`` (or the service default) the async pipeline
+        runs on the process's shared background event loop so LLM calls can
+        be cancelled at the deadline; see ``LatencyBudget``. A budget that is
+        not a positive number of milliseconds raises ValueError.
+        """
+        latency_budget_ms = self._check_latency_budget(latency_budget_ms) or self.latency_budget_ms
+        if latency_budget_ms and self.use_llm:
+            return run_coroutine(self.search_response_async(
+                query, max_results, filters, exclude_dob_mismatches, latency_budget_ms, entity_type
+            ))
         
+        key = self._search_key(query, max_results, filters, exclude_dob_mismatches, None, entity_type)
+        return self.flights.do(key, self._search, query, max_results, filters, exclude_dob_mismatches, entity_type)
+    
+    @staticmethod
+    def _check_latency_budget(latency_budget_ms) -> Optional[int]:
+        """A request's latency budget as whole milliseconds; None when unset."""
+        if latency_budget_ms is None:
+            return None
+        error = ValueError(f"latency_budget_ms must be a positive number of milliseconds, got {latency_budget_ms!r}")
+        if isinstance(latency_budget_ms, bool) or not isinstance(latency_budget_ms, (int, float, str)):
+            raise error
+        try:
+            value = float(latency_budget_ms)
+        except ValueError:
+            raise error from None
+        if not value.is_integer() or value < 1:
+            raise error
+        return int(value)
+    
+    def _search(self, query: str, max_results: int, filters: Optional[Dict],
+                exclude_dob_mismatches: bool, entity_type: Optional[str] = None) -> SearchResponse:
+        # Parse query
+        query_info = self._query_info(query, entity_type)
+        results = self._identifier_results(query_info, filters, max_results)
+        if results:
+            return SearchResponse(query=query, total_matches=len(results), results=results)
+        candidates, token_index = self._select_candidates(query_info, filters, exclude_dob_mismatches)
+        results = self.search_candidates(query_info, candidates, max_results, token_index)
+        return SearchResponse(query=query, total_matches=len(results), results=results)
+    
+    @staticmethod
+    def _search_key(query: str, max_results: int, filters: Optional[Dict], exclude_dob_mismatches: bool,
+                    latency_budget_ms: Optional[int], entity_type: Optional[str] = None) -> tuple:
+        """Requests that would produce the same results share a key: case and spacing are ignored."""
+        normalized_filters = FacetIndex.normalize_filters(filters)
+        return (
+            ' '.join(query.casefold().split()),
+            max_results,
+            tuple(sorted((facet, tuple(sorted(values))) for facet, values in normalized_filters.items())),
+            bool(exclude_dob_mismatches),
+            latency_budget_ms,
+            normalize_entity_type(entity_type) if entity_type else None
+        )
+    
+    def search_candidates(self, query_info: Dict, candidates: List[SDNEntry], max_results: int = 10,
+                          token_index=None) -> List[MatchResult]:
+        """Run the matching, ranking and explanation steps against a given entry subset."""
+        # Generate name variations once for the query
+        logger.info("Starting search for: '%s'", query_info['name'])
+        logger.debug("Searching against %d entries", len(candidates))
         # Step 1: Initial name-based filtering
         logger.info("Step 1: Filtering matches...")
-        filtered = self.name_matcher.filter_matches(query_variations, self.entries)
-        logger.info(f"Step 1 complete: Found {len(filtered)} initial matches")
+        filtered = self.name_matcher.match(query_info['name'], candidates, token_index)
+        logger.info("Step 1 complete: Found %d initial matches", len(filtered))
         
         if not filtered:
             return []
@@ -60,10 +332,12 @@ class SDNSearchService:
         # Step 2: Context-based ranking
         logger.info("Step 2: Ranking matches...")
         ranked = self.ranker.rank_matches(query_info, filtered)
-        logger.info(f"Step 2 complete: Ranked {len(ranked)} matches")
+        logger.info("Step 2 complete: Ranked %d matches", len(ranked))
         
         # Step 3: Generate explanations for high-confidence matches
-        if self.use_llm:
+        if self.explanation_queue:
+            self._queue_explanations(query_info, ranked[:max_results])
+        elif self.use_llm:
             logger.info("Step 3: Generating explanations for high-confidence matches...")
             for match in ranked[:max_results]:
                 # Generate explanation for HIGH confidence matches
@@ -71,14 +345,239 @@ class SDNSearchService:
                     try:
                         explanation = self.llm_service.generate_explanation(query_info, match)
                         match['explanation'] = explanation
-                        logger.info(f"Generated explanation for {match['entry'].name}")
+                        logger.info("Generated explanation for %s", match['entry'].name)
                     except Exception as e:
                         logger.error(f"Error generating explanation: {e}")
                         match['explanation'] = None
                 else:
                     match['explanation'] = None
         
-        # Format results
+        return self._format_results(ranked, max_results)
+    
+    async def search_async(self, query: str, max_results: int = 10, filters: Optional[Dict] = None,
+                           exclude_dob_mismatches: bool = False,
+                           latency_budget_ms: Optional[int] = None,
+                           entity_type: Optional[str] = None) -> List[MatchResult]:
+        """
+        Async version of search for the ASGI app.
+        
+        LLM calls are awaited on the caller's event loop so a single worker can
+        hold many in-flight searches; CPU-bound name filtering runs in a thread.
+        Identical concurrent searches, sync or async, share one execution.
+        """
+        response = await self.search_response_async(query, max_results, filters, exclude_dob_mismatches,
+                                                    latency_budget_ms, entity_type)
+        return list(response.results)
+    
+    async def search_response_async(self, query: str, max_results: int = 10, filters: Optional[Dict] = None,
+                                    exclude_dob_mismatches: bool = False,
+                                    latency_budget_ms: Optional[int] = None,
+                                    entity_type: Optional[str] = None) -> SearchResponse:
+        """Async version of search_response."""
+        latency_budget_ms = self._check_latency_budget(latency_budget_ms) or self.latency_budget_ms
+        latency_budget_ms = latency_budget_ms if self.use_llm else None
+        key = self._search_key(query, max_results, filters, exclude_dob_mismatches, latency_budget_ms, entity_type)
+        return await self.flights.do_async(
+            key, lambda: self._search_async(query, max_results, filters, exclude_dob_mismatches,
+                                            latency_budget_ms, entity_type)
+        )
+    
+    async def _search_async(self, query: str, max_results: int, filters: Optional[Dict],
+                            exclude_dob_mismatches: bool, latency_budget_ms: Optional[int],
+                            entity_type: Optional[str] = None) -> SearchResponse:
+        # The budget clock starts once this search is actually running
+        budget = LatencyBudget(latency_budget_ms) if latency_budget_ms else None
+        query_info = self._query_info(query, entity_type)
+        results = self._identifier_results(query_info, filters, max_results)
+        if results:
+            return SearchResponse(query=query, total_matches=len(results), results=results)
+        candidates, token_index = self._select_candidates(query_info, filters, exclude_dob_mismatches)
+        
+        logger.info("Starting async search for: '%s'", query_info['name'])
+        # Step 1: Initial name-based filtering
+        filtered = await self.name_matcher.match_async(query_info['name'], candidates, budget, token_index)
+        logger.info("Step 1 complete: Found %d initial matches", len(filtered))
+        
+        results = []
+        if filtered:
+            # Step 2: Context-based ranking
+            ranked = await self.ranker.rank_matches_async(query_info, filtered, budget)
+            logger.info("Step 2 complete: Ranked %d matches", len(ranked))
+            
+            # Step 3: Generate explanations for high-confidence matches concurrently
+            if self.explanation_queue:
+                self._queue_explanations(query_info, ranked[:max_results])
+            elif self.use_llm:
+                await self._generate_explanations_async(query_info, ranked[:max_results], budget)
+            results = self._format_results(ranked, max_results)
+        
+        return SearchResponse(
+            query=query,
+            total_matches=len(results),
+            results=results,
+            degraded=budget.degraded if budget else []
+        )
+    
+    def search_identifier(self, identifier: str, kind: Optional[str] = None, max_results: int = 10,
+                          filters: Optional[Dict] = None) -> SearchResponse:
+        """
+        Exact lookup of a passport, national ID, IMO number, SWIFT/BIC or tax ID.
+        
+        ``identifier`` may carry its label ("Passport A7368886"); a bare value
+        is looked up under ``kind``, or under every kind when that is unset.
+        """
+        kind = IdentifierIndex.normalize_kind(kind)
+        parsed = parse_identifier(identifier)
+        if parsed and kind in (None, parsed[0]):
+            hits = self.identifier_index.lookup_all([parsed])
+        else:
+            hits = [
+                (hit_kind, normalize_identifier(hit_kind, identifier), position)
+                for hit_kind, position in self.identifier_index.lookup(identifier, kind)
+            ]
+        results = self._format_identifier_hits('', hits, filters, max_results)
+        return SearchResponse(query=identifier, total_matches=len(results), results=results)
+    
+    def suggest(self, text: str, limit: int = 10) -> SuggestResponse:
+        """
+        Typeahead: entries whose name or alias starts with the typed text, or
+        with it after moving a later word to the front ("djamel mou" finds
+        "MOUSTFA, Djamel"). Served from the prefix index; no matching or LLM.
+        """
+        if not 1 <= limit <= MAX_SUGGESTIONS:
+            raise ValueError(f"limit must be between 1 and {MAX_SUGGESTIONS}")
+        suggestions = []
+        for position, string_id, alias in self.suggest_index.suggest(text, limit):
+            entry = self.entries[position]
+            matched = entry.name
+            if alias:
+                string = self.suggest_index.name_table.strings[string_id]
+                matched = next((a for a in entry.aliases if normalize_name(a) == string), string)
+            suggestions.append(Suggestion(
+                id=entry.id,
+                name=entry.name,
+                type=entry_type(entry),
+                matched=matched,
+                match_type='alias' if alias else 'name'
+            ))
+        return SuggestResponse(query=text, suggestions=suggestions)
+    
+    def _identifier_results(self, query_info: Dict, filters: Optional[Dict], max_results: int) -> List[MatchResult]:
+        """
+        Definitive results for identifiers given in the query, found by exact
+        lookup; no name matching or LLM calls. Empty when none are listed.
+        """
+        if not query_info['identifiers']:
+            return []
+        hits = self.identifier_index.lookup_all(query_info['identifiers'])
+        results = self._format_identifier_hits(query_info['name'], hits, filters, max_results)
+        if results:
+            logger.info(f"Identifier match for '{query_info['name']}': {len(results)} entries, skipping name matching")
+        return results
+    
+    def _format_identifier_hits(self, name: str, hits: List[Tuple[str, str, int]], filters: Optional[Dict],
+                                max_results: int) -> List[MatchResult]:
+        """
+        Turn exact identifier hits into HIGH confidence results, ordered by
+        name similarity against the query's rule-based variations, the same
+        set local name matching scores with ("Ali Hassan" meets "HASSAN, Ali").
+        """
+        filters = FacetIndex.normalize_filters(filters)
+        allowed = self.facets.select(filters) if filters else None
+        variations = self.name_matcher.generate_query_variations(name, use_llm=False) if name else []
+        matches: Dict[int, Dict] = {}
+        for kind, value, position in hits:
+            if allowed is not None and not (allowed >> position) & 1:
+                continue
+            match = matches.get(position)
+            if match is None:
+                entry = self.entries[position]
+                name_score, match_type = 0.0, ''
+                if variations:
+                    name_score, match_type = self.name_matcher._flexible_name_match_with_variations(
+                        variations, entry.normalized_name, entry.normalized_aliases
+                    )
+                match = matches[position] = {
+                    'entry': entry,
+                    'score': name_score,
+                    'name_match_score': name_score,
+                    'llm_score': 1.0,
+                    'confidence': ConfidenceLevel.HIGH,
+                    'match_reasons': [f"{match_type} match: {name_score:.2f}"] if match_type else []
+                }
+            match['match_reasons'].insert(0, f"Exact {IDENTIFIER_LABELS[kind]} match: {value}")
+        ranked = sorted(matches.values(), key=lambda m: m['name_match_score'], reverse=True)
+        return self._format_results(ranked, max_results)
+    
+    def get_explanation(self, job_id: str, wait: float = 0.0) -> Optional[Dict]:
+        """
+        State of a background explanation job, or None if the id is unknown.
+        
+        ``wait`` long-polls for up to that many seconds (capped at
+        ``MAX_EXPLANATION_WAIT``) until the job has finished.
+        """
+        if not self.explanation_queue:
+            return None
+        wait = min(max(wait, 0.0), self.MAX_EXPLANATION_WAIT)
+        if wait:
+            return self.explanation_queue.wait(job_id, wait)
+        return self.explanation_queue.get(job_id)
+    
+    def _queue_explanations(self, query_info: Dict, matches: List[Dict]):
+        """Hand high-confidence matches to the background explanation workers."""
+        for match in matches:
+            match['explanation'] = None
+            if match['confidence'] in [ConfidenceLevel.HIGH, ConfidenceLevel.MEDIUM_HIGH]:
+                match['explanation_id'] = self.explanation_queue.submit(query_info, match)
+        logger.info(f"Step 3: Queued {sum('explanation_id' in m for m in matches)} explanations")
+    
+    async def _generate_explanations_async(self, query_info: Dict[str, Optional[str]], matches: List[Dict],
+                                           budget: Optional[LatencyBudget] = None):
+        """
+        Generate explanations for all high-confidence matches in parallel.
+        
+        With a latency budget, explanations still outstanding at the deadline
+        are cancelled and left empty; finished ones are kept. Failed ones are
+        left empty too and recorded as a degraded stage.
+        """
+        high_confidence = []
+        for match in matches:
+            match['explanation'] = None
+            if match['confidence'] in [ConfidenceLevel.HIGH, ConfidenceLevel.MEDIUM_HIGH]:
+                high_confidence.append(match)
+        if not high_confidence:
+            return
+        
+        if budget is not None and not budget.allows('explanations'):
+            budget.degrade('explanations', "not enough budget for explanations")
+            return
+        
+        tasks = [
+            asyncio.ensure_future(self.llm_service.generate_explanation_async(query_info, match))
+            for match in high_confidence
+        ]
+        _, pending = await asyncio.wait(tasks, timeout=budget.timeout('explanations') if budget else None)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            budget.degrade('explanations', f"{len(pending)} of {len(tasks)} explanations timed out")
+        
+        failed = 0
+        for match, task in zip(high_confidence, tasks):
+            if task.cancelled():
+                continue
+            if task.exception() is not None:
+                failed += 1
+                logger.error(f"Error generating explanation: {task.exception()}")
+            else:
+                match['explanation'] = task.result()
+        if failed and budget is not None:
+            budget.degrade('explanations', f"{failed} of {len(tasks)} explanations failed")
+    
+    @staticmethod
+    def _format_results(ranked: List[Dict], max_results: int) -> List[MatchResult]:
+        """Convert ranked match dicts into MatchResult models."""
         results = []
         for match in ranked[:max_results]:
             entry = match['entry']
@@ -99,38 +598,55 @@ class SDNSearchService:
                     'aliases': entry.aliases,
                     'remarks': entry.remarks
                 },
-                explanation=match.get('explanation')
+                explanation=match.get('explanation'),
+                explanation_id=match.get('explanation_id')
             )
             results.append(result)
         
         return results
     
     @staticmethod
-    def _parse_query(query: str) -> Dict[str, Optional[str]]:
+    def _parse_query(query: str) -> Dict:
         """Parse user input to extract name, DOB, and nationality."""
         parts = [p.strip() for p in query.split(',')]
         
         # First, check if any parts look like dates or nationalities
         name_parts = []
+        identifiers = []
         dob = None
+        dob_ranges = []
         nationality = None
+        nationality_code = None
         
-        for part in parts:
-            # Check if it's a date (various formats)
-            if re.match(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', part):
+        for i, part in enumerate(parts):
+            # Labelled identifiers ("passport A7368886", "IMO 9187629") are looked up exactly
+            identifier = parse_identifier(part)
+            part_ranges = [] if identifier else parse_date_ranges(part)
+            if identifier:
+                identifiers.append(identifier)
+            # Check if it's a date (numeric, "21 Jun 1955", year-only, circa, ranges)
+            elif part_ranges:
                 dob = part
-            # Check if it looks like a nationality/country (common country names)
-            elif part.lower() in ['american', 'british', 'french', 'german', 'chinese', 'russian', 'iranian', 'iraqi', 'syrian', 'afghan', 'pakistan', 'usa', 'uk', 'france', 'germany', 'china', 'russia', 'iran', 'iraq', 'syria', 'afghanistan']:
+                dob_ranges = part_ranges
+            # Check if it names a country (name, demonym or code). The first part
+            # is always the name, and in "LAST, First" queries so is the second,
+            # so given names like "Jordan" or "Georgia" are not read as countries.
+            elif (i >= 2 or (i == 1 and ' ' in parts[0])) and gazetteer.lookup(part):
                 nationality = part
+                nationality_code = gazetteer.lookup(part)
             else:
                 # It's part of the name
                 name_parts.append(part)
         
         # Reconstruct the name from remaining parts
-        name = ', '.join(name_parts) if name_parts else query
+        name = ', '.join(name_parts) if name_parts else ('' if identifiers else query)
         
         return {
             'name': name,
             'dob': dob,
-            'nationality': nationality
+            'dob_ranges': dob_ranges,
+            'nationality': nationality,
+            'nationality_code': nationality_code,
+            'identifiers': identifiers,
+            'entity_type': detect_entity_type(name, dob_ranges)
         }
\ No newline at end of file
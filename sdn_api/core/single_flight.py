@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the work; every caller that arrives
+    while it is in flight waits on the same future and receives the same
+    result or exception. Nothing is cached: once the call completes the key
+    is released and the next caller runs the work again.
+
+    Calls are tracked with thread-safe ``concurrent.futures.Future`` objects,
+    so blocking callers (``do``) and coroutines on any event loop
+    (``do_async``) can share one flight. If the caller running the work is
+    cancelled, a waiting caller takes over instead of failing.
+    """
+
+    def __init__(self, name: str = "single-flight"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.coalesced = 0
+
+    def _join(self, key: Hashable):
+        """Return ``(future, is_leader)`` for a key, registering a new flight if none is running."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is None:
+                future = Future()
+                self._calls[key] = future
+                return future, True
+            self.coalesced += 1
+            return future, False
+
+    def _finish(self, key: Hashable, future: Future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` unless an identical call is in flight; then share its outcome."""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            logger.debug(f"{self.name}: joined in-flight call for {key!r}")
+            try:
+                return future.result()
+            except CancelledError:
+                continue
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key, future)
+
+    async def do_async(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``factory()`` unless an identical call is in flight; then share its outcome."""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            logger.debug(f"{self.name}: joined in-flight call for {key!r}")
+            try:
+                # Shielded so a cancelled waiter does not cancel the shared flight
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    continue
+                raise
+
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            # Hand the work to a waiting caller rather than failing it
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key, future)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'in_flight': len(self._calls), 'coalesced': self.coalesced}
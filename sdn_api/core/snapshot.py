@@ -0,0 +1,154 @@
+import os
+import stat
+import pickle
+import hashlib
+import tempfile
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process build lock
+    fcntl = None
+
+from ..models.sdn import SDNEntry
+from ..utils.logger import setup_logger
+from ..utils.paths import user_cache_dir
+
+logger = setup_logger(__name__)
+
+SNAPSHOT_MAGIC = b"SDNSNAP1"
+# Bump whenever the set or layout of snapshotted tables changes
+SNAPSHOT_FORMAT = 14
+
+
+# Code that decides what goes into the tables: loaders, normalization and indexes
+_CODE_DIRS = (Path(__file__).resolve().parent, Path(__file__).resolve().parent.parent / "models")
+
+
+def default_snapshot_dir() -> Path:
+    """Per-user cache directory: $XDG_CACHE_HOME/sdn_api, else ~/.cache/sdn_api."""
+    return user_cache_dir()
+
+
+def code_fingerprint() -> str:
+    """Package version and a hash of the loader and index sources."""
+    try:
+        version = metadata.version("sdn-api")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    digest = hashlib.sha1(version.encode("utf-8"))
+    for directory in _CODE_DIRS:
+        for path in sorted(directory.glob("*.py")):
+            digest.update(path.name.encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class EntrySnapshot:
+    """
+    On-disk snapshot of the parsed SDN entry table and its indexes.
+
+    The first process to start parses the source file and writes the snapshot
+    under an exclusive file lock; every other worker loads the finished file
+    instead of re-parsing the list. Each worker unpickles its own copy, so
+    this saves the parse and index build, not memory.
+
+    The snapshot is a pickle, so it is only read from a directory owned by
+    the current user and writable by no one else (created 0700 if missing),
+    and only if the file itself is owned by the user and not writable by
+    others. The key covers the source path, size and mtime, the table
+    format, the SDNEntry schema and a fingerprint of the package version and
+    loader/index code, so a new list or a code change that alters
+    normalization or indexing produces a fresh snapshot.
+    """
+
+    def __init__(self, source_path: str, snapshot_dir: Optional[str] = None):
+        self.source_path = Path(source_path).resolve()
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else default_snapshot_dir()
+        self.path = self.snapshot_dir / f"sdn-{self._snapshot_key()}.snap"
+
+    def _snapshot_key(self) -> str:
+        """Derive a key that changes whenever the source data, schema or code changes."""
+        source = self.source_path.stat()
+        schema = ",".join(SDNEntry.model_fields)
+        raw = (f"{self.source_path}:{source.st_size}:{source.st_mtime_ns}:{schema}:{SNAPSHOT_FORMAT}:"
+               f"{code_fingerprint()}")
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _is_private(path: Path) -> bool:
+        """Owned by this user and not writable by group or others."""
+        if not hasattr(os, "getuid"):
+            return True
+        info = path.stat()
+        return info.st_uid == os.getuid() and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+    def _prepare_dir(self) -> bool:
+        """Create the snapshot directory 0700 if needed; False if it is not private."""
+        self.snapshot_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not self._is_private(self.snapshot_dir):
+            logger.warning(f"Snapshot directory {self.snapshot_dir} is not private to this user; "
+                           f"not using snapshots")
+            return False
+        return True
+
+    def load_or_build(self, build: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Load an existing snapshot, or build it once across all workers."""
+        if not self._prepare_dir():
+            return build()
+
+        tables = self._attach()
+        if tables is not None:
+            return tables
+
+        with open(self.path.with_suffix(".lock"), "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another worker may have finished the build while we waited
+                tables = self._attach()
+                if tables is not None:
+                    return tables
+
+                tables = build()
+                self._write(tables)
+                return tables
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _attach(self) -> Optional[Dict[str, Any]]:
+        """Load tables from the snapshot file if it exists and is private to this user."""
+        if not self.path.exists():
+            return None
+        if not self._is_private(self.path):
+            logger.warning(f"Ignoring snapshot {self.path}: not owned by this user or writable by others")
+            return None
+
+        try:
+            with open(self.path, "rb") as f:
+                if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                    logger.warning(f"Ignoring invalid snapshot {self.path}")
+                    return None
+                tables = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Could not load snapshot {self.path}: {e}")
+            return None
+
+        logger.info(f"Loaded snapshot {self.path}")
+        return tables
+
+    def _write(self, tables: Dict[str, Any]):
+        """Atomically write the snapshot so readers never see a partial file."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.snapshot_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(SNAPSHOT_MAGIC)
+                pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        logger.info(f"Wrote snapshot {self.path}")
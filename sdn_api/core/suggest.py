@@ -0,0 +1,107 @@
+from bisect import bisect_left
+from typing import Dict, List, Set, Tuple
+
+from .name_table import NameTable
+from .normalizer import normalize_name
+
+# (entry position, string id, matched an alias) for one completion
+Completion = Tuple[int, int, bool]
+
+MAX_SUGGESTIONS = 20
+
+
+def suggest_key(text: str) -> str:
+    """Normalized name without commas, as typed: "MOUSTFA, Dj" -> "moustfa dj"."""
+    return ' '.join(normalize_name(text).replace(',', ' ').split())
+
+
+class SuggestIndex:
+    """
+    Sorted prefix array over every distinct normalized name and alias.
+
+    Built at load time from the NameTable. Each distinct string is keyed
+    once as written and once per later word rotated to the front
+    ("moustfa djamel" is also "djamel moustfa"), so a typeahead matches
+    "LAST, First" and "First Last" alike. A prefix is found by binary
+    search; its keys are ranked as-written before rotated, shorter before
+    longer, then alphabetically, and primary names come before aliases. The
+    few short prefixes that match more than SCAN_LIMIT keys have their top
+    completions precomputed, so every lookup touches a bounded slice.
+    """
+
+    SCAN_LIMIT = 256
+
+    def __init__(self, name_table: NameTable):
+        self.name_table = name_table
+        strings = name_table.strings
+        # Per string id: positions of the entries it names, and of those it is an alias of
+        self.name_owners: List[Tuple[int, ...]] = []
+        self.alias_owners: List[Tuple[int, ...]] = []
+        for string_id, owners in enumerate(name_table.owners):
+            self.name_owners.append(tuple(p for p in owners if name_table.entry_strings[p][0] == string_id))
+            self.alias_owners.append(tuple(p for p in owners if name_table.entry_strings[p][0] != string_id))
+
+        keyed = []
+        for string_id, string in enumerate(strings):
+            words = string.replace(',', ' ').split()
+            for start in range(len(words)):
+                keyed.append((' '.join(words[start:] + words[:start]), start > 0, string_id))
+        by_rank = sorted(range(len(keyed)), key=lambda k: (keyed[k][1], len(strings[keyed[k][2]]),
+                                                           strings[keyed[k][2]]))
+        ranks = [0] * len(keyed)
+        for rank, k in enumerate(by_rank):
+            ranks[k] = rank
+        order = sorted(range(len(keyed)), key=lambda k: keyed[k][0])
+        self.keys: List[str] = [keyed[k][0] for k in order]
+        self.key_strings: List[int] = [keyed[k][2] for k in order]
+        self.key_ranks: List[int] = [ranks[k] for k in order]
+        self.top: Dict[str, Tuple[Completion, ...]] = {
+            prefix: tuple(self._complete(prefix, MAX_SUGGESTIONS)) for prefix in self._heavy_prefixes()
+        }
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        # Keys are lowercase ASCII, so every key starting with prefix sorts below prefix + '~'
+        return bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + '~')
+
+    def _heavy_prefixes(self) -> Set[str]:
+        """Prefixes matching more than SCAN_LIMIT keys; each one's parent is heavy too."""
+        heavy = set()
+        level = {key[:1] for key in self.keys}
+        length = 1
+        while level:
+            children = set()
+            for prefix in level:
+                lo, hi = self._range(prefix)
+                if hi - lo > self.SCAN_LIMIT:
+                    heavy.add(prefix)
+                    children.update(key[:length + 1] for key in self.keys[lo:hi] if len(key) > length)
+            level = children
+            length += 1
+        return heavy
+
+    def _complete(self, prefix: str, limit: int) -> List[Completion]:
+        """Scan the keys under a prefix in rank order: primary names first, then aliases."""
+        lo, hi = self._range(prefix)
+        # A string reached through several of its rotations is expanded once, at its best rank
+        ranked = dict.fromkeys(self.key_strings[k] for k in sorted(range(lo, hi), key=self.key_ranks.__getitem__))
+        completions: List[Completion] = []
+        seen = set()
+        for alias, owners in ((False, self.name_owners), (True, self.alias_owners)):
+            for string_id in ranked:
+                for position in owners[string_id]:
+                    if position not in seen:
+                        seen.add(position)
+                        completions.append((position, string_id, alias))
+                        if len(completions) >= limit:
+                            return completions
+        return completions
+
+    def suggest(self, text: str, limit: int = 10) -> List[Completion]:
+        """Ranked completions of a partly typed name, one per entry."""
+        prefix = suggest_key(text)
+        if not prefix:
+            return []
+        top = self.top.get(prefix)
+        if top is not None:
+            return list(top[:limit])
+        return self._complete(prefix, limit)
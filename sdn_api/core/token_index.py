@@ -0,0 +1,155 @@
+import math
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..models.sdn import SDNEntry
+
+# Sorts after every character a token can contain
+_PREFIX_END = '\U0010ffff'
+
+
+class NameTokenIndex:
+    """
+    Edit-distance index over every token of every SDN name and alias.
+
+    Built once at load time as a sorted token dictionary plus a map from each
+    token to the ids of the entries that use it. A bounded lookup walks the
+    dictionary as a Levenshtein automaton: one DP row per prefix, rows shared
+    between tokens with a common prefix, and a bisect jump past every token
+    under a prefix whose row already exceeds the edit budget. Only the small
+    part of the dictionary near the query token is ever touched.
+
+    Whole-token agreement misses concatenated, split and heavily misspelled
+    names ("Mohammedhussein", "ORTsEGbBANK"), so every distinct name string
+    is also keyed by the bigrams of its letters with spaces and commas
+    removed. A name sharing at least GRAM_OVERLAP of a query's bigrams is a
+    candidate too. Neither key bounds a fuzzy score as low as the match
+    threshold, so the matcher only narrows when every query token has an
+    indexed neighbour (see ``unplaced_tokens``) and scans the whole list for
+    a query holding a word the dictionary cannot place.
+    """
+
+    # Tokens shorter than this (particles, initials) are too unselective to index
+    MIN_TOKEN_LENGTH = 3
+    GRAM_LENGTH = 2
+    # Share of a query's bigrams a name must have to be a candidate
+    GRAM_OVERLAP = 0.4
+
+    def __init__(self, entries: List[SDNEntry]):
+        token_ids: Dict[str, Set[str]] = {}
+        string_ids: Dict[str, Set[str]] = {}
+        for entry in entries:
+            for name in [entry.normalized_name] + entry.normalized_aliases:
+                string_ids.setdefault(self.compact(name), set()).add(entry.id)
+                for token in self.tokenize(name):
+                    token_ids.setdefault(token, set()).add(entry.id)
+        self.tokens: List[str] = sorted(token_ids)
+        self.token_ids: Dict[str, Tuple[str, ...]] = {
+            token: tuple(ids) for token, ids in token_ids.items()
+        }
+
+        # Per distinct compacted string: the ids of the entries using it; per bigram: those strings
+        self.string_ids: List[Tuple[str, ...]] = []
+        gram_strings: Dict[str, List[int]] = {}
+        for string_id, (string, ids) in enumerate(string_ids.items()):
+            self.string_ids.append(tuple(ids))
+            for gram in self.grams(string):
+                gram_strings.setdefault(gram, []).append(string_id)
+        self.gram_strings: Dict[str, Tuple[int, ...]] = {
+            gram: tuple(strings) for gram, strings in gram_strings.items()
+        }
+
+    @classmethod
+    def tokenize(cls, name: str) -> List[str]:
+        return [t for t in name.replace(',', ' ').split() if len(t) >= cls.MIN_TOKEN_LENGTH]
+
+    @staticmethod
+    def compact(name: str) -> str:
+        """The name's letters only: "mohammed hussein" -> "mohammedhussein"."""
+        return name.replace(',', '').replace(' ', '')
+
+    @classmethod
+    def grams(cls, string: str) -> Set[str]:
+        return {string[i:i + cls.GRAM_LENGTH] for i in range(len(string) - cls.GRAM_LENGTH + 1)}
+
+    @staticmethod
+    def default_distance(token: str) -> int:
+        """Edit budget that grows with token length: 1 up to 5 characters, then 2."""
+        return 1 if len(token) <= 5 else 2
+
+    def within(self, word: str, max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Return ``(token, distance)`` for every indexed token within ``max_distance`` edits of ``word``."""
+        if max_distance is None:
+            max_distance = self.default_distance(word)
+
+        tokens = self.tokens
+        # rows[d] is the DP row for the first d characters of the current token
+        rows = [list(range(len(word) + 1))]
+        previous = ''
+        results = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            shared = 0
+            limit = min(len(previous), len(token), len(rows) - 1)
+            while shared < limit and previous[shared] == token[shared]:
+                shared += 1
+            del rows[shared + 1:]
+            previous = token
+
+            dead_end = None
+            for depth in range(shared, len(token)):
+                char = token[depth]
+                above = rows[-1]
+                left = above[0] + 1
+                row = [left]
+                for wc, diagonal, up in zip(word, above, above[1:]):
+                    left = min(left + 1, up + 1, diagonal + (wc != char))
+                    row.append(left)
+                rows.append(row)
+                if min(row) > max_distance:
+                    dead_end = depth + 1
+                    break
+
+            if dead_end is None:
+                if rows[-1][-1] <= max_distance:
+                    results.append((token, rows[-1][-1]))
+                i += 1
+            else:
+                # No token under this prefix can come back within budget
+                i = bisect_left(tokens, token[:dead_end] + _PREFIX_END, i + 1)
+        return results
+
+    def unplaced_tokens(self, name: str, max_distance: Optional[int] = None) -> List[str]:
+        """Tokens of the name with no indexed token within the edit budget."""
+        return [token for token in self.tokenize(name) if not self.within(token, max_distance)]
+
+    def candidate_ids(self, names: Iterable[str], max_distance: Optional[int] = None) -> Set[str]:
+        """
+        Ids of entries sharing at least one token within the edit budget, or
+        GRAM_OVERLAP of the bigrams, with any name.
+        """
+        ids: Set[str] = set()
+        seen: Set[str] = set()
+        seen_grams: Set[frozenset] = set()
+        for name in names:
+            for token in self.tokenize(name):
+                if token in seen:
+                    continue
+                seen.add(token)
+                for match, _ in self.within(token, max_distance):
+                    ids.update(self.token_ids[match])
+
+            # Variations with the same letters ("ali hassan", "ali, hassan") are counted once
+            grams = frozenset(self.grams(self.compact(name)))
+            if not grams or grams in seen_grams:
+                continue
+            seen_grams.add(grams)
+            needed = max(1, math.ceil(self.GRAM_OVERLAP * len(grams)))
+            shared = Counter(chain.from_iterable(self.gram_strings.get(gram, ()) for gram in grams))
+            for string_id, count in shared.items():
+                if count >= needed:
+                    ids.update(self.string_ids[string_id])
+        return ids
@@ -0,0 +1,258 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from .normalizer import normalize_name
+
+# Spellings of the same name across transliteration systems. Every member is
+# interchangeable with every other member of its group.
+TRANSLITERATION_GROUPS = [
+    ("muhammad", "mohammed", "mohamed", "mohammad", "mohamad", "muhammed", "mohd",
+     "mahomed", "mukhammad", "mukhamed"),
+    ("ahmad", "ahmed", "akhmed", "ahmet", "achmed"),
+    ("mahmoud", "mahmud", "mahmood", "makhmud"),
+    ("mustafa", "moustafa", "mostafa", "mustapha", "moustapha", "mustafo"),
+    ("yusuf", "youssef", "yousef", "yusef", "yousif", "yousuf", "jusuf", "yussuf"),
+    ("hussein", "husain", "hussain", "husayn", "hosein", "hossein", "huseyin"),
+    ("hassan", "hasan", "hasen", "khasan"),
+    ("ali", "aly", "alee"),
+    ("omar", "umar", "omer", "oumar"),
+    ("osama", "usama", "ousama", "usamah"),
+    ("abdullah", "abdallah", "abdulla", "abdalla", "abdoulah"),
+    ("abdul", "abdel", "abdal", "abdoul"),
+    ("abu", "abou", "abo"),
+    ("ibrahim", "ebrahim", "ibraheem", "ibragim"),
+    ("ismail", "ismael", "ismayil", "esmail"),
+    ("khalid", "khaled", "halid", "haled"),
+    # Sa'id and Sayyid are different names
+    ("said", "saeed", "saiid", "sayeed"),
+    ("sayyid", "sayyed", "sayed", "syed", "seyed"),
+    # Salah is a different name from Salih
+    ("saleh", "salih"),
+    ("suleiman", "sulaiman", "sulayman", "suleyman", "soliman", "sulejman"),
+    ("qasim", "qassem", "kassem", "kasim", "qasem", "gasim"),
+    ("jafar", "jaafar", "djafar", "dzhafar"),
+    ("karim", "kareem", "kerim"),
+    ("rahman", "rehman", "rakhman"),
+    ("nasser", "nasir", "naser", "nassir"),
+    ("faisal", "faysal", "feisal"),
+    ("fatima", "fatimah", "fatma", "fatemeh", "fatmeh"),
+    ("aisha", "ayesha", "aysha", "aicha"),
+    ("zainab", "zaynab", "zeynab"),
+    ("mikhail", "mikhael", "mihail", "michail"),
+    ("aleksandr", "alexander", "aleksander", "alexandr"),
+    ("aleksei", "alexei", "alexey", "aleksey"),
+    ("sergei", "sergey", "serhiy", "sergej", "serguei"),
+    ("andrei", "andrey", "andriy", "andrej"),
+    ("dmitri", "dmitry", "dmitriy"),
+    ("evgeny", "yevgeny", "evgeniy", "yevgeniy", "yevhen"),
+    ("yuri", "yury", "yuriy", "iouri", "jurij"),
+    ("nikolai", "nikolay", "nicolai"),
+    ("vladimir", "wladimir", "vladimer"),
+    ("viktor", "victor", "wiktor"),
+    ("petr", "pyotr"),
+    ("igor", "ihor"),
+    ("oleg", "oleh"),
+    ("olga", "olha"),
+    ("yelena", "elena"),
+    ("tatiana", "tatyana", "tetiana"),
+    ("natalia", "natalya", "nataliya"),
+    ("yulia", "yuliya", "iuliia"),
+    ("arkady", "arkadiy", "arkadi"),
+    ("gennady", "gennadiy", "gennadi", "hennadiy"),
+    ("grigory", "grigoriy", "hryhoriy"),
+    ("konstantin", "kostiantyn"),
+    ("iosif", "yosif", "josif"),
+    ("kim", "gim"),
+    ("jong", "chong"),
+    ("zhang", "chang"),
+    ("xu", "hsu"),
+    ("zhou", "chou"),
+    ("mao", "mau"),
+    ("park", "pak", "bak"),
+    ("choi", "choe", "chwe"),
+]
+
+# The same given name in different languages (Ivan/John, Petr/Pedro), or the
+# same surname character read in another Chinese dialect or in Korean
+# (Chen/Chan/Tan). These are different names that a person may or may not go
+# by, so they are opt-in and weighted below transliterations and nicknames. A
+# member also reaches the transliteration spellings of the other members.
+COGNATE_GROUPS = [
+    ("muhammad", "mehmet"),
+    ("mikhail", "michael", "michel", "miguel", "michele"),
+    ("aleksandr", "oleksandr", "aleksandar", "alexandre", "alessandro", "alejandro"),
+    ("aleksei", "oleksiy", "alexis"),
+    ("dmitri", "dmytro"),
+    ("evgeny", "eugene", "eugen"),
+    ("nikolai", "mykola", "nicholas", "nikola", "nicolas", "nicola"),
+    ("vladimir", "volodymyr"),
+    ("petr", "peter", "petro", "piotr", "pietro", "pedro", "pierre"),
+    ("pavel", "paul", "pavlo", "pablo", "paolo"),
+    ("ivan", "ioann", "john", "juan", "johann", "jean", "giovanni", "ioannis"),
+    ("yelena", "olena", "helen", "helena"),
+    ("natalia", "natalie"),
+    ("yulia", "julia"),
+    ("grigory", "gregory"),
+    ("konstantin", "constantine", "konstantine"),
+    ("iosif", "joseph", "josef", "giuseppe", "jose"),
+    ("chen", "chan", "tan"),
+    ("li", "lee", "yi", "rhee"),
+]
+
+# Formal given name -> common nicknames and diminutives
+NICKNAMES: Dict[str, Tuple[str, ...]] = {
+    "aleksandr": ("sasha", "sacha", "alex", "shura"),
+    "alexander": ("alex", "sandy", "xander", "sasha"),
+    "aleksei": ("alyosha", "lyosha"),
+    "andrew": ("andy", "drew"),
+    "anthony": ("tony",),
+    "benjamin": ("ben", "benny"),
+    "catherine": ("cathy", "kate", "katie", "kathy"),
+    "charles": ("charlie", "chuck"),
+    "christopher": ("chris", "kit"),
+    "daniel": ("dan", "danny"),
+    "david": ("dave", "davy"),
+    "dmitri": ("dima", "mitya"),
+    "edward": ("ed", "eddie", "ted", "ned"),
+    "elizabeth": ("liz", "beth", "betty", "eliza", "lisa"),
+    "evgeny": ("zhenya",),
+    "francisco": ("paco", "pancho"),
+    "ivan": ("vanya",),
+    "james": ("jim", "jimmy", "jamie"),
+    "jonathan": ("jon", "jonny"),
+    "joseph": ("joe", "joey"),
+    "jose": ("pepe",),
+    "katherine": ("kate", "kathy", "katie"),
+    "margaret": ("maggie", "peggy", "meg"),
+    "michael": ("mike", "mick", "mickey"),
+    "mikhail": ("misha",),
+    "muhammad": ("mo",),
+    "nicholas": ("nick", "nicky"),
+    "nikolai": ("kolya",),
+    "patrick": ("pat", "paddy"),
+    "richard": ("rich", "rick", "dick"),
+    "robert": ("rob", "bob", "bobby", "robbie"),
+    "samuel": ("sam", "sammy"),
+    "sergei": ("seryozha",),
+    "stephen": ("steve", "stevie"),
+    "thomas": ("tom", "tommy"),
+    "vladimir": ("volodya", "vova"),
+    "william": ("will", "bill", "billy", "willy", "liam"),
+    "yelena": ("lena",),
+    "yuri": ("yura",),
+}
+
+TRANSLITERATION_WEIGHT = 0.95
+NICKNAME_WEIGHT = 0.85
+COGNATE_WEIGHT = 0.75
+
+# Name particles that are often joined, hyphenated or dropped
+PARTICLES = ("al", "el", "bin", "ibn", "bint", "abu", "abd", "van", "von", "de", "der", "da", "di")
+
+
+class NameVariantEngine:
+    """
+    Offline name variant generator backed by a compiled variant table.
+
+    The bundled transliteration groups and nickname lists are compiled into a
+    single hash table from token to ``(variant, weight)`` pairs at import. A
+    query is expanded token by token with a beam search that keeps the
+    highest-weighted combinations, so ranked variations come back in
+    microseconds without an LLM round-trip. Cognate groups are only compiled
+    in when passed; ``cognate_variant_engine`` is the engine with them.
+    """
+
+    def __init__(self, transliteration_groups=TRANSLITERATION_GROUPS, nicknames=NICKNAMES,
+                 cognate_groups=()):
+        table: Dict[str, Dict[str, float]] = {}
+
+        def link(token: str, variant: str, weight: float):
+            if token != variant:
+                options = table.setdefault(token, {})
+                options[variant] = max(options.get(variant, 0.0), weight)
+
+        for group in transliteration_groups:
+            for token in group:
+                for variant in group:
+                    link(token, variant, TRANSLITERATION_WEIGHT)
+
+        spellings = {token: {token} | set(options) for token, options in table.items()}
+        for group in cognate_groups:
+            for token in group:
+                for cognate in group:
+                    if cognate != token:
+                        for variant in spellings.get(cognate, {cognate}):
+                            for spelling in spellings.get(token, {token}):
+                                link(spelling, variant, COGNATE_WEIGHT)
+
+        for formal, diminutives in nicknames.items():
+            family = spellings.get(formal, {formal})
+            for nickname in diminutives:
+                for name in family:
+                    link(nickname, name, NICKNAME_WEIGHT)
+                    link(name, nickname, NICKNAME_WEIGHT)
+
+        self.table: Dict[str, Tuple[Tuple[str, float], ...]] = {
+            token: tuple(sorted(options.items(), key=lambda item: -item[1]))
+            for token, options in table.items()
+        }
+
+    def token_variants(self, token: str) -> List[Tuple[str, float]]:
+        """Ranked variants of a single token, starting with the token itself."""
+        return [(token, 1.0)] + list(self.table.get(token, ()))
+
+    def generate(self, name: str, max_variations: int = 20) -> List[str]:
+        """Return up to ``max_variations`` ranked variations, the normalized name first."""
+        normalized = normalize_name(name)
+        tokens = normalized.replace(',', ' ,').split()
+        if not tokens:
+            return []
+
+        # "LAST, First" queries keep track of where the surname ends
+        words = [token for token in tokens if token != ',']
+        split_at = tokens.index(',') if ',' in tokens else None
+
+        # Beam search over per-token substitutions, highest product weight first
+        beam: List[Tuple[float, Tuple[str, ...]]] = [(1.0, ())]
+        for token in words:
+            expanded = [
+                (weight * variant_weight, combo + (variant,))
+                for weight, combo in beam
+                for variant, variant_weight in self.token_variants(token)
+            ]
+            beam = heapq.nlargest(max_variations, expanded, key=lambda item: item[0])
+
+        ranked: Dict[str, float] = {}
+        for weight, combo in beam:
+            for variation, factor in self._arrangements(list(combo), split_at):
+                score = weight * factor
+                if score > ranked.get(variation, 0.0):
+                    ranked[variation] = score
+
+        ordered = sorted(ranked.items(), key=lambda item: -item[1])
+        return [variation for variation, _ in ordered[:max_variations]]
+
+    @staticmethod
+    def _arrangements(words: List[str], split_at: Optional[int]) -> List[Tuple[str, float]]:
+        """Word orders and particle forms for a single token combination."""
+        if split_at and split_at < len(words):
+            # "al assad, bashar" -> also "bashar al assad"
+            last, first = ' '.join(words[:split_at]), ' '.join(words[split_at:])
+            arrangements = [(f"{last}, {first}", 1.0), (f"{first} {last}", 0.98), (f"{last} {first}", 0.97)]
+        elif len(words) >= 2:
+            arrangements = [
+                (' '.join(words), 1.0),
+                (f"{words[-1]}, {' '.join(words[:-1])}", 0.98),
+                (f"{words[-1]} {' '.join(words[:-1])}", 0.97),
+            ]
+        else:
+            arrangements = [(' '.join(words), 1.0)]
+
+        stripped = [w for w in words if w not in PARTICLES]
+        if stripped and len(stripped) < len(words):
+            arrangements.append((' '.join(stripped), 0.9))
+        return arrangements
+
+
+variant_engine = NameVariantEngine()
+cognate_variant_engine = NameVariantEngine(cognate_groups=COGNATE_GROUPS)
@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -23,20 +23,60 @@ class SDNEntry(BaseModel):
     name: str
     type: str = ""
     program: str = ""
+    programs: List[str] = Field(default_factory=list, description="Individual program tags")
     title: str = ""
     nationality: Optional[str] = None
+    nationality_codes: List[str] = Field(default_factory=list, description="ISO alpha-2 nationality/citizenship codes")
+    program_codes: List[str] = Field(default_factory=list, description="ISO alpha-2 codes of country programs")
     dob: Optional[str] = None
+    dob_ranges: List[Tuple[int, int]] = Field(default_factory=list, description="All DOBs as inclusive ordinal date ranges")
     pob: Optional[str] = None
     aliases: List[str] = Field(default_factory=list)
+    identifiers: List[Tuple[str, str, str]] = Field(
+        default_factory=list,
+        description="Normalized (kind, value, issuing country code or '') identifiers from remarks: "
+                    "passport, national_id, imo, swift, tax_id"
+    )
+    normalized_name: str = Field(default="", description="Name folded to lowercase ASCII for matching")
+    normalized_aliases: List[str] = Field(default_factory=list, description="Aliases folded to lowercase ASCII")
     remarks: str = ""
+    source: str = "SDN"
     
 
 class SearchQuery(BaseModel):
     """Search request model."""
     query: str = Field(..., description="Search query (e.g., 'john mccain, 21/06/1955, american')")
     max_results: int = Field(default=10, ge=1, le=100)
+    filters: Dict[str, List[str]] = Field(
+        default_factory=dict,
+        description="Facet filters applied before scoring, e.g. {'program': ['SDGT'], 'type': ['individual']}"
+    )
+    exclude_dob_mismatches: bool = Field(
+        default=False,
+        description="Drop candidates whose recorded DOB cannot overlap the query DOB"
+    )
+    latency_budget_ms: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Latency budget; LLM stages are degraded to rule-based ones to meet it"
+    )
+    entity_type: Optional[str] = Field(
+        default=None,
+        description="Search only this partition: individual, entity, vessel or aircraft (detected from the query if unset)"
+    )
     
 
+class IdentifierQuery(BaseModel):
+    """Exact identifier lookup request."""
+    identifier: str = Field(..., description="Identifier value, optionally labelled (e.g. 'Passport A7368886', 'IMO 9187629')")
+    kind: Optional[str] = Field(
+        default=None,
+        description="passport, national_id, imo, swift or tax_id; every kind is searched if unset"
+    )
+    max_results: int = Field(default=10, ge=1, le=100)
+    filters: Dict[str, List[str]] = Field(default_factory=dict, description="Facet filters, as for /search")
+
+
 class MatchResult(BaseModel):
     """Single match result."""
     name: str
@@ -48,10 +88,30 @@ class MatchResult(BaseModel):
     match_reasons: List[str]
     details: Dict[str, Optional[str | List[str]]]
     explanation: Optional[str] = Field(None, description="Detailed explanation for high-confidence matches")
+    explanation_id: Optional[str] = Field(None, description="Background explanation job, polled at /explanations/<id>")
 
 
 class SearchResponse(BaseModel):
     """API search response."""
     query: str
     total_matches: int
-    results: List[MatchResult]
\ No newline at end of file
+    results: List[MatchResult]
+    degraded: List[str] = Field(
+        default_factory=list,
+        description="Stages degraded to meet the latency budget: variations, ranking, explanations"
+    )
+
+
+class Suggestion(BaseModel):
+    """Typeahead completion for a partly typed name."""
+    id: str
+    name: str = Field(..., description="Primary name of the entry")
+    type: str
+    matched: str = Field(..., description="The name or alias the typed text completes")
+    match_type: str = Field(..., description="name or alias")
+
+
+class SuggestResponse(BaseModel):
+    """Typeahead response."""
+    query: str
+    suggestions: List[Suggestion]
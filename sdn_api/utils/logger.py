@@ -1,40 +1,166 @@
-import logging
+import os
 import sys
+import json
+import queue
+import random
+import atexit
+import logging
+import contextvars
+import logging.handlers
+import uuid
 from typing import Optional
+from dotenv import load_dotenv
+
+# Loggers are set up at import time, before the apps load .env themselves
+load_dotenv()
+
+# LOG_LEVEL: minimum level; LOG_FORMAT: text | json; LOG_DEBUG_SAMPLE_RATE:
+# fraction of requests whose DEBUG lines are kept (0 disables DEBUG entirely)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0"))
+
+DEFAULT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(correlation_id)s] %(message)s"
+
+# Per-request context, carried across threads and tasks by contextvars
+_correlation_id: contextvars.ContextVar[str] = contextvars.ContextVar("correlation_id", default="-")
+_debug_sampled: contextvars.ContextVar[Optional[bool]] = contextvars.ContextVar("debug_sampled", default=None)
+
+
+def new_correlation_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def bind_request(correlation_id: Optional[str] = None) -> str:
+    """
+    Start a request context: set its correlation id and decide once whether
+    its DEBUG lines are sampled, so a sampled request logs all of them.
+    """
+    correlation_id = correlation_id or new_correlation_id()
+    _correlation_id.set(correlation_id)
+    _debug_sampled.set(random.random() < LOG_DEBUG_SAMPLE_RATE)
+    return correlation_id
+
+
+def get_correlation_id() -> str:
+    return _correlation_id.get()
+
+
+def _debug_kept() -> bool:
+    if LOG_LEVEL == "DEBUG":
+        return True
+    sampled = _debug_sampled.get()
+    return sampled if sampled is not None else random.random() < LOG_DEBUG_SAMPLE_RATE
+
+
+def debug_enabled(logger: logging.Logger) -> bool:
+    """Cheap guard for hot-path DEBUG logging: level enabled and this request sampled."""
+    return logger.isEnabledFor(logging.DEBUG) and _debug_kept()
+
+
+class ContextFilter(logging.Filter):
+    """Stamp the correlation id on records and drop DEBUG records of unsampled requests."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = _correlation_id.get()
+        if record.levelno <= logging.DEBUG:
+            return _debug_kept()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "correlation_id": getattr(record, "correlation_id", "-"),
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that defers message formatting to the listener thread.
+
+    The stock QueueHandler formats every record on the calling thread so it
+    can be pickled; records here never leave the process, so the request
+    path only pays for creating the record and a queue put.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_queue_handler: Optional[LazyQueueHandler] = None
+_output: Optional[logging.Handler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _start_listener():
+    global _listener
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, _output, respect_handler_level=True)
+    _listener.start()
+
+
+def _restart_after_fork():
+    """Forked workers inherit the queue but not the listener thread."""
+    if _queue_handler is not None:
+        _queue_handler.queue = queue.SimpleQueue()
+        _start_listener()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _shared_handler(format_string: Optional[str]) -> LazyQueueHandler:
+    """The process-wide queue handler, started on first use."""
+    global _queue_handler, _output
+    if _queue_handler is None:
+        _output = logging.StreamHandler(sys.stdout)
+        _output.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(format_string or DEFAULT_FORMAT))
+        _queue_handler = LazyQueueHandler(queue.SimpleQueue())
+        _queue_handler.addFilter(ContextFilter())
+        _start_listener()
+        atexit.register(_stop_listener)
+        os.register_at_fork(after_in_child=_restart_after_fork)
+    return _queue_handler
 
 
 def setup_logger(
     name: str,
-    level: str = "INFO",
+    level: Optional[str] = None,
     format_string: Optional[str] = None
 ) -> logging.Logger:
-    """Setup a logger with consistent formatting."""
-    
-    if format_string is None:
-        format_string = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    
+    """
+    Setup a logger with consistent formatting.
+
+    Every logger feeds one shared in-memory queue; a background listener
+    thread formats records (text or JSON) and writes them to stdout.
+    """
     logger = logging.getLogger(name)
-    
+
     # Don't add handlers if they already exist
     if logger.handlers:
         return logger
-    
-    logger.setLevel(getattr(logging, level.upper()))
-    
-    # Create console handler
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(getattr(logging, level.upper()))
-    
-    # Create formatter
-    formatter = logging.Formatter(format_string)
-    handler.setFormatter(formatter)
-    
-    # Add handler to logger
-    logger.addHandler(handler)
-    
+
+    level = (level or LOG_LEVEL).upper()
+    if LOG_DEBUG_SAMPLE_RATE > 0 and level != "DEBUG":
+        # Let DEBUG records through to the sampling filter
+        level = "DEBUG"
+    logger.setLevel(getattr(logging, level))
+    logger.addHandler(_shared_handler(format_string))
+
     return logger
 
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance."""
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
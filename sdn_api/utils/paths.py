@@ -0,0 +1,20 @@
+import os
+from pathlib import Path
+
+
+def user_cache_dir() -> Path:
+    """Per-user cache directory: $XDG_CACHE_HOME/sdn_api, else ~/.cache/sdn_api."""
+    cache_home = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "sdn_api"
+
+
+def private_dir(path: Path) -> Path:
+    """
+    Create a directory readable by this user only (0700) if it does not
+    exist yet. Missing parents are created 0700 too, so a nested directory
+    never leaves the shared cache root open.
+    """
+    if not path.is_dir():
+        private_dir(path.parent)
+        path.mkdir(mode=0o700, exist_ok=True)
+    return path
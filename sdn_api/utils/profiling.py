@@ -0,0 +1,235 @@
+import hmac
+import json
+import time
+import random
+import cProfile
+import threading
+import sys
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .logger import setup_logger, get_correlation_id
+from .paths import private_dir, user_cache_dir
+
+logger = setup_logger(__name__)
+
+# Request header that asks for a profile; its value must match the configured token
+PROFILE_HEADER = "X-Profile"
+
+PROFILE_FORMATS = ('pstats', 'speedscope')
+
+# Only the search endpoints are worth profiling
+PROFILED_PATHS = ('/search',)
+
+
+class StackSampler(threading.Thread):
+    """
+    Wall-clock sampler of one thread's Python stack.
+
+    Every ``interval`` seconds the target thread's current frame is read via
+    ``sys._current_frames``, so time blocked on I/O or awaiting LLM futures
+    shows up as samples in the waiting frame. The result is written in the
+    speedscope "sampled" format.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.frames: Dict[Tuple[str, str, int], int] = {}
+        self.samples: List[List[int]] = []
+        self.weights: List[float] = []
+        self._stop_event = threading.Event()
+
+    def _frame_index(self, code) -> int:
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        index = self.frames.get(key)
+        if index is None:
+            index = self.frames[key] = len(self.frames)
+        return index
+
+    def run(self):
+        last = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_index(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append(stack)
+            self.weights.append(now - last)
+            last = now
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def to_speedscope(self, name: str) -> Dict:
+        frames = [None] * len(self.frames)
+        for (func, filename, line), index in self.frames.items():
+            frames[index] = {"name": func, "file": filename, "line": line}
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "sdn_api",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(self.weights),
+                "samples": self.samples,
+                "weights": self.weights
+            }]
+        }
+
+
+class ProfileCapture:
+    """One in-progress request profile on the current thread."""
+
+    def __init__(self, directory: Path, label: str, fmt: str, interval: float):
+        self.directory = directory
+        self.label = label
+        self.format = fmt
+        self.id = uuid.uuid4().hex[:16]
+        self.profile: Optional[cProfile.Profile] = None
+        self.sampler: Optional[StackSampler] = None
+
+        self.started_wall = time.perf_counter()
+        self.started_cpu = time.process_time()
+        self.started_thread_cpu = time.thread_time()
+        if fmt == 'pstats':
+            # Wall-clock timer, so blocking waits count as time in the waiting call
+            self.profile = cProfile.Profile(time.perf_counter)
+            self.profile.enable()
+        else:
+            self.sampler = StackSampler(threading.get_ident(), interval)
+            self.sampler.start()
+
+    def finish(self, **metadata) -> Path:
+        """Stop profiling and write the profile plus a JSON summary; returns the profile path."""
+        wall = time.perf_counter() - self.started_wall
+        cpu = time.process_time() - self.started_cpu
+        thread_cpu = time.thread_time() - self.started_thread_cpu
+
+        if self.profile is not None:
+            self.profile.disable()
+            path = self.directory / f"{self.id}.prof"
+            self.profile.dump_stats(str(path))
+        else:
+            self.sampler.stop()
+            path = self.directory / f"{self.id}.speedscope.json"
+            path.write_text(json.dumps(self.sampler.to_speedscope(self.label)))
+
+        summary = {
+            'id': self.id,
+            'label': self.label,
+            'format': self.format,
+            'profile': path.name,
+            'correlation_id': get_correlation_id(),
+            'created_at': time.time(),
+            'wall_ms': round(wall * 1000, 2),
+            'process_cpu_ms': round(cpu * 1000, 2),
+            'thread_cpu_ms': round(thread_cpu * 1000, 2),
+            **metadata
+        }
+        (self.directory / f"{self.id}.json").write_text(json.dumps(summary, indent=2))
+        logger.info(f"Wrote {self.format} profile {path} ({summary['wall_ms']}ms wall, {summary['thread_cpu_ms']}ms CPU)")
+        return path
+
+
+class RequestProfiler:
+    """
+    Opt-in per-request profiling.
+
+    A request is profiled when it carries ``X-Profile: <token>`` matching the
+    configured token, or when it falls in the sampled fraction. ``enabled``
+    is False unless a token or a sample rate is set; the apps only install
+    their hooks when it is True, so a disabled profiler costs nothing.
+
+    ``pstats`` captures a deterministic cProfile of the request thread with a
+    wall-clock timer (open with ``python -m pstats`` or snakeviz).
+    ``speedscope`` samples the request thread's stack instead (open at
+    https://www.speedscope.app). Work handed to other threads, such as
+    ``asyncio.to_thread`` name filtering in the ASGI app, is not captured;
+    on the ASGI app the event loop thread is shared with other requests.
+    """
+
+    def __init__(self, directory: Optional[str] = None, token: str = "", sample_rate: float = 0.0,
+                 fmt: str = 'pstats', interval: float = 0.001, paths: Tuple[str, ...] = PROFILED_PATHS):
+        if fmt not in PROFILE_FORMATS:
+            raise ValueError(f"Unknown profile format '{fmt}'. Expected one of: {', '.join(PROFILE_FORMATS)}")
+        # Profiles carry query text: by default they go to the private per-user cache directory
+        self.directory = Path(directory) if directory else user_cache_dir() / "profiles"
+        self.token = token
+        self.sample_rate = sample_rate
+        self.format = fmt
+        self.interval = interval
+        self.paths = paths
+        self.enabled = bool(token) or sample_rate > 0
+        # cProfile cannot run twice at once in the same thread
+        self._local = threading.local()
+
+    def should_profile(self, header_value: Optional[str]) -> bool:
+        if header_value and self.token and hmac.compare_digest(header_value, self.token):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def begin(self, header_value: Optional[str], path: str) -> Optional[ProfileCapture]:
+        """Start a capture for this request if it asked for one or was sampled."""
+        if path not in self.paths or not self.should_profile(header_value):
+            return None
+        if getattr(self._local, 'active', False):
+            return None
+        private_dir(self.directory)
+        try:
+            capture = ProfileCapture(self.directory, path, self.format, self.interval)
+        except ValueError as e:
+            # Another profiler is already active (e.g. cProfile on Python 3.12+ is process-wide)
+            logger.warning(f"Profiling skipped: {e}")
+            return None
+        self._local.active = True
+        return capture
+
+    def end(self, capture: Optional[ProfileCapture], **metadata) -> Optional[Path]:
+        if capture is None:
+            return None
+        try:
+            return capture.finish(**metadata)
+        finally:
+            self._local.active = False
+
+
+def install_flask_profiling(app, profiler: RequestProfiler):
+    """
+    Profile Flask requests from ``before_request`` to ``after_request``.
+
+    Only call this when ``profiler.enabled``; otherwise no hooks are added.
+    The profile id is returned in an ``X-Profile-Id`` response header.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def start_profile():
+        g.profile = profiler.begin(request.headers.get(PROFILE_HEADER), request.path)
+
+    @app.after_request
+    def finish_profile(response):
+        capture = g.pop('profile', None)
+        if capture is not None:
+            profiler.end(capture, method=request.method, status=response.status_code)
+            response.headers['X-Profile-Id'] = capture.id
+        return response
+
+    @app.teardown_request
+    def abandon_profile(exc):
+        # after_request is skipped when the view raised
+        capture = g.pop('profile', None)
+        if capture is not None:
+            profiler.end(capture, method=request.method, error=repr(exc))
@@ -0,0 +1,44 @@
+import csv
+import json
+
+import pytest
+
+from sdn_api.core.bulk import BulkScreener
+from sdn_api.core.search_service import SDNSearchService
+
+
+@pytest.fixture(scope="module")
+def service(tmp_path_factory):
+    path = tmp_path_factory.mktemp("sdn") / "sdn.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for entry_id, name in enumerate(["HASSAN, Ali", "PETROV, Ivan", "ORTSEG BANK", "KARIMI GROUP"], 1):
+            writer.writerow([entry_id, name, "individual", "SDGT"] + ["-0-"] * 8)
+    return SDNSearchService(str(path), use_llm=False, variation_mode='local')
+
+
+def test_resume_after_interrupt_before_first_checkpoint(service, tmp_path, monkeypatch):
+    customers = tmp_path / "customers.csv"
+    with open(customers, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "query"])
+        for i, query in enumerate(["Ali Hassan", "Ivan Petrov", "Ortseg Bank", "Karimi Group", "Jane Doe"]):
+            writer.writerow([f"c{i}", query])
+    output = tmp_path / "results.jsonl"
+
+    def interrupt(query, max_results):
+        raise KeyboardInterrupt
+
+    # Killed while screening the first chunk: only the initial checkpoint exists
+    with monkeypatch.context() as patch:
+        patch.setattr(service, "search", interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            BulkScreener(service, workers=1, chunk_size=2).run(str(customers), str(output))
+    checkpoint = json.loads((tmp_path / "results.jsonl.checkpoint.json").read_text())
+    assert checkpoint["rows_done"] == 0 and not checkpoint["completed"]
+
+    state = BulkScreener(service, workers=1, chunk_size=2).run(str(customers), str(output))
+
+    assert state["completed"] and state["rows_done"] == 5 and state["errors"] == 0
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [row["id"] for row in rows] == ["c0", "c1", "c2", "c3", "c4"]
@@ -0,0 +1,21 @@
+import pytest
+
+from sdn_api.core.facets import FacetIndex
+
+
+def test_normalizes_strings_and_lists():
+    assert FacetIndex.normalize_filters({"program": " sdgt ", "type": ["Individual", ""]}) == {
+        "program": ["SDGT"], "type": ["individual"]
+    }
+
+
+@pytest.mark.parametrize("filters", [
+    {"program": 5},
+    {"program": ["SDGT", 5]},
+    {"type": {"individual": True}},
+    {"nationality": None},
+    ["program"],
+])
+def test_malformed_filters_raise_value_error(filters):
+    with pytest.raises(ValueError):
+        FacetIndex.normalize_filters(filters)
@@ -0,0 +1,48 @@
+import csv
+
+import pytest
+
+from sdn_api.core.search_service import SDNSearchService
+from sdn_api.models.sdn import ConfidenceLevel
+
+
+@pytest.fixture(scope="module")
+def service(tmp_path_factory):
+    path = tmp_path_factory.mktemp("sdn") / "sdn.csv"
+    rows = [
+        ("HASSAN, Ali", "nationality Iraq; Passport A8710866 (Iraq)."),
+        ("PETROV, Ivan", "Passport B1234567."),
+    ]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for entry_id, (name, remarks) in enumerate(rows, 1):
+            writer.writerow([entry_id, name, "individual", "SDGT"] + ["-0-"] * 7 + [remarks])
+    return SDNSearchService(str(path), use_llm=False, variation_mode='local')
+
+
+def identifier_hits(results):
+    return [r for r in results if any(reason.startswith("Exact passport") for reason in r.match_reasons)]
+
+
+def test_issuing_country_is_kept(service):
+    hassan = service.entries[0]
+    assert hassan.identifiers == [("passport", "A8710866", "IQ")]
+
+
+def test_conflicting_issuing_country_is_not_a_hit(service):
+    assert not identifier_hits(service.search("Ali Hassan, passport A8710866 (Lebanon)"))
+    assert not identifier_hits(service.search_identifier("Passport A8710866 (Lebanon)").results)
+
+
+def test_agreeing_or_unstated_country_is_a_hit(service):
+    for query in ["Ali Hassan, passport A8710866 (Iraq)", "Ali Hassan, passport A8710866"]:
+        [hit] = identifier_hits(service.search(query))
+        assert hit.name == "HASSAN, Ali" and hit.confidence == ConfidenceLevel.HIGH
+    # No country recorded on the list: any stated country still matches
+    [hit] = identifier_hits(service.search("Ivan Petrov, passport B1234567 (Russia)"))
+    assert hit.name == "PETROV, Ivan"
+
+
+def test_name_is_scored_with_query_variations(service):
+    [hit] = identifier_hits(service.search("Ali Hassan, passport A8710866 (Iraq)"))
+    assert hit.name_match_score == 1.0
@@ -0,0 +1,103 @@
+import csv
+import random
+
+import pytest
+
+from sdn_api.core.search_service import SDNSearchService
+
+WORDS = [
+    "MOHAMMED", "HUSSEIN", "ALI", "HASSAN", "KARIMI", "JOHN", "AHMAD", "NOURI", "RAHMAN", "SALEH",
+    "PETROV", "IVANOV", "GARCIA", "ORTSEG", "TRADING", "GROUP", "BANK", "SHIPPING", "COMPANY", "STAR",
+]
+
+
+def perturb(rng: random.Random, name: str) -> str:
+    """Concatenate, split, reorder or misspell a name the way screening queries arrive."""
+    words = name.replace(',', ' ').split()
+    joined = ''.join(words)
+    kind = rng.randrange(5)
+    if kind == 0:
+        query = joined
+    elif kind == 1:
+        query = ''.join(word.capitalize() for word in reversed(words))
+    elif kind == 2:
+        query = ' '.join(typo(rng, word, 2) for word in words)
+    elif kind == 3:
+        cut = rng.randrange(1, len(joined))
+        query = joined[:cut] + ' ' + joined[cut:]
+    else:
+        query = typo(rng, joined, 3)
+    return ''.join(c.upper() if rng.random() < 0.3 else c.lower() for c in query)
+
+
+def typo(rng: random.Random, word: str, edits: int) -> str:
+    chars = list(word)
+    for _ in range(edits):
+        i = rng.randrange(len(chars))
+        op = rng.randrange(3)
+        if op == 0:
+            chars[i] = rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+        elif op == 1:
+            chars.insert(i, rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+        elif len(chars) > 3:
+            del chars[i]
+    return ''.join(chars)
+
+
+@pytest.fixture(scope="module")
+def service(tmp_path_factory):
+    rng = random.Random(35)
+    path = tmp_path_factory.mktemp("sdn") / "sdn.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for entry_id in range(1, 401):
+            name = ' '.join(rng.sample(WORDS, rng.randint(2, 3)))
+            alias = ' '.join(rng.sample(WORDS, 2))
+            writer.writerow([entry_id, name, "individual", "SDGT"] + ["-0-"] * 7 + [f"a.k.a. '{alias}'."])
+    return SDNSearchService(str(path), use_llm=False, variation_mode='local')
+
+
+@pytest.fixture(scope="module")
+def queries(service):
+    rng = random.Random(350)
+    names = [entry.name for entry in rng.sample(service.entries, 60)]
+    return ["Mohammedhussein", "KARIMIGROUP", "HUSSEINAliJohn", "ORTsEGbBANK"] + [perturb(rng, n) for n in names]
+
+
+def unindexed_matches(matcher, variations, entries):
+    token_index, matcher.token_index = matcher.token_index, None
+    try:
+        return matcher.filter_matches(variations, entries)
+    finally:
+        matcher.token_index = token_index
+
+
+def test_candidates_cover_every_unindexed_match(service, queries):
+    matcher = service.name_matcher
+    for query in queries:
+        variations = matcher.generate_query_variations(query, use_llm=False)
+        expected = {match['entry'].id for match in unindexed_matches(matcher, variations, service.entries)}
+        assert expected <= matcher.token_index.candidate_ids(variations), query
+
+
+def test_indexed_search_matches_full_scan(service, queries):
+    matcher = service.name_matcher
+    for query in queries:
+        variations = matcher.generate_query_variations(query, use_llm=False)
+        expected = [(m['entry'].id, m['score']) for m in unindexed_matches(matcher, variations, service.entries)]
+        indexed = [(m['entry'].id, m['score']) for m in matcher.filter_matches(variations, service.entries)]
+        assert sorted(indexed) == sorted(expected), query
+
+
+def test_index_narrows_queries_it_can_place(service):
+    matcher = service.name_matcher
+    for query in ["Ortseg Star", "Karimi Nouri", "John Saleh", "Petrov"]:
+        variations = matcher.generate_query_variations(query, use_llm=False)
+        assert len(matcher._narrow_by_tokens(variations, service.entries)) < len(service.entries) / 2, query
+
+
+def test_unplaced_query_token_scans_every_entry(service):
+    matcher = service.name_matcher
+    variations = matcher.generate_query_variations("Mohammedhussein", use_llm=False)
+    assert matcher.token_index.unplaced_tokens(variations[0]) == ["mohammedhussein"]
+    assert len(matcher._narrow_by_tokens(variations, service.entries)) == len(service.entries)